@@ -146,6 +146,109 @@ class BaselineManager:
 
         return baseline
 
+    def create_baseline_from_frame(
+        self,
+        model_id: str,
+        df,
+        feature_names: List[str] | None = None,
+        score_field: str = 'risk_score',
+        protected_attrs: List[str] | None = None,
+        profile=None
+    ) -> Dict[str, Any]:
+        """
+        Create a baseline snapshot from a DataFrame using the column profiler.
+
+        Produces the same snapshot layout as ``create_baseline`` but computes
+        every statistic in one vectorized profiling pass. A profile already
+        computed for the frame (e.g. by the analyze path) can be passed in.
+
+        Args:
+            model_id: Model identifier
+            df: pandas DataFrame of training examples
+            feature_names: Features to track (default: all columns except score)
+            score_field: Column holding the model output score
+            protected_attrs: Protected attributes for fairness tracking
+            profile: Optional precomputed ``DataProfile`` for ``df``
+
+        Returns:
+            Baseline snapshot dict
+        """
+        try:
+            from ai_core.utils.profiling import profile_frame
+        except Exception:
+            from utils.profiling import profile_frame  # type: ignore
+
+        protected_attrs = list(protected_attrs or [])
+        if feature_names is None:
+            feature_names = [c for c in df.columns if c != score_field]
+        if profile is None:
+            profile = profile_frame(df, categorical=protected_attrs)
+
+        baseline = {
+            'model_id': model_id,
+            'created_at': datetime.utcnow().isoformat() + 'Z',
+            'sample_size': len(df),
+            'feature_stats': {},
+            'score_stats': {},
+            'fairness_stats': {},
+            'data_quality': {}
+        }
+
+        for feature in feature_names:
+            col = profile.columns.get(feature)
+            if col is None or col.n_missing == col.n_rows:
+                continue
+            if col.kind == 'numeric':
+                baseline['feature_stats'][feature] = {
+                    'type': 'numeric',
+                    'histogram': col.histogram,
+                    'bin_edges': col.bin_edges,
+                    'mean': col.mean,
+                    'std': col.std,
+                    'min': col.min,
+                    'max': col.max,
+                    'p50': col.p50,
+                    'p95': col.p95
+                }
+            else:
+                baseline['feature_stats'][feature] = {
+                    'type': 'categorical',
+                    'categories': col.categories,
+                    'counts': col.counts,
+                    'unique_count': col.n_distinct
+                }
+
+        score = profile.columns.get(score_field)
+        if score is not None and score.kind == 'numeric' and score.n_missing < score.n_rows:
+            baseline['score_stats'] = {
+                'histogram': score.histogram,
+                'bin_edges': score.bin_edges,
+                'mean': score.mean,
+                'std': score.std,
+                'min': score.min,
+                'max': score.max,
+                'p50': score.p50,
+                'p95': score.p95
+            }
+
+        for attr in protected_attrs:
+            col = profile.columns.get(attr)
+            if col is not None and col.categories:
+                baseline['fairness_stats'][attr] = {
+                    'groups': col.categories,
+                    'group_counts': dict(zip(col.categories, col.counts))
+                }
+
+        baseline['data_quality'] = {
+            'null_rates': {f: profile[f].missing_ratio for f in feature_names if f in profile},
+            'total_samples': len(df)
+        }
+
+        if self.db:
+            self._store_baseline(baseline)
+        self._cache[model_id] = baseline
+        return baseline
+
     def get_baseline(self, model_id: str) -> Dict[str, Any] | None:
         """
         Retrieve baseline for model.
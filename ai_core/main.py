@@ -1,4 +1,9 @@
+import time
+
+_IMPORT_STARTED_AT = time.perf_counter()
+
 from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from starlette.middleware.trustedhost import TrustedHostMiddleware
 from starlette.middleware.httpsredirect import HTTPSRedirectMiddleware
@@ -7,24 +12,28 @@ from prometheus_client import make_asgi_app
 from prometheus_client import Histogram, Counter, Gauge
 import logging
 import os
-import time
+import threading
 
 # Use package-relative imports so tests and runtime can import this module whether
 # the package is loaded as `ai_core` or the module is executed directly.
 try:
     # Prefer package-relative import when running as a package
-    from .routers import analyze, reports
-    import importlib
-    # Import the validation submodule explicitly in case routers.__init__ does not
-    # expose the validation symbol (avoid relying on package __init__ exports).
-    validation = importlib.import_module(".routers.validation", package=__package__ or "ai_core")
+    from .utils.lazy import check_import_budget, import_first, import_report, timed_import
+    with timed_import("ai_core.routers"):
+        from .routers import analyze, reports
+        import importlib
+        # Import the validation submodule explicitly in case routers.__init__ does not
+        # expose the validation symbol (avoid relying on package __init__ exports).
+        validation = importlib.import_module(".routers.validation", package=__package__ or "ai_core")
 except Exception:
     # Fallback to top-level import when module is executed directly in Docker
     # Import analyze and reports directly, and load validation explicitly to avoid
     # cases where the package __init__ does not expose the validation symbol.
-    from routers import analyze, reports
-    import importlib
-    validation = importlib.import_module("routers.validation")
+    from utils.lazy import check_import_budget, import_first, import_report, timed_import
+    with timed_import("routers"):
+        from routers import analyze, reports
+        import importlib
+        validation = importlib.import_module("routers.validation")
 
 app = FastAPI(title="EthixAI AI Core")
 _STARTUP_COMPLETE = False
@@ -125,24 +134,89 @@ if not logger.handlers:
     logger.setLevel(logging.DEBUG if ("DEV" in (os.environ.get('ENV','')) or os.environ.get('PYTEST_CURRENT_TEST')) else logging.INFO)
 
 
-# Best-effort: ensure SHAP cache TTL index on startup when a real DB is configured.
-# This avoids unbounded growth of the `shap_cache` collection in production while
-# remaining a no-op in tests (where persistence.get_db() returns None or a fake DB).
-try:
-    from ai_core.utils.persistence import get_db, ensure_shap_cache_index
+# Modules imported by the background warm-up after the app starts serving
+# (comma-separated utils module names; empty disables preloading).
+PRELOAD_MODULES = [m.strip() for m in os.environ.get("AI_CORE_PRELOAD_MODULES", "fingerprint,profiling,fast_json,model_helper").split(",") if m.strip()]
 
+
+def _ensure_indexes():
+    # Best-effort: ensure SHAP cache TTL index when a real DB is configured. This
+    # avoids unbounded growth of the `shap_cache` collection in production while
+    # remaining a no-op in tests (where persistence.get_db() returns None or a fake DB).
+    try:
+        persistence = import_first("ai_core.utils.persistence", "utils.persistence")
+    except Exception:
+        # persistence module not available in minimal test environments
+        return
     try:
-        db = get_db()
+        db = persistence.get_db()
         if db is not None:
-            ensure_shap_cache_index(db)
+            persistence.ensure_shap_cache_index(db)
+            persistence.ensure_analysis_cache_index(db)
+            persistence.ensure_analysis_listing_index(db)
             logger.info({"msg": "ensured_shap_cache_index"})
-        _STARTUP_COMPLETE = True
     except Exception:
         # best-effort; don't crash the app on index creation errors
         logger.exception("shap_cache index creation failed (continuing)")
-except Exception:
-    # persistence module not available in minimal test environments
-    pass
+
+
+def _calibrate_admission():
+    # Seed admission cost estimates from measurements of recent stored analyses.
+    try:
+        persistence = import_first("ai_core.utils.persistence", "utils.persistence")
+        admission = import_first("ai_core.utils.admission", "utils.admission")
+        db = persistence.get_db()
+        if db is not None and admission.admission_enabled():
+            n = admission.get_controller().model.calibrate(persistence.recent_resource_usage(db))
+            logger.info({"msg": "admission_calibrated", "analyses": n})
+    except Exception:
+        logger.exception("admission calibration failed (continuing)")
+
+
+def _background_startup():
+    """Index creation, heavy-module preloading and warm-up, off the serving path.
+
+    /health/startup and /health/readiness report "starting" until this returns.
+    """
+    global _STARTUP_COMPLETE
+    _ensure_indexes()
+    _calibrate_admission()
+    for name in PRELOAD_MODULES:
+        try:
+            import_first(f"ai_core.utils.{name}", f"utils.{name}")
+        except Exception:
+            logger.exception(f"preloading {name} failed (continuing)")
+    try:
+        import_first("ai_core.utils.warmup", "utils.warmup").run_warmup()
+    except Exception:
+        logger.exception("warm-up failed (continuing)")
+    _STARTUP_COMPLETE = True
+    logger.info({"msg": "startup_complete", "imports": import_report()[:10]})
+
+
+@app.on_event("startup")
+def _start_background_startup():
+    threading.Thread(target=_background_startup, name="ai-core-startup", daemon=True).start()
+
+
+# App import cost (everything above); warns when over AI_CORE_IMPORT_BUDGET_MS.
+check_import_budget("ai_core.main", time.perf_counter() - _IMPORT_STARTED_AT)
+
+
+@app.on_event("shutdown")
+def _shutdown_job_pool():
+    # Stop analysis job workers and release the Mongo pool so the container exits promptly.
+    try:
+        from ai_core.utils.jobs import reset_job_manager
+        reset_job_manager()
+    except Exception:
+        pass
+    try:
+        from ai_core.utils.persistence import close_client, close_persister
+        close_persister()  # before the client: pending writes need the pool
+        close_client()
+    except Exception:
+        pass
 
 
 @app.get("/health")
@@ -166,15 +240,32 @@ def liveness():
     return {"status": "ok", "uptime_seconds": round(time.perf_counter() - _STARTUP_AT, 2), "rss_mb": rss_mb}
 
 
+def _warmup_state():
+    try:
+        return import_first("ai_core.utils.warmup", "utils.warmup").warmup_state()
+    except Exception:
+        return None
+
+
 @app.get("/health/startup")
 def startup():
     status = "started" if _STARTUP_COMPLETE else "starting"
-    code = 200 if _STARTUP_COMPLETE else 202
-    return {"status": status, "uptime_seconds": round(time.perf_counter() - _STARTUP_AT, 2)}
+    # probes treat any 2xx as success; 503 keeps the pod "starting" until warm
+    code = 200 if _STARTUP_COMPLETE else 503
+    body = {
+        "status": status,
+        "uptime_seconds": round(time.perf_counter() - _STARTUP_AT, 2),
+        "warmup": _warmup_state(),
+        "imports": import_report()[:10],
+    }
+    return JSONResponse(body, status_code=code)
 
 
 @app.get("/health/readiness")
 def readiness():
+    if not _STARTUP_COMPLETE:
+        # keep load balancers away until the warm-up has finished
+        return JSONResponse({"status": "starting", "startup_complete": False, "warmup": _warmup_state()}, status_code=503)
     db_ready = True
     try:
         from ai_core.utils.persistence import get_db
@@ -24,6 +24,7 @@ __all__ = [
     "validate_dataset_mapping",
     "store_analysis",
     "get_db",
+    "get_async_db",
 ]
 
 router = getattr(_impl, "router")
@@ -43,6 +44,11 @@ def store_analysis(db, dataset_name, doc):
             p = importlib.import_module("ai_core.utils.persistence")
         except Exception:
             p = importlib.import_module("utils.persistence")
+        if db is not None and hasattr(p, "enqueue_analysis"):
+            # write-behind: returns the pre-generated id without waiting for Mongo
+            aid = p.enqueue_analysis(dataset_name, doc)
+            if aid is not None:
+                return aid
         if hasattr(p, "store_analysis"):
             return p.store_analysis(db, dataset_name, doc)
     except Exception:
@@ -64,3 +70,18 @@ def get_db():
     except Exception:
         pass
     return None
+
+def get_async_db():
+    """Database for async handlers: the motor database when motor is installed,
+    otherwise ``get_db()`` (so fakes patched onto this module keep working)."""
+    try:
+        import importlib
+        try:
+            p = importlib.import_module("ai_core.utils.persistence")
+        except Exception:
+            p = importlib.import_module("utils.persistence")
+        if getattr(p, "AsyncIOMotorClient", None) is not None and hasattr(p, "get_async_db"):
+            return p.get_async_db()
+    except Exception:
+        pass
+    return get_db()
@@ -2,16 +2,17 @@
 small shim. This helps atomic replace when the router was corrupted.
 """
 from __future__ import annotations
-from typing import Any, Dict, Optional, Tuple
+from typing import Any, Dict, List, Optional, Tuple
 import importlib
 import logging
+import os
 import time
 import io
 import base64
 import json
 
 try:
-    from fastapi import APIRouter, Request, HTTPException  # type: ignore
+    from fastapi import APIRouter, Request, Response, HTTPException  # type: ignore
 except Exception:  # lightweight fallback for test collectors
     class APIRouter:  # type: ignore
         def __init__(self, *a, **k):
@@ -23,18 +24,26 @@ except Exception:  # lightweight fallback for test collectors
 
             return _d
 
+        get = post
+
     class Request:  # type: ignore
         headers: Dict[str, str]
 
         def __init__(self):
             self.headers = {}
 
+    class Response:  # type: ignore
+        def __init__(self):
+            self.headers = {}
+
     class HTTPException(Exception):  # type: ignore
-        def __init__(self, status_code: int = 500, detail: Optional[Any] = None):
+        def __init__(self, status_code: int = 500, detail: Optional[Any] = None, headers: Optional[Dict[str, str]] = None):
             super().__init__(detail)
+            self.status_code = status_code
+            self.detail = detail
 
 try:
-    from pydantic import BaseModel as PydanticBaseModel
+    from pydantic import BaseModel as PydanticBaseModel, ValidationError
     BaseModel = PydanticBaseModel  # type: ignore
 except Exception:
     class BaseModel:  # type: ignore
@@ -42,6 +51,48 @@ except Exception:
             for k, v in kwargs.items():
                 setattr(self, k, v)
 
+    class ValidationError(Exception):  # type: ignore
+        pass
+
+try:
+    from fastapi.exceptions import RequestValidationError  # type: ignore
+    from starlette.concurrency import run_in_threadpool  # type: ignore
+except Exception:
+    class RequestValidationError(Exception):  # type: ignore
+        pass
+
+    async def run_in_threadpool(func, *args, **kwargs):  # type: ignore
+        return func(*args, **kwargs)
+
+try:
+    from ai_core.utils.jobs import JobFailed, JobQueueFull, get_job_manager
+    from ai_core.utils.ingest import ARROW_STREAM, IngestError, decode_frame, is_binary_content_type, media_type
+    from ai_core.utils.validation import invalid_payload_detail, max_rows_detail, mismatched_lengths_detail
+    from ai_core.utils.lazy import lazy_util
+    from ai_core.utils.accounting import describe_estimator, track
+    from ai_core.utils.admission import AdmissionRejected, admission_enabled, get_controller as get_admission_controller
+    from ai_core.utils.cpu_budget import cpu_lease
+    from ai_core.utils.singleflight import SingleFlight
+    from ai_core.utils.tracing import server_timing, stage, trace
+except Exception:
+    from utils.jobs import JobFailed, JobQueueFull, get_job_manager  # type: ignore
+    from utils.ingest import ARROW_STREAM, IngestError, decode_frame, is_binary_content_type, media_type  # type: ignore
+    from utils.validation import invalid_payload_detail, max_rows_detail, mismatched_lengths_detail  # type: ignore
+    from utils.lazy import lazy_util  # type: ignore
+    from utils.accounting import describe_estimator, track  # type: ignore
+    from utils.admission import AdmissionRejected, admission_enabled, get_controller as get_admission_controller  # type: ignore
+    from utils.cpu_budget import cpu_lease  # type: ignore
+    from utils.singleflight import SingleFlight  # type: ignore
+    from utils.tracing import server_timing, stage, trace  # type: ignore
+
+# numpy/pandas-backed helpers load on first request, not at app import
+fast_json = lazy_util("fast_json")
+_fingerprint = lazy_util("fingerprint")
+_profiling = lazy_util("profiling")
+_performance = lazy_util("performance")
+_preprocessing = lazy_util("preprocessing")
+_metrics = lazy_util("metrics")
+
 router = APIRouter(prefix="/ai_core")
 
 def validate_dataset_mapping(data: Dict[str, Any]) -> Tuple[bool, str]:
@@ -49,31 +100,55 @@ def validate_dataset_mapping(data: Dict[str, Any]) -> Tuple[bool, str]:
 
 evaluate_data_quality = None
 
+# Part of every analysis cache key; bump whenever a change alters what an
+# analysis of the same data produces (models, explainers, metrics, doc shape).
+PIPELINE_VERSION = "1"
+
 FAIRNESS_THRESHOLDS = {
     "demographic_parity_difference": 0.10,
     "equal_opportunity_difference": 0.10,
 }
 
 try:
-    from prometheus_client import Histogram, Counter
+    from prometheus_client import Histogram, Counter, Gauge
 
     ai_requests = Counter("ai_core_requests_total", "Total ai_core analyze requests", ["status"])
     ai_duration = Histogram("ai_core_analyze_seconds", "ai_core analyze duration seconds")
     ai_errors = Counter("ai_core_errors_total", "ai_core analyze errors")
+    ai_inflight = Gauge("ai_core_analyze_inflight", "Distinct analyses currently being computed")
+    ai_coalesced = Counter("ai_core_analyze_coalesced_total", "Analyze requests that joined an identical in-flight analysis")
 except Exception:
-    ai_requests = ai_duration = ai_errors = None
+    ai_requests = ai_duration = ai_errors = ai_inflight = ai_coalesced = None
 
 logger = logging.getLogger("ai_core.routers.analyze")
 
+# Identical concurrent analyze requests share one computation and analysis_id.
+_INFLIGHT = SingleFlight(inflight=ai_inflight, coalesced=ai_coalesced)
+
 
 class AnalyzeRequest(BaseModel):
     dataset_name: str
     data: Dict[str, Any]
+    # Optional explanation budget: explain a stratified subsample instead of every row
+    explain_max_rows: Optional[int] = None
+    explain_max_seconds: Optional[float] = None
 
 
 class AnalyzeResponse(BaseModel):
     analysis_id: Optional[str]
     summary: Dict[str, float]
+    # Set when the result is a previously stored analysis of identical input
+    cached: bool = False
+    created_at: Optional[int] = None
+
+
+class AnalyzeJobResponse(BaseModel):
+    job_id: str
+    status: str
+    submitted_at: Optional[float] = None
+    finished_at: Optional[float] = None
+    result: Optional[AnalyzeResponse] = None
+    error: Optional[Dict[str, Any]] = None
 
 
 def _call_store_analysis(db, dataset_name: str, doc: Dict[str, Any]) -> Optional[str]:
@@ -85,6 +160,9 @@ def _call_store_analysis(db, dataset_name: str, doc: Dict[str, Any]) -> Optional
         except Exception:
             analyze_mod = importlib.import_module("routers.analyze")
 
+        if db is None and hasattr(analyze_mod, "get_db"):
+            # pooled per-process client; cheap to call per request
+            db = analyze_mod.get_db()
         if hasattr(analyze_mod, "store_analysis"):
             aid = analyze_mod.store_analysis(db, dataset_name, doc)
             if aid is not None:
@@ -105,66 +183,228 @@ def _call_store_analysis(db, dataset_name: str, doc: Dict[str, Any]) -> Optional
     return aid
 
 
-def run_analysis_core(db, X, y, dataset_name: str, log_meta: Optional[Dict[str, Any]] = None) -> Tuple[Optional[str], Dict[str, float]]:
+def _encode_features(X):
+    """Numeric model features for X plus the per-column encoding report."""
     try:
-        mh = importlib.import_module("ai_core.utils.model_helper")
+        return _preprocessing.encode_features(X)
     except Exception:
-        mh = importlib.import_module("utils.model_helper")
+        logger.exception("feature encoding failed; training on the raw frame")
+        return X, {}
 
-    model = mh.train_quick_model(X, y)
-    explanation = mh.explain_model(model, X)
 
+def _profile(X):
     try:
-        y_pred = model.predict(X) if hasattr(model, "predict") else None
+        return _profiling.profile_frame(X)
     except Exception:
-        y_pred = None
+        logger.exception("data profiling failed")
+        return None
 
-    if y_pred is not None:
-        sens_col = None
-        for c in ("sensitive", "protected", "gender", "sex", "race"):
-            if c in X.columns:
-                sens_col = c
-                break
-        if sens_col is None:
-            for c in X.columns:
-                if c == "target":
-                    continue
-                try:
-                    if X[c].nunique(dropna=True) == 2:
-                        sens_col = c
-                        break
-                except Exception:
-                    continue
 
-        if sens_col is not None:
-            try:
+SENSITIVE_NAMES = ("sensitive", "protected", "gender", "sex", "race")
+
+
+def _detect_sensitive_columns(X, profile=None) -> List[str]:
+    """All explicitly named sensitive columns, else the first binary column."""
+    named = [c for c in SENSITIVE_NAMES if c in X.columns]
+    if named:
+        return named
+    for c in X.columns:
+        if c == "target":
+            continue
+        try:
+            n_distinct = profile[c].n_distinct if profile is not None and c in profile else X[c].nunique(dropna=True)
+            if n_distinct == 2:
+                return [c]
+        except Exception:
+            continue
+    return []
+
+
+def _detect_sensitive_column(X, profile=None) -> Optional[str]:
+    cols = _detect_sensitive_columns(X, profile)
+    return cols[0] if cols else None
+
+
+def _env_number(name: str, cast):
+    raw = os.environ.get(name)
+    if not raw:
+        return None
+    try:
+        value = cast(raw)
+    except (TypeError, ValueError):
+        logger.warning("ignoring invalid %s=%r", name, raw)
+        return None
+    return value if value > 0 else None
+
+
+def _explain_budget(req: Optional[AnalyzeRequest] = None) -> Optional[Dict[str, Any]]:
+    """Explanation budget from the request, falling back to server defaults."""
+    max_rows = getattr(req, "explain_max_rows", None) or _env_number("AI_CORE_EXPLAIN_MAX_ROWS", int)
+    max_seconds = getattr(req, "explain_max_seconds", None) or _env_number("AI_CORE_EXPLAIN_MAX_SECONDS", float)
+    if not max_rows and not max_seconds:
+        return None
+    return {
+        "max_rows": int(max_rows) if max_rows else None,
+        "max_seconds": float(max_seconds) if max_seconds else None,
+    }
+
+
+def run_analysis_core(
+    db,
+    X,
+    y,
+    dataset_name: str,
+    log_meta: Optional[Dict[str, Any]] = None,
+    explain_budget: Optional[Dict[str, Any]] = None,
+    endpoint: str = "analyze",
+    cache_key: Optional[str] = None,
+) -> Tuple[Optional[str], Dict[str, float]]:
+    # Resource usage covers the analysis itself; the store round trip is excluded.
+    # The CPU lease sizes estimator/BLAS/OpenMP threads to this analysis' share.
+    with cpu_lease() as threads, track(endpoint, n_rows=len(X), n_features=X.shape[1]) as usage:
+        usage.threads = threads
+        result = _run_analysis(db, X, y, dataset_name, log_meta, explain_budget, usage, cache_key)
+    # measured cost calibrates admission estimates for later requests
+    if admission_enabled():
+        get_admission_controller().observe(usage)
+    return result
+
+
+def _record_explanation(usage, seconds: float, X_model, explanation_stats) -> None:
+    """Feed the SHAP computation metrics; cache hits computed nothing and are skipped."""
+    backend = usage.explainer or "coefficients"
+    if backend.startswith("cache:"):
+        return
+    n_samples = (explanation_stats or {}).get("n_samples", len(X_model))
+    try:
+        _metrics.record_shap_computation(usage.estimator or "unknown", seconds, int(n_samples), X_model.shape[1], backend=backend)
+    except Exception:
+        logger.debug("shap metrics unavailable", exc_info=True)
+
+
+def _run_analysis(db, X, y, dataset_name, log_meta, explain_budget, usage, cache_key=None) -> Tuple[Optional[str], Dict[str, float]]:
+    try:
+        mh = importlib.import_module("ai_core.utils.model_helper")
+    except Exception:
+        mh = importlib.import_module("utils.model_helper")
+
+    with stage("profile"):
+        profile = _profile(X)
+    sens_cols = _detect_sensitive_columns(X, profile)
+    sens_col = sens_cols[0] if sens_cols else None
+
+    # Profiling, sensitive-column detection and fairness use the caller's columns;
+    # the estimator and explainers see the encoded numeric features.
+    with stage("encode"):
+        X_model, feature_encoding = _encode_features(X)
+
+    with stage("train"):
+        model = mh.train_quick_model(X_model, y)
+    usage.estimator = describe_estimator(model)
+    explanation_stats = None
+    fairness_report = None
+    fairness_intervals = None
+    # "shap" includes the "background" stage recorded inside model_helper
+    explain_start = time.perf_counter()
+    with stage("shap"):
+        if explain_budget and hasattr(mh, "explain_model_budgeted"):
+            detail = mh.explain_model_budgeted(
+                model,
+                X_model,
+                y=y,
+                sensitive=X[sens_col] if sens_col is not None else None,
+                **explain_budget,
+            )
+            explanation = detail["importances"]
+            explanation_stats = {k: v for k, v in detail.items() if k != "importances"}
+        else:
+            explanation = mh.explain_model(model, X_model)
+    _record_explanation(usage, time.perf_counter() - explain_start, X_model, explanation_stats)
+
+    with stage("predict"):
+        try:
+            y_pred = model.predict(X_model) if hasattr(model, "predict") else None
+        except Exception:
+            y_pred = None
+
+    if y_pred is not None:
+        with stage("fairness"):
+            if sens_col is not None:
                 try:
-                    fairness_mod = importlib.import_module("ai_core.utils.fairness")
+                    try:
+                        fairness_mod = importlib.import_module("ai_core.utils.fairness")
+                    except Exception:
+                        fairness_mod = importlib.import_module("utils.fairness")
                 except Exception:
-                    fairness_mod = importlib.import_module("utils.fairness")
-            except Exception:
-                fairness_mod = None
-
-            if fairness_mod is not None:
-                metrics = fairness_mod.compute_metrics(y, y_pred, X[sens_col])
-                violations = {}
-                for k, thr in FAIRNESS_THRESHOLDS.items():
-                    v = metrics.get(k)
-                    if v is None:
-                        continue
-                    if abs(v) > thr:
-                        violations[k] = {"value": float(v), "threshold": float(thr)}
-                if violations:
-                    logger.info({"msg": "fairness_violations", "violations": violations, **(log_meta or {})})
-                    raise HTTPException(status_code=400, detail={"msg": "fairness_violation", "violations": violations})
+                    fairness_mod = None
+
+                if fairness_mod is not None:
+                    # The gate keeps compute_metrics' binary (truthy vs falsy) semantics per
+                    # attribute; the full multi-group/intersectional report is stored alongside.
+                    per_attr = {c: fairness_mod.compute_metrics(y, y_pred, X[c]) for c in sens_cols}
+                    gate_mode = os.environ.get("AI_CORE_FAIRNESS_GATE", "point").lower()
+                    if hasattr(fairness_mod, "metric_intervals"):
+                        n_boot = int(os.environ.get("AI_CORE_FAIRNESS_BOOTSTRAP", "1000"))
+                        alpha = float(os.environ.get("AI_CORE_FAIRNESS_CI_ALPHA", "0.05"))
+                        fairness_intervals = {
+                            c: fairness_mod.metric_intervals(y, y_pred, X[c], n_boot=n_boot, alpha=alpha) for c in sens_cols
+                        }
+                    if hasattr(fairness_mod, "evaluate_groups"):
+                        try:
+                            fairness_report = fairness_mod.evaluate_groups(y, y_pred, {c: X[c] for c in sens_cols})
+                        except Exception:
+                            logger.exception("fairness report failed")
+                    violations = {}
+                    for attr, metrics in per_attr.items():
+                        for k, thr in FAIRNESS_THRESHOLDS.items():
+                            v = metrics.get(k)
+                            if v is None:
+                                continue
+                            interval = (fairness_intervals or {}).get(attr, {}).get(k)
+                            # "ci" mode only fails when the whole confidence interval is past the threshold
+                            checked = v
+                            if gate_mode == "ci" and interval is not None:
+                                checked = fairness_mod.interval_bound(interval)
+                                if checked is None:
+                                    continue
+                            if abs(checked) > thr:
+                                key = k if len(per_attr) == 1 else f"{attr}:{k}"
+                                violations[key] = {"value": float(v), "threshold": float(thr), "attribute": attr}
+                                if interval is not None:
+                                    violations[key]["ci"] = [interval["ci_low"], interval["ci_high"]]
+                    if violations:
+                        logger.info({"msg": "fairness_violations", "violations": violations, **(log_meta or {})})
+                        raise HTTPException(status_code=400, detail={"msg": "fairness_violation", "violations": violations})
 
     analysis_doc = {"dataset_name": dataset_name, "summary": {}, "explanation": explanation}
-    aid = _call_store_analysis(db, dataset_name, analysis_doc)
+    if explanation_stats is not None:
+        analysis_doc["explanation_stats"] = explanation_stats
+    if fairness_report is not None:
+        analysis_doc["fairness"] = fairness_report
+    if fairness_intervals is not None:
+        analysis_doc["fairness_intervals"] = fairness_intervals
+    if profile is not None:
+        analysis_doc["data_profile"] = profile.summary()
+    if feature_encoding:
+        analysis_doc["feature_encoding"] = feature_encoding
+    try:
+        analysis_doc["fingerprint"] = _fingerprint.training_fingerprint(X, y)
+    except Exception:
+        pass
+    analysis_doc["pipeline_version"] = PIPELINE_VERSION
+    if cache_key is not None:
+        analysis_doc["cache_key"] = cache_key
+    analysis_doc["resource_usage"] = usage.finish().as_dict()
+    with stage("persist"):
+        aid = _call_store_analysis(db, dataset_name, analysis_doc)
     return aid, analysis_doc.get("summary", {})
 
 
-@router.post("/analyze", response_model=AnalyzeResponse)
-def analyze(req: AnalyzeRequest, request: Request):  # type: ignore
+MAX_ROWS = 100000
+
+
+def _build_frame(req: AnalyzeRequest):
+    """Validate the request payload and return (X, y) for the analysis engine."""
     try:
         ds_mod = importlib.import_module("ai_core.utils.dataset")
     except Exception:
@@ -172,29 +412,377 @@ def analyze(req: AnalyzeRequest, request: Request):  # type: ignore
 
     import pandas as pd
 
-    MAX_ROWS = 100000
-
     if req.data:
-        ok, msg = validate_dataset_mapping(req.data)
-        if not ok:
-            raise HTTPException(status_code=400, detail=f"Invalid data payload: {msg}")
+        with stage("validate"):
+            ok, msg = validate_dataset_mapping(req.data)
+            if not ok:
+                raise HTTPException(status_code=400, detail=invalid_payload_detail(msg))
 
-        # Check for mismatched column lengths
-        if req.data:
+            # Check for mismatched column lengths
             col_lengths = {col: len(values) for col, values in req.data.items()}
             lengths = set(col_lengths.values())
             if len(lengths) > 1:
-                raise HTTPException(status_code=400, detail=f"Mismatched column lengths: {col_lengths}")
+                raise HTTPException(status_code=400, detail=mismatched_lengths_detail(col_lengths))
 
             # Check for oversized payloads
             max_len = max(col_lengths.values()) if col_lengths else 0
             if max_len > MAX_ROWS:
-                raise HTTPException(status_code=400, detail=f"Dataset exceeds maximum rows ({MAX_ROWS}): {max_len} rows provided")
+                raise HTTPException(status_code=400, detail=max_rows_detail(MAX_ROWS, max_len))
 
-        X = pd.DataFrame(req.data)
-        y = X.pop("target") if "target" in X.columns else None
+        with stage("frame"):
+            X = pd.DataFrame(req.data)
+            y = X.pop("target") if "target" in X.columns else None
+        with stage("validate"):
+            _check_frame_values(X)
     else:
-        X, y = ds_mod.generate_bias_demo()
+        with stage("frame"):
+            X, y = ds_mod.generate_bias_demo()
+    return X, y
+
+
+def _analysis_job(dataset_name: str, X, y, explain_budget: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """Job body executed in the worker pool; must stay importable at module level."""
+    try:
+        cache_key = _analysis_key(dataset_name, X, y, explain_budget)
+    except Exception:
+        cache_key = None
+    # Admission is held by the submitting (web) process for the job's lifetime;
+    # a pool worker's own controller would never see the rest of the traffic.
+    try:
+        aid, summary = run_analysis_core(
+            None, X, y, dataset_name, {}, explain_budget=explain_budget, endpoint="analyze_job", cache_key=cache_key
+        )
+    except HTTPException as exc:
+        raise JobFailed(exc.status_code, exc.detail)
+    return {"analysis_id": aid, "summary": summary}
+
+
+def _frame_from_table(X):
+    """Apply the mapping checks to an already-decoded (binary) DataFrame."""
+    with stage("validate"):
+        if X.shape[1] == 0:
+            raise HTTPException(status_code=400, detail=invalid_payload_detail("no columns provided"))
+        for col in X.columns:
+            if not isinstance(col, str) or col.strip() == "":
+                raise HTTPException(status_code=400, detail=invalid_payload_detail(f"invalid column name: {col!r}"))
+        if len(X) > MAX_ROWS:
+            raise HTTPException(status_code=400, detail=max_rows_detail(MAX_ROWS, len(X)))
+        _check_frame_values(X)
+    y = X.pop("target") if "target" in X.columns else None
+    return X, y
+
 
-    aid, summary = run_analysis_core(None, X, y, req.dataset_name, {})
-    return AnalyzeResponse(analysis_id=aid, summary=summary)
+_NESTED_TYPES = (list, tuple, dict, set)
+
+
+def _check_frame_values(X) -> None:
+    """Reject frames the engine cannot analyse: no rows, or nested (list/struct) cells."""
+    if len(X) == 0:
+        raise HTTPException(status_code=400, detail=invalid_payload_detail("no rows provided"))
+    import numpy as np
+
+    for col in X.columns:
+        s = X[col]
+        if s.dtype != object:
+            continue
+        if any(isinstance(v, _NESTED_TYPES) or isinstance(v, np.ndarray) for v in s):
+            raise HTTPException(status_code=400, detail=invalid_payload_detail(f"column {col!r} contains nested values"))
+
+
+def _server_timing_enabled() -> bool:
+    return os.environ.get("AI_CORE_SERVER_TIMING", "1").lower() not in ("0", "false", "no")
+
+
+def _coalesce_enabled() -> bool:
+    return os.environ.get("AI_CORE_ANALYZE_COALESCE", "1").lower() not in ("0", "false", "no")
+
+
+def _analysis_cache_enabled() -> bool:
+    return os.environ.get("AI_CORE_ANALYSIS_CACHE", "0").lower() in ("1", "true", "yes")
+
+
+def _analysis_cache_max_age() -> int:
+    return int(os.environ.get("AI_CORE_ANALYSIS_CACHE_MAX_AGE_SECONDS", str(24 * 3600)))
+
+
+def _analysis_key(dataset_name: str, X, y, explain_budget: Optional[Dict[str, Any]]) -> str:
+    """Identity of an analysis: pipeline version, data, target, dataset name,
+    explanation budget and estimator configuration."""
+    try:
+        mh = importlib.import_module("ai_core.utils.model_helper")
+    except Exception:
+        mh = importlib.import_module("utils.model_helper")
+    estimator = mh._estimator_config() if hasattr(mh, "_estimator_config") else None
+    config = {"dataset_name": dataset_name, "explain_budget": explain_budget, "estimator": estimator}
+    return f"v{PIPELINE_VERSION}:" + _fingerprint.training_fingerprint(X, y, config)
+
+
+# model_helper estimator types -> class names recorded in resource_usage.estimator
+_ESTIMATOR_CLASSES = {"lightgbm": "LGBMClassifier", "xgboost": "XGBClassifier", "logistic_regression": "LogisticRegression"}
+
+
+def _analysis_cost(X):
+    """Admission cost estimate for analysing ``X`` with the configured estimator."""
+    try:
+        try:
+            mh = importlib.import_module("ai_core.utils.model_helper")
+        except Exception:
+            mh = importlib.import_module("utils.model_helper")
+        model_type = mh._estimator_config()[0]
+    except Exception:
+        model_type = None
+    return get_admission_controller().estimate(len(X), X.shape[1], _ESTIMATOR_CLASSES.get(model_type))
+
+
+async def _run_admitted(cost, func, *args, **kwargs):
+    """``run_in_threadpool(func, ...)`` once admission control has room for ``cost``."""
+    if cost is None:
+        return await run_in_threadpool(func, *args, **kwargs)
+    controller = get_admission_controller()
+    with stage("admission"):
+        await controller.acquire(cost)
+    try:
+        return await run_in_threadpool(func, *args, **kwargs)
+    finally:
+        controller.release(cost)
+
+
+async def _find_cached_analysis(cache_key: str) -> Optional[Dict[str, Any]]:
+    try:
+        try:
+            analyze_mod = importlib.import_module("ai_core.routers.analyze")
+        except Exception:
+            analyze_mod = importlib.import_module("routers.analyze")
+        try:
+            p = importlib.import_module("ai_core.utils.persistence")
+        except Exception:
+            p = importlib.import_module("utils.persistence")
+        db = analyze_mod.get_async_db() if hasattr(analyze_mod, "get_async_db") else p.get_async_db()
+        return await p.afind_cached_analysis(db, cache_key, _analysis_cache_max_age())
+    except Exception:
+        logger.exception("analysis cache lookup failed")
+        return None
+
+
+def _fast_json_enabled() -> bool:
+    return os.environ.get("AI_CORE_ANALYZE_FAST_JSON", "0").lower() in ("1", "true", "yes")
+
+
+def _fast_json_frame(body: bytes):
+    """Decode a JSON body without per-cell pydantic validation.
+
+    Returns None when the payload needs the regular path (e.g. for 422s).
+    """
+    import pandas as pd
+
+    try:
+        # decode_analyze_body checks names/lengths/row limits while converting
+        with stage("validate"):
+            fields, columns = fast_json.decode_analyze_body(body, MAX_ROWS)
+            req = AnalyzeRequest.model_validate({**fields, "data": {}})
+    except (fast_json.FastPathUnsupported, ValidationError):
+        return None
+    except fast_json.PayloadError as exc:
+        raise HTTPException(status_code=400, detail=exc.detail)
+    if not columns:
+        return (req,) + _build_frame(req)
+    with stage("frame"):
+        X = pd.DataFrame(columns, copy=False)
+    with stage("validate"):
+        _check_frame_values(X)
+    y = X.pop("target") if "target" in X.columns else None
+    return req, X, y
+
+
+def _parse_json_request(body: bytes) -> AnalyzeRequest:
+    try:
+        return AnalyzeRequest.model_validate_json(body or b"null")
+    except ValidationError as exc:
+        errors = [{**e, "loc": ("body",) + tuple(e.get("loc", ()))} for e in exc.errors(include_url=False)]
+        raise RequestValidationError(errors)
+
+
+def _compact_enabled() -> bool:
+    return os.environ.get("AI_CORE_COMPACT_FRAMES", "1").lower() not in ("0", "false", "no")
+
+
+async def _read_analyze_payload(request: Request):
+    """Return (req, X, y) with X compacted to the narrowest lossless dtypes."""
+    req, X, y = await _decode_analyze_payload(request)
+    if _compact_enabled():
+        with stage("compact"):
+            X = await run_in_threadpool(_performance.optimize_dataframe_memory, X)
+    return req, X, y
+
+
+async def _decode_analyze_payload(request: Request):
+    """Return (req, X, y) from a JSON or columnar binary request body.
+
+    Binary bodies (Arrow IPC, Parquet, NPY) carry the dataset only; the
+    dataset name and explanation budget come from query parameters.
+    """
+    with stage("receive"):
+        body = await request.body()
+    content_type = request.headers.get("content-type")
+    if not is_binary_content_type(content_type):
+        if media_type(content_type) not in ("", "application/json") and not media_type(content_type).endswith("+json"):
+            raise HTTPException(status_code=415, detail=f"Unsupported content type: {media_type(content_type)}")
+        if _fast_json_enabled():
+            parsed = await run_in_threadpool(_fast_json_frame, body)
+            if parsed is not None:
+                return parsed
+        with stage("parse"):
+            req = _parse_json_request(body)
+        X, y = await run_in_threadpool(_build_frame, req)
+        return req, X, y
+
+    params = request.query_params
+    dataset_name = params.get("dataset_name") or request.headers.get("x-dataset-name")
+    if not dataset_name:
+        raise HTTPException(status_code=400, detail="dataset_name query parameter is required for binary payloads")
+    try:
+        req = AnalyzeRequest(
+            dataset_name=dataset_name,
+            data={},
+            explain_max_rows=params.get("explain_max_rows"),
+            explain_max_seconds=params.get("explain_max_seconds"),
+        )
+    except ValidationError as exc:
+        raise RequestValidationError(exc.errors(include_url=False))
+    try:
+        with stage("parse"):
+            X = await run_in_threadpool(decode_frame, body, content_type)
+    except IngestError as exc:
+        raise HTTPException(status_code=exc.status_code, detail=exc.detail)
+    X, y = _frame_from_table(X)
+    return req, X, y
+
+
+_ANALYZE_OPENAPI = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {"schema": {"$ref": "#/components/schemas/AnalyzeRequest"}},
+            ARROW_STREAM: {"schema": {"type": "string", "format": "binary"}},
+            "application/vnd.apache.parquet": {"schema": {"type": "string", "format": "binary"}},
+            "application/x-npy": {"schema": {"type": "string", "format": "binary"}},
+        },
+    }
+}
+
+
+@router.post("/analyze", response_model=AnalyzeResponse, openapi_extra=_ANALYZE_OPENAPI)
+async def analyze(request: Request, response: Response):  # type: ignore
+    start = time.perf_counter()
+    status = "error"
+    with trace() as spans:
+        try:
+            req, X, y = await _read_analyze_payload(request)
+            budget = _explain_budget(req)
+            key = None
+            if _coalesce_enabled() or _analysis_cache_enabled():
+                with stage("fingerprint"):
+                    try:
+                        key = await run_in_threadpool(_analysis_key, req.dataset_name, X, y, budget)
+                    except Exception:
+                        # no identity: analyse without coalescing or the cache
+                        logger.warning("analysis fingerprint failed", exc_info=True)
+            cached = None
+            if key is not None and _analysis_cache_enabled():
+                with stage("cache_lookup"):
+                    cached = await _find_cached_analysis(key)
+            if cached is not None:
+                status = "cached"
+                result = AnalyzeResponse(
+                    analysis_id=str(cached["_id"]),
+                    summary=cached.get("summary") or {},
+                    cached=True,
+                    created_at=cached.get("created_at"),
+                )
+            else:
+                # coalesced followers share the leader's admission instead of queueing
+                cost = _analysis_cost(X) if admission_enabled() else None
+                try:
+                    if key is not None and _coalesce_enabled():
+                        (aid, summary), shared = await _INFLIGHT.ado(
+                            key, _run_admitted, cost, run_analysis_core, None, X, y, req.dataset_name, {},
+                            explain_budget=budget, cache_key=key,
+                        )
+                        status = "coalesced" if shared else "ok"
+                    else:
+                        aid, summary = await _run_admitted(
+                            cost, run_analysis_core, None, X, y, req.dataset_name, {}, explain_budget=budget, cache_key=key
+                        )
+                        status = "ok"
+                except AdmissionRejected as exc:
+                    status = "rejected"
+                    raise HTTPException(
+                        status_code=429,
+                        detail={"msg": "overloaded", "reason": exc.reason},
+                        headers={"Retry-After": str(exc.retry_after)},
+                    )
+                result = AnalyzeResponse(analysis_id=aid, summary=summary)
+        finally:
+            total = time.perf_counter() - start
+            if ai_duration is not None:
+                ai_duration.observe(total)
+            if ai_requests is not None:
+                ai_requests.labels(status=status).inc()
+    if _server_timing_enabled():
+        response.headers["Server-Timing"] = server_timing(spans, total)
+    return result
+
+
+@router.post("/analyze/jobs", response_model=AnalyzeJobResponse, status_code=202, openapi_extra=_ANALYZE_OPENAPI)
+async def submit_analyze_job(request: Request, response: Response):  # type: ignore
+    # Validation runs inline so malformed payloads still get an immediate 400.
+    start = time.perf_counter()
+    with trace() as spans:
+        req, X, y = await _read_analyze_payload(request)
+    if _server_timing_enabled():
+        response.headers["Server-Timing"] = server_timing(spans, time.perf_counter() - start)
+    # Charge the job against this process' admission budget until it finishes.
+    cost = _analysis_cost(X) if admission_enabled() else None
+    controller = get_admission_controller() if cost is not None else None
+    if controller is not None:
+        try:
+            await controller.acquire(cost)
+        except AdmissionRejected as exc:
+            raise HTTPException(
+                status_code=429,
+                detail={"msg": "overloaded", "reason": exc.reason},
+                headers={"Retry-After": str(exc.retry_after)},
+            )
+    try:
+        job_id = get_job_manager().submit(
+            _analysis_job,
+            req.dataset_name,
+            X,
+            y,
+            _explain_budget(req),
+            meta={"dataset_name": req.dataset_name},
+            on_done=(lambda: controller.release(cost)) if controller is not None else None,
+        )
+    except BaseException as exc:
+        if controller is not None:
+            controller.release(cost)
+        if isinstance(exc, JobQueueFull):
+            raise HTTPException(status_code=429, detail=str(exc), headers={"Retry-After": "5"})
+        raise
+    job = get_job_manager().get(job_id) or {"job_id": job_id, "status": "queued"}
+    return AnalyzeJobResponse(job_id=job_id, status=job["status"], submitted_at=job.get("submitted_at"))
+
+
+@router.get("/analyze/jobs/{job_id}", response_model=AnalyzeJobResponse)
+def get_analyze_job(job_id: str):
+    job = get_job_manager().get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail="job not found")
+    return AnalyzeJobResponse(
+        job_id=job_id,
+        status=job["status"],
+        submitted_at=job.get("submitted_at"),
+        finished_at=job.get("finished_at"),
+        result=job.get("result"),
+        error=job.get("error"),
+    )
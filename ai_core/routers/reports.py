@@ -1,13 +1,168 @@
-from fastapi import APIRouter
+"""Stored analysis reports.
+
+``GET /ai_core/reports/{report_id}`` loads one analysis by id, optionally
+restricted to a comma-separated ``fields`` list that becomes a Mongo
+projection. Rendered reports are held in a bounded in-process LRU (keyed by
+id and fields) together with a strong ETag, so a repeat request is answered
+without touching Mongo and a matching ``If-None-Match`` gets a 304.
+
+``GET /ai_core/reports`` lists analyses newest first, optionally for one
+``dataset_name``. Pages use keyset pagination: ``next_cursor`` encodes the
+(created_at, id) of the last item, so each page is a single scan of the
+(dataset_name, created_at, _id) index however deep the caller pages.
+
+Configuration (environment):
+- AI_CORE_REPORT_CACHE_ENTRIES (default 256; 0 disables the cache)
+- AI_CORE_REPORT_CACHE_TTL_SECONDS (default 300)
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
+
+try:
+    from ai_core.utils.lazy import import_first, lazy_util
+except Exception:
+    from utils.lazy import import_first, lazy_util  # type: ignore
+
+_performance = lazy_util("performance")
 
 router = APIRouter(prefix="/ai_core")
 
+# Top-level fields of a stored analysis document that callers may project.
+REPORT_FIELDS = (
+    "dataset_name",
+    "created_at",
+    "pipeline_version",
+    "summary",
+    "explanation",
+    "explanation_stats",
+    "fairness",
+    "fairness_intervals",
+    "data_profile",
+    "feature_encoding",
+    "fingerprint",
+    "resource_usage",
+)
+LISTING_FIELDS = ("dataset_name", "created_at", "pipeline_version", "summary")
+MAX_PAGE_SIZE = 200
+
+_CACHE: Optional[Any] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def _persistence():
+    return import_first("ai_core.utils.persistence", "utils.persistence")
+
+
+def report_cache():
+    """Process-wide LRU of rendered reports: (id, fields) -> (body, etag)."""
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = _performance.LRUCache(
+                    max_entries=int(os.environ.get("AI_CORE_REPORT_CACHE_ENTRIES", "256")),
+                    ttl_seconds=float(os.environ.get("AI_CORE_REPORT_CACHE_TTL_SECONDS", "300")),
+                )
+    return _CACHE
+
+
+def _parse_fields(fields: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if not fields:
+        return None
+    names = tuple(sorted({f.strip() for f in fields.split(",") if f.strip()}))
+    unknown = [f for f in names if f not in REPORT_FIELDS]
+    if unknown:
+        raise HTTPException(status_code=400, detail={"msg": "unknown_fields", "fields": unknown, "allowed": list(REPORT_FIELDS)})
+    return names or None
+
+
+def _projection(fields: Optional[Tuple[str, ...]]) -> Optional[Dict[str, int]]:
+    if fields is None:
+        return None
+    return {f: 1 for f in fields}
+
+
+def _render(doc: Dict[str, Any]) -> Dict[str, Any]:
+    body = {k: v for k, v in doc.items() if k != "_id"}
+    body["report_id"] = str(doc.get("_id"))
+    return body
+
+
+def _etag(body: Dict[str, Any]) -> str:
+    canonical = json.dumps(body, sort_keys=True, separators=(",", ":"), default=str)
+    return '"' + hashlib.sha256(canonical.encode("utf-8")).hexdigest()[:32] + '"'
+
+
+def _etag_matches(header: Optional[str], etag: str) -> bool:
+    if not header:
+        return False
+    tags = [t.strip() for t in header.split(",")]
+    return "*" in tags or etag in tags or f"W/{etag}" in tags
+
+
+def _get_db():
+    db = _persistence().get_db()
+    if db is None:
+        raise HTTPException(status_code=503, detail={"msg": "report_store_unavailable"})
+    return db
+
 
 @router.get("/reports/{report_id}")
-def get_report(report_id: str):
-    # Return a mock report
-    return {
-        "report_id": report_id,
-        "status": "available",
-        "summary": {"demographic_parity": 0.95},
-    }
+def get_report(report_id: str, request: Request, fields: Optional[str] = Query(None)):
+    selected = _parse_fields(fields)
+    key = (report_id, selected)
+    cache = report_cache()
+    cached = cache.get(key)
+    if cached is None:
+        doc = _persistence().get_analysis(_get_db(), report_id, _projection(selected))
+        if doc is None:
+            raise HTTPException(status_code=404, detail={"msg": "report_not_found", "report_id": report_id})
+        body = json.loads(json.dumps(_render(doc), default=str))
+        cached = (body, _etag(body))
+        cache.set(key, cached)
+    body, etag = cached
+    headers = {"ETag": etag, "Cache-Control": "private, max-age=0, must-revalidate"}
+    if _etag_matches(request.headers.get("if-none-match"), etag):
+        return Response(status_code=304, headers=headers)
+    return JSONResponse(body, headers=headers)
+
+
+def _encode_cursor(doc: Dict[str, Any]) -> str:
+    return f"{int(doc.get('created_at') or 0)}:{doc.get('_id')}"
+
+
+def _decode_cursor(cursor: str) -> Tuple[int, str]:
+    created_at, sep, last_id = cursor.partition(":")
+    try:
+        if not sep or not last_id:
+            raise ValueError(cursor)
+        return int(created_at), last_id
+    except ValueError:
+        raise HTTPException(status_code=400, detail={"msg": "invalid_cursor", "cursor": cursor})
+
+
+@router.get("/reports")
+def list_reports(
+    dataset_name: Optional[str] = Query(None),
+    limit: int = Query(50, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = Query(None),
+):
+    after = _decode_cursor(cursor) if cursor else None
+    docs = _persistence().list_analyses(
+        _get_db(),
+        dataset_name=dataset_name,
+        limit=limit,
+        after=after,
+        projection={f: 1 for f in LISTING_FIELDS},
+    )
+    items = [json.loads(json.dumps(_render(d), default=str)) for d in docs]
+    next_cursor = _encode_cursor(docs[-1]) if len(docs) == limit else None
+    return {"items": items, "next_cursor": next_cursor}
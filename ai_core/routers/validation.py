@@ -8,19 +8,19 @@ from pydantic import BaseModel, Field
 from typing import Optional, Dict, Any, List
 import logging
 
-# Import validation components (with fallback for direct execution)
+# Validation components are loaded on first use so importing the app stays fast.
 try:
-    # Package-relative imports
-    from ..synthetic.generator import generate_synthetic_cases, get_dataset_stats  # type: ignore[reportMissingImports]
-    from ..validation.validator import run_validation, extract_validation_summary  # type: ignore[reportMissingImports]
-    from ..validation.metrics import calculate_all_metrics  # type: ignore[reportMissingImports]
-    from ..validation.report import generate_validation_report  # type: ignore[reportMissingImports]
+    from ..utils.accounting import ResourceUsage  # type: ignore[reportMissingImports]
+    from ..utils.lazy import lazy_module  # type: ignore[reportMissingImports]
 except ImportError:
     # Fallback for direct execution (Docker)
-    from synthetic.generator import generate_synthetic_cases, get_dataset_stats  # type: ignore[reportMissingImports]
-    from validation.validator import run_validation, extract_validation_summary  # type: ignore[reportMissingImports]
-    from validation.metrics import calculate_all_metrics  # type: ignore[reportMissingImports]
-    from validation.report import generate_validation_report  # type: ignore[reportMissingImports]
+    from utils.accounting import ResourceUsage  # type: ignore[reportMissingImports]
+    from utils.lazy import lazy_module  # type: ignore[reportMissingImports]
+
+_generator = lazy_module("ai_core.synthetic.generator", "synthetic.generator")
+_validator = lazy_module("ai_core.validation.validator", "validation.validator")
+_metrics = lazy_module("ai_core.validation.metrics", "validation.metrics")
+_report = lazy_module("ai_core.validation.report", "validation.report")
 
 logger = logging.getLogger(__name__)
 router = APIRouter()
@@ -50,6 +50,11 @@ class ValidateModelResponse(BaseModel):
     report_html: Optional[str] = None
 
 
+def _count_input_fields(case: Dict[str, Any]) -> int:
+    """Number of leaf input fields in a synthetic case (for rows x features accounting)."""
+    return sum(_count_input_fields(v) if isinstance(v, dict) else 1 for v in case.values())
+
+
 @router.post("/validate-model", response_model=ValidateModelResponse)
 async def validate_model(request: ValidateModelRequest):
     """
@@ -60,16 +65,19 @@ async def validate_model(request: ValidateModelRequest):
     4. Generate validation report
     5. Return summary
     """
+    usage = ResourceUsage(endpoint="validate", estimator="rule_based").start()
     try:
         logger.info(f"Starting model validation: {request.model_name} v{request.model_version}")
 
         # Step 1: Generate synthetic dataset
         logger.info(f"Generating {request.num_synthetic_cases} synthetic test cases...")
-        synthetic_cases = generate_synthetic_cases(
+        synthetic_cases = _generator.generate_synthetic_cases(
             count=request.num_synthetic_cases,
             include_edge_cases=request.include_edge_cases
         )
-        dataset_stats = get_dataset_stats(synthetic_cases)
+        dataset_stats = _generator.get_dataset_stats(synthetic_cases)
+        usage.n_rows = len(synthetic_cases)
+        usage.n_features = _count_input_fields(synthetic_cases[0]) if synthetic_cases else 0
 
         # Step 2: Run evaluations through model
         logger.info("Running evaluations through model...")
@@ -148,13 +156,13 @@ async def validate_model(request: ValidateModelRequest):
                 "triggered_rules": rules,
             }
 
-        validation_result = run_validation(
+        validation_result = _validator.run_validation(
             model_func=model_eval_func,
             synthetic_cases=synthetic_cases,
             include_stability_test=request.include_stability_test
         )
 
-        validation_summary = extract_validation_summary(validation_result["results"])
+        validation_summary = _validator.extract_validation_summary(validation_result["results"])
 
         # Step 3: Compute fairness metrics
         logger.info("Computing fairness metrics...")
@@ -189,7 +197,7 @@ async def validate_model(request: ValidateModelRequest):
                     }
                 })
 
-        all_metrics = calculate_all_metrics(
+        all_metrics = _metrics.calculate_all_metrics(
             results=results_for_metrics,
             results_noisy=noisy_for_metrics
         )
@@ -216,7 +224,7 @@ async def validate_model(request: ValidateModelRequest):
             "description": request.model_description or "Ethical AI model for loan decision analysis",
         }
 
-        report = generate_validation_report(
+        report = _report.generate_validation_report(
             model_metadata=model_metadata,
             synthetic_stats=dataset_stats,
             metrics=metrics_for_report,
@@ -226,6 +234,8 @@ async def validate_model(request: ValidateModelRequest):
 
         logger.info(f"Validation complete: status={report['status']}, score={report['overall_score']:.1f}")
 
+        report["report_json"]["resource_usage"] = usage.finish().as_dict()
+
         # Step 5: Return summary
         return ValidateModelResponse(
             report_id=report["report_json"]["report_id"],
@@ -245,6 +255,7 @@ async def validate_model(request: ValidateModelRequest):
         )
 
     except Exception as e:
+        usage.finish()
         logger.error(f"Model validation failed: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"Model validation failed: {str(e)}")
 
@@ -0,0 +1,5 @@
+# Some test modules inject fake helper modules into sys.modules while they are
+# collected. The app no longer imports persistence eagerly, so bind the real
+# module to the ai_core.utils package up front; tests that do
+# `from ai_core.utils import persistence` then get the real implementation.
+import ai_core.utils.persistence  # noqa: F401
@@ -0,0 +1,60 @@
+import numpy as np
+import pandas as pd
+
+from ai_core.utils import accounting
+
+
+def test_track_measures_and_collects_notes():
+    with accounting.track("unit", n_rows=1000, n_features=4) as usage:
+        accounting.note(explainer="coefficients", _finished=True, unknown="ignored")
+        np.sort(np.random.default_rng(0).random(200_000))
+    assert accounting.current_usage() is None
+    doc = usage.as_dict()
+    assert doc["explainer"] == "coefficients"
+    assert doc["row_features"] == 4000
+    assert doc["wall_seconds"] > 0 and doc["cpu_seconds"] >= 0
+    assert doc["cpu_seconds_per_row_feature"] == doc["cpu_seconds"] / 4000
+    assert not any(k.startswith("_") for k in doc)
+
+
+def test_finish_is_idempotent_and_note_outside_is_noop():
+    accounting.note(explainer="x")  # no active request
+    with accounting.track("unit") as usage:
+        first = usage.finish().wall_seconds
+    assert usage.wall_seconds == first
+    assert usage.cpu_seconds_per_row_feature is None
+
+
+def test_tracemalloc_peak_is_optional(monkeypatch):
+    monkeypatch.setenv("AI_CORE_ACCOUNTING_TRACEMALLOC", "1")
+    try:
+        with accounting.track("unit") as usage:
+            buf = bytearray(4_000_000)
+            del buf
+        assert usage.peak_traced_bytes >= 4_000_000
+    finally:
+        accounting.tracemalloc.stop()
+
+
+def test_describe_estimator_uses_final_pipeline_step():
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    assert accounting.describe_estimator(make_pipeline(StandardScaler(), LogisticRegression())) == "LogisticRegression"
+    assert accounting.describe_estimator(LogisticRegression()) == "LogisticRegression"
+
+
+def test_analysis_document_carries_resource_usage(monkeypatch):
+    from ai_core.routers import analyze_impl
+
+    stored = {}
+    monkeypatch.setattr(analyze_impl, "_call_store_analysis", lambda db, name, doc: stored.setdefault("doc", doc) and "acct-1")
+    X = pd.DataFrame({"a": np.arange(40.0), "b": np.arange(40.0) % 7})
+    y = pd.Series(np.arange(40) % 2)
+    aid, _ = analyze_impl.run_analysis_core(None, X, y, "acct")
+    assert aid == "acct-1"
+    usage = stored["doc"]["resource_usage"]
+    assert usage["endpoint"] == "analyze"
+    assert (usage["n_rows"], usage["n_features"]) == (40, 2)
+    assert usage["estimator"] and "explainer" in usage
@@ -0,0 +1,115 @@
+import asyncio
+import threading
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core.utils import admission
+from ai_core.utils.admission import AdmissionController, AdmissionRejected, Cost, CostModel
+
+
+def _usage(rows, features, cpu, estimator="LogisticRegression", explainer="linear", peak=None):
+    return {"n_rows": rows, "n_features": features, "cpu_seconds": cpu, "estimator": estimator,
+            "explainer": explainer, "peak_rss_delta_bytes": peak}
+
+
+def test_cost_model_learns_rates_from_history():
+    model = CostModel(cpu_per_cell=1e-6, bytes_per_cell=8.0, min_cpu_seconds=0.0)
+    assert model.estimate(1000, 10) == Cost(0.01, 80000.0)  # priors until there is history
+    n = model.calibrate([
+        _usage(1000, 10, 0.1, peak=1_000_000),
+        _usage(1000, 10, 0.3, explainer="shap:KernelExplainer"),
+        {"n_rows": 0, "n_features": 3, "cpu_seconds": 1.0},
+        None,
+    ])
+    assert n == 2
+    cost = model.estimate(2000, 10, "LogisticRegression")
+    assert cost.cpu_seconds == pytest.approx(0.6)  # the most expensive explainer seen
+    assert cost.memory_bytes == pytest.approx(2_000_000)
+    # unseen estimators fall back to every measurement
+    assert model.estimate(2000, 10, "LGBMClassifier").cpu_seconds == pytest.approx(0.6)
+
+
+def test_concurrent_cpu_is_bounded_by_the_analysis_threads():
+    model = CostModel(min_cpu_seconds=0.0)
+    model.observe({**_usage(100, 10, 8.0), "wall_seconds": 1.0, "threads": 2})
+    assert model.estimate(100, 10).cpu_seconds == pytest.approx(2.0)
+
+
+def test_cached_explanations_do_not_calibrate():
+    model = CostModel(min_cpu_seconds=0.0)
+    assert not model.observe(_usage(1000, 10, 0.001, explainer="cache:l1"))
+    assert model.calibrate([_usage(1000, 10, 0.002, explainer="cache:l2")]) == 0
+    assert model.estimate(1000, 10) == CostModel(min_cpu_seconds=0.0).estimate(1000, 10)
+
+
+def test_requests_wait_and_are_shed_when_full_or_late():
+    ctl = AdmissionController(cpu_budget=1.0, max_queue=1, max_wait=0.05, cores=2)
+    big, small = Cost(0.8, 0), Cost(0.5, 0)
+    ctl.acquire_sync(big)
+    with pytest.raises(AdmissionRejected) as timeout:
+        ctl.acquire_sync(small)
+    assert timeout.value.reason == "timeout" and timeout.value.retry_after == 1
+
+    admitted = []
+    waiter = threading.Thread(target=lambda: (ctl.acquire_sync(small, timeout=5), admitted.append(1)))
+    waiter.start()
+    while ctl.stats()["queued"] == 0:
+        time.sleep(0.005)
+    with pytest.raises(AdmissionRejected) as full:
+        ctl.acquire_sync(small)
+    assert full.value.reason == "queue_full"
+    ctl.release(big)
+    waiter.join(5)
+    assert admitted == [1] and ctl.stats()["running"] == 1
+    ctl.release(small)
+    assert ctl.stats() == {"running": 0, "queued": 0, "cpu_seconds": 0.0, "memory_bytes": 0.0}
+
+
+def test_memory_budget_and_oversized_requests():
+    ctl = AdmissionController(cpu_budget=100.0, memory_budget=1000, max_queue=0)
+    huge = Cost(500.0, 5000)
+    ctl.acquire_sync(huge)  # larger than the budget, but nothing else is running
+    with pytest.raises(AdmissionRejected):
+        ctl.acquire_sync(Cost(0.1, 10))
+    ctl.release(huge)
+    with ctl.admitted(Cost(0.1, 600)):
+        with pytest.raises(AdmissionRejected):
+            ctl.acquire_sync(Cost(0.1, 600))
+
+
+def test_async_waiter_is_admitted_on_release():
+    ctl = AdmissionController(cpu_budget=1.0, max_wait=5)
+    first = Cost(1.0, 0)
+
+    async def main():
+        await ctl.acquire(first)
+        asyncio.get_running_loop().call_later(0.05, ctl.release, first)
+        started = time.perf_counter()
+        await ctl.acquire(Cost(1.0, 0))
+        return time.perf_counter() - started
+
+    assert asyncio.run(main()) >= 0.04
+    assert ctl.stats()["running"] == 1
+
+
+def test_analyze_sheds_load_with_retry_after(monkeypatch):
+    from ai_core.main import app
+
+    ctl = AdmissionController(cpu_budget=1.0, max_queue=0, cores=1)
+    monkeypatch.setattr(admission, "_CONTROLLER", ctl)
+    busy = Cost(3.0, 0)
+    ctl.acquire_sync(busy)
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "adm-1")
+    payload = {"dataset_name": "shed", "data": {"income": [float(i) for i in range(20)], "tenure": [float(i % 7) for i in range(20)]}}
+    client = TestClient(app)
+
+    res = client.post("/ai_core/analyze", json=payload)
+    assert res.status_code == 429
+    assert res.headers["retry-after"] == "3"
+    assert res.json()["detail"] == {"msg": "overloaded", "reason": "queue_full"}
+
+    ctl.release(busy)
+    assert client.post("/ai_core/analyze", json=payload).status_code == 200
+    assert ctl.model.rates("LogisticRegression") != (ctl.model.cpu_per_cell, ctl.model.bytes_per_cell)
@@ -0,0 +1,84 @@
+import sys
+import time
+
+from fastapi.testclient import TestClient
+
+from ai_core.main import app
+from ai_core.utils import persistence
+
+
+class FakeAnalyses:
+    def __init__(self):
+        self.docs = []
+        self.queries = []
+        self.indexes = []
+
+    def insert_one(self, doc):
+        doc = dict(doc, _id=f"oid-{len(self.docs) + 1}")
+        self.docs.append(doc)
+        return type("Res", (), {"inserted_id": doc["_id"]})()
+
+    def find_one(self, query, projection=None, sort=None):
+        self.queries.append((query, projection, sort))
+        hits = [d for d in self.docs if d.get("cache_key") == query["cache_key"] and d["created_at"] >= query["created_at"]["$gte"]]
+        hits.sort(key=lambda d: d["created_at"], reverse=True)
+        return {k: hits[0][k] for k in projection if k in hits[0]} if hits else None
+
+    def create_index(self, keys, **kwargs):
+        self.indexes.append(tuple(keys))
+
+
+class FakeDB:
+    def __init__(self):
+        self.analyses = FakeAnalyses()
+
+    def get_collection(self, name):
+        assert name == "analyses"
+        return self.analyses
+
+
+def test_find_cached_analysis_respects_freshness_window():
+    db = FakeDB()
+    now = int(time.time())
+    db.analyses.docs = [
+        {"_id": "old", "cache_key": "k", "created_at": now - 7200, "summary": {}},
+        {"_id": "new", "cache_key": "k", "created_at": now - 60, "summary": {"x": 1.0}},
+    ]
+    assert persistence.find_cached_analysis(db, "k", 3600)["_id"] == "new"
+    assert persistence.find_cached_analysis(db, "k", 30) is None
+    assert persistence.find_cached_analysis(db, "other", 3600) is None
+    query, projection, sort = db.analyses.queries[0]
+    assert sort == [("created_at", -1)] and "explanation" not in projection
+    persistence.ensure_analysis_cache_index(db)
+    assert db.analyses.indexes == [(("cache_key", 1), ("created_at", -1))]
+
+
+def test_repeat_analysis_is_served_from_cache(monkeypatch):
+    db = FakeDB()
+    monkeypatch.setenv("AI_CORE_ANALYSIS_CACHE", "1")
+    monkeypatch.setitem(sys.modules, "ai_core.utils.persistence", persistence)
+    monkeypatch.setattr("ai_core.routers.analyze.get_db", lambda: db, raising=False)
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", persistence.store_analysis)
+    client = TestClient(app)
+    payload = {"dataset_name": "repeat", "data": {"a": [1, 2, 3, 4, 5, 6], "b": [3, 1, 4, 1, 5, 9]}}
+
+    first = client.post("/ai_core/analyze", json=payload).json()
+    assert first["cached"] is False
+    stored = db.analyses.docs[0]
+    assert stored["cache_key"].startswith("v") and stored["pipeline_version"]
+
+    second = client.post("/ai_core/analyze", json=payload).json()
+    assert second["cached"] is True
+    assert second["analysis_id"] == first["analysis_id"]
+    assert second["created_at"] == stored["created_at"]
+    assert len(db.analyses.docs) == 1
+
+    changed = client.post("/ai_core/analyze", json={**payload, "data": {**payload["data"], "b": [3, 1, 4, 1, 5, 8]}}).json()
+    assert changed["cached"] is False and len(db.analyses.docs) == 2
+
+
+def test_cache_is_opt_in(monkeypatch):
+    from ai_core.routers import analyze_impl
+
+    monkeypatch.delenv("AI_CORE_ANALYSIS_CACHE", raising=False)
+    assert not analyze_impl._analysis_cache_enabled()
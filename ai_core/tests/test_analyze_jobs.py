@@ -0,0 +1,115 @@
+import time
+
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core.main import app
+from ai_core.utils import jobs
+
+client = TestClient(app)
+
+
+@pytest.fixture
+def thread_jobs():
+    # Thread executor keeps monkeypatched modules visible to the job body.
+    jobs.reset_job_manager(jobs.JobManager(max_workers=1, max_queue=1, executor="thread"))
+    yield jobs.get_job_manager()
+    jobs.reset_job_manager()
+
+
+def _wait(job_id, timeout=30.0):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        body = client.get(f"/ai_core/analyze/jobs/{job_id}").json()
+        if body["status"] in ("succeeded", "failed"):
+            return body
+        time.sleep(0.05)
+    raise AssertionError("job did not finish")
+
+
+def test_submit_and_poll_job(monkeypatch, thread_jobs):
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "job-analysis-1")
+    payload = {"dataset_name": "jobs", "data": {"a": [1, 2, 3, 4], "b": [4, 3, 2, 1]}}
+    r = client.post("/ai_core/analyze/jobs", json=payload)
+    assert r.status_code == 202
+    body = _wait(r.json()["job_id"])
+    assert body["status"] == "succeeded"
+    assert body["result"]["analysis_id"] == "job-analysis-1"
+
+
+def test_job_validation_errors_are_immediate(thread_jobs):
+    payload = {"dataset_name": "bad", "data": {"a": [1, 2, 3], "b": [1, 2]}}
+    r = client.post("/ai_core/analyze/jobs", json=payload)
+    assert r.status_code == 400
+
+
+def test_unknown_job_returns_404():
+    assert client.get("/ai_core/analyze/jobs/does-not-exist").status_code == 404
+
+
+def test_job_manager_rejects_when_queue_full():
+    import threading
+
+    gate = threading.Event()
+    manager = jobs.JobManager(max_workers=1, max_queue=0, executor="thread")
+    try:
+        first = manager.submit(gate.wait, 5)
+        with pytest.raises(jobs.JobQueueFull):
+            manager.submit(gate.wait, 5)
+        gate.set()
+        deadline = time.time() + 5
+        while manager.get(first)["status"] != "succeeded" and time.time() < deadline:
+            time.sleep(0.01)
+        assert manager.get(first)["status"] == "succeeded"
+    finally:
+        gate.set()
+        manager.shutdown()
+
+
+def test_job_failed_carries_status_code():
+    def boom():
+        raise jobs.JobFailed(400, {"msg": "fairness_violation"})
+
+    manager = jobs.JobManager(max_workers=1, max_queue=0, executor="thread")
+    try:
+        jid = manager.submit(boom)
+        deadline = time.time() + 5
+        while manager.get(jid)["status"] not in ("failed", "succeeded") and time.time() < deadline:
+            time.sleep(0.01)
+        job = manager.get(jid)
+        assert job["status"] == "failed"
+        assert job["error"]["status_code"] == 400
+    finally:
+        manager.shutdown()
+
+
+def test_jobs_hold_admission_in_the_submitting_process(monkeypatch, thread_jobs):
+    import threading
+
+    from ai_core.routers import analyze_impl
+    from ai_core.utils import admission
+    from ai_core.utils.admission import AdmissionController, Cost
+
+    ctl = AdmissionController(cpu_budget=1.0, max_queue=0, cores=1)
+    monkeypatch.setattr(admission, "_CONTROLLER", ctl)
+    monkeypatch.setattr(analyze_impl, "_analysis_cost", lambda X: Cost(0.6, 0))
+    gate = threading.Event()
+
+    def slow_analysis(*args, **kwargs):
+        gate.wait(5)
+        return "held-1", {}
+
+    monkeypatch.setattr(analyze_impl, "run_analysis_core", slow_analysis)
+    payload = {"dataset_name": "held", "data": {"a": [1, 2, 3, 4], "b": [4, 3, 2, 1]}}
+    r = client.post("/ai_core/analyze/jobs", json=payload)
+    assert r.status_code == 202
+    assert ctl.stats()["running"] == 1
+    # the running job's cost leaves no room for a second one
+    shed = client.post("/ai_core/analyze/jobs", json=payload)
+    assert shed.status_code == 429 and shed.json()["detail"]["reason"] == "queue_full"
+    gate.set()
+    assert _wait(r.json()["job_id"])["status"] == "succeeded"
+    deadline = time.time() + 5
+    while ctl.stats()["running"] and time.time() < deadline:
+        time.sleep(0.01)
+    assert ctl.stats()["running"] == 0
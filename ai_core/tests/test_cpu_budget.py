@@ -0,0 +1,130 @@
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+from ai_core.utils import cpu_budget
+from ai_core.utils.cpu_budget import CpuBudget, current_threads
+
+
+class _Limiter:
+    def __init__(self):
+        self.calls = []
+
+    def limit(self, threads, user_api=None):
+        self.calls.append((threads, user_api))
+        return (threads, user_api)
+
+    def restore(self, handle):
+        self.calls.append(("restore", handle))
+
+
+def _wait_for(cond):
+    deadline = time.monotonic() + 5
+    while not cond():
+        assert time.monotonic() < deadline
+        time.sleep(0.005)
+
+
+def test_lease_limits_and_restores_thread_pools():
+    limiter = _Limiter()
+    budget = CpuBudget(8, limiter=limiter)
+    assert budget.quota() == 8
+    with budget.lease() as first:
+        assert first == 8 and current_threads() == 8
+        with budget.lease() as nested:  # same analysis: no extra tokens
+            assert nested == 8 and budget.free() == 0
+    assert budget.active() == 0 and budget.free() == 8 and current_threads() is None
+    assert limiter.calls == [(8, "blas"), (8, "openmp"), ("restore", (8, "openmp")), (8, "blas")]
+
+
+def test_leases_never_exceed_the_core_tokens():
+    budget = CpuBudget(4, limiter=_Limiter())
+    seen, releases = [], [threading.Event() for _ in range(3)]
+
+    def work(release):
+        with budget.lease() as threads:
+            seen.append(threads)
+            release.wait()
+
+    workers = [threading.Thread(target=work, args=(r,)) for r in releases]
+    workers[0].start()
+    _wait_for(lambda: seen == [4])
+    workers[1].start()
+    workers[2].start()
+    _wait_for(lambda: budget.active() == 3)
+    assert seen == [4]  # no tokens left: later arrivals wait
+    releases[0].set()
+    _wait_for(lambda: len(seen) == 3)
+    assert seen[1:] == [2, 2] and budget.free() == 0
+    for r in releases:
+        r.set()
+    for w in workers:
+        w.join()
+    assert budget.active() == 0 and budget.free() == 4
+
+
+def test_quota_never_drops_below_min_threads():
+    budget = CpuBudget(5, min_threads=2, limiter=_Limiter())
+    seen, releases = [], [threading.Event() for _ in range(4)]
+
+    def work(release):
+        with budget.lease() as threads:
+            seen.append(threads)
+            release.wait()
+
+    workers = [threading.Thread(target=work, args=(r,)) for r in releases]
+    workers[0].start()
+    _wait_for(lambda: seen == [5])
+    for w in workers[1:]:
+        w.start()
+    _wait_for(lambda: budget.active() == 4)
+    releases[0].set()
+    _wait_for(lambda: len(seen) == 3 and budget.active() == 3)
+    # 5 // 3 would be 1; two leases of 2 leave one token, so the third waits
+    assert seen[1:] == [2, 2] and budget.free() == 1
+    for r in releases:
+        r.set()
+    for w in workers:
+        w.join()
+    assert len(seen) == 4 and min(seen) >= 2 and budget.free() == 5
+
+
+def test_cpu_lease_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("AI_CORE_CPU_BUDGET", "0")
+    with cpu_budget.cpu_lease() as threads:
+        assert threads is None and current_threads() is None
+
+
+def test_estimators_get_the_quota_as_n_jobs(monkeypatch):
+    from ai_core.utils.model_helper import _thread_params
+
+    monkeypatch.setattr(cpu_budget, "_BUDGET", CpuBudget(6, limiter=_Limiter()))
+    params = {"n_estimators": 10}
+    assert _thread_params(params) == params
+    with cpu_budget.cpu_lease():
+        assert _thread_params(params) == {"n_estimators": 10, "n_jobs": 6}
+
+
+def test_analysis_records_its_thread_quota(monkeypatch):
+    from ai_core.routers import analyze_impl
+
+    monkeypatch.setattr(cpu_budget, "_BUDGET", CpuBudget(3, limiter=_Limiter()))
+    X = pd.DataFrame({"a": np.arange(40, dtype=float), "b": np.arange(40, dtype=float) % 3})
+    y = pd.Series(np.arange(40) % 2)
+    stored = {}
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: stored.setdefault("doc", doc) and "cpu-1")
+    analyze_impl.run_analysis_core(None, X, y, "cpu")
+    assert stored["doc"]["resource_usage"]["threads"] == 3
+
+
+def test_available_cores_are_shared_with_job_pool_processes(monkeypatch):
+    monkeypatch.setattr(cpu_budget.os, "sched_getaffinity", lambda pid: set(range(16)), raising=False)
+    monkeypatch.setattr(cpu_budget, "_cgroup_cpu_limit", lambda: None)
+    monkeypatch.setenv("WEB_CONCURRENCY", "2")
+    monkeypatch.setenv("AI_CORE_JOB_WORKERS", "3")
+    monkeypatch.delenv("AI_CORE_JOB_EXECUTOR", raising=False)
+    assert cpu_budget.available_cores() == 2  # 2 web workers x (1 + 3 job processes)
+    monkeypatch.setenv("AI_CORE_JOB_EXECUTOR", "thread")  # jobs share the web process' budget
+    assert cpu_budget.available_cores() == 8
@@ -32,3 +32,131 @@ def test_validate_against_thresholds():
     thr = {"demographic_parity_difference": 0.1}
     v = validate_against_thresholds(metrics, thr)
     assert "demographic_parity_difference" in v
+
+
+def test_confusion_tensor_counts():
+    from ai_core.utils.fairness import confusion_tensor
+
+    y = np.array([1, 1, 0, 0, 1, 0])
+    yhat = np.array([1, 0, 1, 0, 1, 1])
+    codes = np.array([0, 0, 0, 0, 1, 1])
+    t = confusion_tensor(y, yhat, codes, 2)
+    # columns are TP, FP, TN, FN
+    assert t.tolist() == [[1, 1, 1, 1], [1, 1, 0, 0]]
+
+
+def test_compute_metrics_keeps_binary_semantics():
+    y = np.array([1, 1, 1, 1, 0, 0])
+    yhat = np.array([1, 1, 0, 0, 1, 0])
+    s = np.array([0, 0, 1, 1, 0, 1])
+    m = compute_metrics(y, yhat, s)
+    assert m["demographic_parity_difference"] == demographic_parity_difference(yhat, s)
+    assert m["equal_opportunity_difference"] == equal_opportunity_difference(y, yhat, s)
+    assert np.isclose(m["equal_opportunity_difference"], -1.0)
+    assert m["disparate_impact_ratio"] == 0.0
+
+
+def test_evaluate_groups_attributes_and_intersections():
+    from ai_core.utils.fairness import evaluate_groups
+
+    rng = np.random.default_rng(1)
+    n = 400
+    sex = rng.choice(["F", "M"], size=n)
+    race = rng.choice(["a", "b", "c"], size=n)
+    y = rng.integers(0, 2, size=n)
+    yhat = rng.integers(0, 2, size=n)
+    report = evaluate_groups(y, yhat, {"sex": sex, "race": race})
+
+    sex_groups = report["attributes"]["sex"]["groups"]
+    assert sex_groups["F"]["n"] == int((sex == "F").sum())
+    assert np.isclose(sex_groups["M"]["selection_rate"], yhat[sex == "M"].mean())
+    dpd = report["attributes"]["sex"]["metrics"]["demographic_parity_difference"]
+    assert np.isclose(dpd, yhat[sex == "M"].mean() - yhat[sex == "F"].mean())
+
+    rates = [yhat[race == g].mean() for g in "abc"]
+    race_m = report["attributes"]["race"]["metrics"]
+    assert np.isclose(race_m["demographic_parity_difference"], max(rates) - min(rates))
+    assert np.isclose(race_m["disparate_impact_ratio"], min(rates) / max(rates))
+
+    cell = report["intersections"]["sex&race"]["groups"]["F & b"]
+    mask = (sex == "F") & (race == "b") & (y == 1)
+    assert np.isclose(cell["tpr"], yhat[mask].mean())
+
+
+def test_bootstrap_intervals_cover_point_estimate():
+    from ai_core.utils.fairness import metric_intervals
+
+    rng = np.random.default_rng(2)
+    n = 2000
+    s = rng.integers(0, 2, size=n)
+    y = rng.integers(0, 2, size=n)
+    yhat = (rng.random(n) < np.where(s == 1, 0.6, 0.4)).astype(int)
+    iv = metric_intervals(y, yhat, s, n_boot=2000)
+    point = compute_metrics(y, yhat, s)
+    dp = iv["demographic_parity_difference"]
+    assert np.isclose(dp["value"], point["demographic_parity_difference"])
+    assert dp["ci_low"] < dp["value"] < dp["ci_high"]
+    assert 0.1 < dp["ci_low"] and dp["ci_high"] < 0.3
+
+
+def test_bootstrap_keeps_small_groups_in_every_replicate():
+    from ai_core.utils.fairness import bootstrap_intervals, confusion_tensor
+
+    s = np.array([1] + [0] * 199)
+    y = np.array([1] * 100 + [0] * 100)
+    yhat = np.array([1] + [1, 0] * 99 + [0])
+    iv = bootstrap_intervals(confusion_tensor(y, yhat, s, 2), n_boot=500)
+    # a pooled resample drops the single S=1 row from ~37% of the replicates,
+    # each of which would report a parity difference of 0
+    dp = iv["demographic_parity_difference"]
+    assert 0.4 < dp["ci_low"] < dp["value"] < dp["ci_high"]
+
+
+def test_evaluate_groups_scales_with_rows_not_cardinality():
+    from ai_core.utils.fairness import evaluate_groups
+
+    rng = np.random.default_rng(4)
+    n = 300
+    ids = {f"id{i}": rng.permutation(n) for i in range(4)}  # 300**4 joint cells
+    y = rng.integers(0, 2, size=n)
+    yhat = rng.integers(0, 2, size=n)
+    report = evaluate_groups(y, yhat, ids)
+    assert len(report["attributes"]["id0"]["groups"]) == n
+    assert len(report["intersections"]) == 11
+    assert len(report["intersections"]["id0&id1&id2&id3"]["groups"]) == n
+
+
+def test_interval_bound_straddling_zero():
+    from ai_core.utils.fairness import interval_bound
+
+    assert interval_bound({"value": 0.3, "ci_low": -0.1, "ci_high": 0.5}) == 0.0
+    assert interval_bound({"value": 0.3, "ci_low": 0.2, "ci_high": 0.5}) == 0.2
+    assert interval_bound({"value": -0.3, "ci_low": -0.5, "ci_high": -0.15}) == -0.15
+
+
+def test_ci_gate_tolerates_small_groups(monkeypatch):
+    import pytest
+    from fastapi import HTTPException
+
+    import ai_core.routers.analyze_impl as impl
+
+    class Model:
+        def predict(self, X):
+            return np.array([1, 1, 0, 1, 0, 0])
+
+    import sys
+    import types
+
+    fake_mh = types.ModuleType("ai_core.utils.model_helper")
+    fake_mh.train_quick_model = lambda X, y: Model()
+    fake_mh.explain_model = lambda m, X: {}
+    monkeypatch.setitem(sys.modules, "ai_core.utils.model_helper", fake_mh)
+    monkeypatch.setattr(impl, "_call_store_analysis", lambda db, name, doc: "ok")
+    import pandas as pd
+
+    X = pd.DataFrame({"sensitive": [1, 1, 1, 0, 0, 0], "x": [1, 2, 3, 4, 5, 6]})
+    y = pd.Series([1, 1, 0, 1, 0, 0])
+    with pytest.raises(HTTPException):
+        impl.run_analysis_core(None, X, y, "small")
+    monkeypatch.setenv("AI_CORE_FAIRNESS_GATE", "ci")
+    assert impl.run_analysis_core(None, X, y, "small")[0] == "ok"
@@ -0,0 +1,64 @@
+import json
+
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core.main import app
+from ai_core.utils import fast_json
+
+client = TestClient(app)
+
+
+def test_decode_builds_typed_columns():
+    body = json.dumps(
+        {"dataset_name": "d", "data": {"i": [1, 2, 3], "f": [1.5, None, 2.0], "s": ["a", "b", "a"]}}
+    ).encode()
+    fields, cols = fast_json.decode_analyze_body(body, 10)
+    assert fields == {"dataset_name": "d"}
+    assert cols["i"].dtype.kind == "i"
+    assert cols["f"].dtype.kind == "f"
+    expected = pd.DataFrame({"i": [1, 2, 3], "f": [1.5, None, 2.0], "s": ["a", "b", "a"]})
+    pd.testing.assert_frame_equal(pd.DataFrame(cols), expected)
+
+
+def test_decode_errors_share_messages():
+    with pytest.raises(fast_json.PayloadError) as e:
+        fast_json.decode_analyze_body(b'{"dataset_name": "d", "data": {"a": [1, 2], "b": [1]}}', 10)
+    assert e.value.detail == "Mismatched column lengths: {'a': 2, 'b': 1}"
+    with pytest.raises(fast_json.PayloadError) as e:
+        fast_json.decode_analyze_body(b'{"dataset_name": "d", "data": {"a": [1, 2, 3]}}', 2)
+    assert e.value.detail == "Dataset exceeds maximum rows (2): 3 rows provided"
+    with pytest.raises(fast_json.FastPathUnsupported):
+        fast_json.decode_analyze_body(b'{"dataset_name": "d", "data": "nope"}', 2)
+
+
+@pytest.mark.parametrize(
+    "payload,status",
+    [
+        ({"dataset_name": "bad", "data": "not-a-mapping"}, 422),
+        ({"dataset_name": "mismatch", "data": {"a": [1, 2, 3], "b": [1, 2]}}, 400),
+        ({"dataset_name": "big", "data": {"a": list(range(100001))}}, 400),
+        ({"dataset_name": "empty", "data": {"a": []}}, 400),
+        ({"dataset_name": "ragged", "data": {"a": [[1, 2], [3]], "b": [1, 2]}}, 400),
+        ({"dataset_name": "nested", "data": {"a": [[1, 2], [3, 4]], "b": [1, 2]}}, 400),
+        ({"dataset_name": "structs", "data": {"a": [{"x": 1}, {"x": 2}], "b": [1, 2]}}, 400),
+    ],
+)
+def test_fast_path_matches_regular_path(monkeypatch, payload, status):
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "fakeid")
+    regular = client.post("/ai_core/analyze", json=payload)
+    monkeypatch.setenv("AI_CORE_ANALYZE_FAST_JSON", "1")
+    fast = client.post("/ai_core/analyze", json=payload)
+    assert regular.status_code == fast.status_code == status
+    if status == 400:
+        assert regular.json() == fast.json()
+
+
+def test_fast_path_runs_analysis(monkeypatch):
+    monkeypatch.setenv("AI_CORE_ANALYZE_FAST_JSON", "1")
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "fast-1")
+    payload = {"dataset_name": "fast", "data": {"a": [1, 1, 1, 1], "b": [2, 3, 4, 5]}}
+    res = client.post("/ai_core/analyze", json=payload)
+    assert res.status_code == 200, res.text
+    assert res.json()["analysis_id"] == "fast-1"
@@ -0,0 +1,39 @@
+import pandas as pd
+
+from ai_core.utils.fingerprint import frame_fingerprint, training_fingerprint
+
+
+def test_fingerprint_is_content_based():
+    X1 = pd.DataFrame({"a": [1, 2, 3], "b": [0.1, 0.2, 0.3]})
+    X2 = X1.copy()
+    y = pd.Series([0, 1, 0])
+    cfg = ("logistic_regression", {"max_iter": 200})
+    assert training_fingerprint(X1, y, cfg) == training_fingerprint(X2, y, cfg)
+    X2.loc[0, "a"] = 9
+    assert training_fingerprint(X1, y, cfg) != training_fingerprint(X2, y, cfg)
+    assert training_fingerprint(X1, y, cfg) != training_fingerprint(X1, None, cfg)
+    assert training_fingerprint(X1, y, cfg) != training_fingerprint(X1, y, ("lightgbm", {}))
+
+
+def test_fingerprint_handles_object_and_categorical_columns():
+    df = pd.DataFrame({"g": ["a", "b", "a"], "n": [1.0, None, 3.0]})
+    same = pd.DataFrame({"g": ["a", "b", "a"], "n": [1.0, None, 3.0]}, index=[10, 11, 12])
+    assert frame_fingerprint(df) == frame_fingerprint(same)
+    cat = df.assign(g=df["g"].astype("category"))
+    assert frame_fingerprint(cat) != frame_fingerprint(df)
+    assert frame_fingerprint(df) != frame_fingerprint(df.assign(g=["a", "b", "b"]))
+
+
+def test_fingerprint_handles_datetime_and_timedelta_columns():
+    ts = pd.to_datetime(["2020-01-01", "2020-01-02", None])
+    df = pd.DataFrame({"ts": ts, "dt": pd.to_timedelta([1, 2, 3], unit="s")})
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+    assert frame_fingerprint(df) != frame_fingerprint(df.assign(dt=pd.to_timedelta([1, 2, 4], unit="s")))
+    # same instants in another unit are a different column dtype
+    assert frame_fingerprint(df) != frame_fingerprint(df.assign(ts=ts.as_unit("ms")))
+
+
+def test_fingerprint_handles_unhashable_object_cells():
+    df = pd.DataFrame({"tags": [["a", "b"], ["c"], {"k": 1}]})
+    assert frame_fingerprint(df) == frame_fingerprint(df.copy())
+    assert frame_fingerprint(df) != frame_fingerprint(pd.DataFrame({"tags": [["a", "b"], ["d"], {"k": 1}]}))
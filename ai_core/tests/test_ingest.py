@@ -0,0 +1,102 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+from fastapi.testclient import TestClient
+
+from ai_core.main import app
+from ai_core.utils import ingest
+
+client = TestClient(app)
+
+
+def _npy_body(n=40):
+    rng = np.random.default_rng(0)
+    arr = np.zeros(n, dtype=[("a", "<f8"), ("b", "<i8"), ("target", "<i8")])
+    arr["a"] = rng.normal(size=n)
+    arr["b"] = rng.integers(0, 10, size=n)
+    arr["target"] = np.arange(n) % 2
+    buf = io.BytesIO()
+    np.save(buf, arr)
+    return buf.getvalue()
+
+
+def test_decode_npy_structured_array():
+    df = ingest.decode_frame(_npy_body(10), "application/x-npy")
+    assert list(df.columns) == ["a", "b", "target"]
+    assert len(df) == 10
+
+
+def test_decode_npy_rejects_plain_and_object_arrays():
+    buf = io.BytesIO()
+    np.save(buf, np.zeros((3, 2)))
+    with pytest.raises(ingest.IngestError) as e:
+        ingest.decode_npy(buf.getvalue())
+    assert e.value.status_code == 400
+    buf = io.BytesIO()
+    np.save(buf, np.array([{"x": 1}], dtype=object), allow_pickle=True)
+    with pytest.raises(ingest.IngestError):
+        ingest.decode_npy(buf.getvalue())
+
+
+def test_decode_unknown_type_is_415():
+    with pytest.raises(ingest.IngestError) as e:
+        ingest.decode_frame(b"x", "text/csv")
+    assert e.value.status_code == 415
+
+
+def test_arrow_stream_roundtrip():
+    pa = pytest.importorskip("pyarrow")
+    df = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": ["x", "y", "x"]})
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    out = ingest.decode_frame(sink.getvalue().to_pybytes(), ingest.ARROW_STREAM)
+    pd.testing.assert_frame_equal(out, df)
+
+
+def test_analyze_accepts_npy_body(monkeypatch):
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "npy-analysis-1")
+    r = client.post(
+        "/ai_core/analyze?dataset_name=npy",
+        content=_npy_body(),
+        headers={"Content-Type": "application/x-npy"},
+    )
+    assert r.status_code == 200, r.text
+    assert r.json()["analysis_id"] == "npy-analysis-1"
+
+
+def test_analyze_binary_requires_dataset_name():
+    r = client.post("/ai_core/analyze", content=_npy_body(), headers={"Content-Type": "application/x-npy"})
+    assert r.status_code == 400
+
+
+def test_analyze_rejects_unsupported_content_type():
+    r = client.post("/ai_core/analyze", content=b"a,b\n1,2", headers={"Content-Type": "text/csv"})
+    assert r.status_code == 415
+
+
+def _arrow_body(df):
+    pa = pytest.importorskip("pyarrow")
+    sink = pa.BufferOutputStream()
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.getvalue().to_pybytes()
+
+
+def test_analyze_rejects_empty_and_nested_binary_frames():
+    headers = {"Content-Type": ingest.ARROW_STREAM}
+    empty = pd.DataFrame({"a": pd.Series([], dtype=float)})
+    r = client.post("/ai_core/analyze?dataset_name=empty", content=_arrow_body(empty), headers=headers)
+    assert r.status_code == 400 and "no rows" in r.json()["detail"]
+    nested = pd.DataFrame({"a": [1.0, 2.0], "tags": [[1, 2], [3]]})
+    r = client.post("/ai_core/analyze?dataset_name=nested", content=_arrow_body(nested), headers=headers)
+    assert r.status_code == 400 and "nested" in r.json()["detail"]
+
+
+def test_analyze_rejects_empty_json_columns():
+    r = client.post("/ai_core/analyze", json={"dataset_name": "empty", "data": {"a": []}})
+    assert r.status_code == 400
@@ -0,0 +1,34 @@
+import os
+import subprocess
+import sys
+
+from ai_core.utils import lazy
+
+REPO_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), "..", ".."))
+
+
+def test_lazy_module_imports_on_first_attribute():
+    sys.modules.pop("ai_core.utils.sampling", None)
+    proxy = lazy.lazy_util("sampling")
+    assert "not loaded" in repr(proxy)
+    assert "ai_core.utils.sampling" not in sys.modules
+    assert callable(proxy.stratified_sample_indices)
+    assert "ai_core.utils.sampling" in sys.modules
+    assert any(r["module"] == "ai_core.utils.sampling" for r in lazy.import_report())
+
+
+def test_app_import_does_not_load_ml_stack():
+    code = (
+        "import sys, ai_core.main; "
+        "print('loaded=' + ','.join(m for m in ('pandas', 'sklearn', 'shap', 'pymongo') if m in sys.modules))"
+    )
+    out = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=REPO_ROOT,
+        env={**os.environ, "PYTHONPATH": REPO_ROOT},
+        capture_output=True,
+        text=True,
+        timeout=120,
+    )
+    assert out.returncode == 0, out.stderr
+    assert out.stdout.strip().splitlines()[-1] == "loaded="
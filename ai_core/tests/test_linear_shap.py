@@ -0,0 +1,143 @@
+import numpy as np
+import pandas as pd
+
+
+def _fit(X, y):
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    return make_pipeline(StandardScaler(), LogisticRegression()).fit(X, y)
+
+
+def _data():
+    rng = np.random.default_rng(0)
+    X = pd.DataFrame(rng.normal(size=(500, 3)) * [1.0, 10.0, 0.1] + [0.0, 5.0, -2.0], columns=["a", "b", "c"])
+    y = pd.Series((X["a"] + 0.1 * X["b"] + rng.normal(size=500) > 0.5).astype(int))
+    return X, y
+
+
+def test_linear_shap_is_exact_and_additive():
+    from ai_core.utils.model_helper import _linear_shap_values
+
+    X, y = _data()
+    model = _fit(X, y)
+    values = _linear_shap_values(model, X, X)
+    Z = model[0].transform(X)
+    expected = (Z - Z.mean(axis=0)) * model[-1].coef_[0]
+    np.testing.assert_allclose(values, expected, atol=1e-10)
+    # contributions plus the mean log-odds reproduce every row's decision function
+    logit = model.decision_function(X)
+    np.testing.assert_allclose(values.sum(axis=1) + logit.mean(), logit, atol=1e-10)
+
+
+def test_non_linear_models_are_not_handled():
+    from sklearn.tree import DecisionTreeClassifier
+
+    from ai_core.utils.model_helper import _linear_weights
+
+    X, y = _data()
+    assert _linear_weights(DecisionTreeClassifier().fit(X, y)) is None
+
+
+def test_compute_explanation_uses_linear_path():
+    from ai_core.utils.accounting import track
+    from ai_core.utils.model_helper import _compute_explanation
+
+    X, y = _data()
+    model = _fit(X, y)
+    with track("unit") as usage:
+        importances = _compute_explanation(model, X, "")
+    assert usage.explainer == "linear"
+    assert max(importances, key=importances.get) == "a"
+
+
+def test_coefficient_importances_walks_pipeline_steps():
+    from ai_core.utils.model_helper import _coefficient_importances
+
+    X, y = _data()
+    imps = _coefficient_importances(_fit(X, y), list(X.columns))
+    assert abs(sum(imps.values()) - 1.0) < 1e-6
+    assert imps["a"] > imps["c"]
+    assert len(set(imps.values())) > 1  # not the uniform last-resort fallback
+
+
+class LGBMClassifier:
+    """Stand-in exposing LightGBM's ``predict(..., pred_contrib=True)`` contract."""
+
+    def predict(self, X, pred_contrib=False):
+        assert pred_contrib
+        contrib = np.asarray(X, dtype=float) * [1.0, -2.0, 0.0]
+        return np.column_stack([contrib, np.full(len(X), 0.5)])
+
+
+def test_native_tree_contributions_drop_bias_column():
+    from ai_core.utils.accounting import track
+    from ai_core.utils.model_helper import _shap_row_values
+
+    X, _ = _data()
+    with track("unit") as usage:
+        values = _shap_row_values(LGBMClassifier(), X, X.iloc[:10], "")
+    assert usage.explainer == "native:lightgbm"
+    np.testing.assert_allclose(values, X.iloc[:10].to_numpy() * [1.0, -2.0, 0.0])
+
+
+def test_shap_backend_mode_skips_analytic_paths(monkeypatch):
+    from ai_core.utils import model_helper
+
+    monkeypatch.setattr(model_helper, "EXPLAIN_BACKEND_MODE", "shap")
+    calls = []
+    monkeypatch.setattr(model_helper, "_linear_shap_values", lambda *a: calls.append(a))
+    X, y = _data()
+    # shap itself may be unusable here; either way the linear path must not run
+    model_helper._shap_row_values(_fit(X, y), X, X.iloc[:5], "")
+    assert calls == []
+
+
+def test_explain_cache_key_separates_backend_modes(monkeypatch):
+    from ai_core.utils import model_helper
+
+    auto = model_helper._explain_cache_key("bg")
+    monkeypatch.setattr(model_helper, "EXPLAIN_BACKEND_MODE", "shap")
+    assert model_helper._explain_cache_key("bg") != auto
+    monkeypatch.setattr(model_helper, "EXPLAIN_CACHE_VERSION", model_helper.EXPLAIN_CACHE_VERSION + 1)
+    assert model_helper._explain_cache_key("bg").startswith("bg:")
+    assert model_helper._explain_cache_key("bg") not in (auto, "bg")
+
+
+def test_native_xgboost_quota_does_not_touch_shared_booster(monkeypatch):
+    import sys
+    import types
+
+    from ai_core.utils import cpu_budget, model_helper
+
+    calls = {}
+
+    class DMatrix:
+        def __init__(self, data, enable_categorical=False, nthread=None):
+            calls["dmatrix_nthread"] = nthread
+            self.data = np.asarray(data, dtype=float)
+
+    class Booster:
+        def set_param(self, params):
+            raise AssertionError("cached booster must not be reconfigured")
+
+        def predict(self, dmatrix, pred_contribs=False):
+            assert pred_contribs
+            return np.column_stack([dmatrix.data, np.zeros(len(dmatrix.data))])
+
+    class XGBClassifier:
+        booster = Booster()
+
+        def get_booster(self):
+            return self.booster
+
+    monkeypatch.setitem(sys.modules, "xgboost", types.SimpleNamespace(DMatrix=DMatrix))
+    X, _ = _data()
+    token = cpu_budget._THREADS.set(2)
+    try:
+        values = model_helper._native_tree_contributions(XGBClassifier(), X.iloc[:4])
+    finally:
+        cpu_budget._THREADS.reset(token)
+    assert calls["dmatrix_nthread"] == 2
+    np.testing.assert_allclose(values, X.iloc[:4].to_numpy())
@@ -0,0 +1,103 @@
+import pandas as pd
+
+from ai_core.utils.model_cache import ModelCache
+
+
+def test_lru_evicts_by_entry_count():
+    cache = ModelCache(max_entries=2, max_bytes=10 * 1024 * 1024)
+    cache.put_model("a", {"m": 1})
+    cache.put_model("b", {"m": 2})
+    assert cache.get_model("a") is not None  # "a" becomes most recent
+    cache.put_model("c", {"m": 3})
+    assert cache.get_model("b") is None
+    assert cache.get_model("a") is not None
+    assert cache.evictions == 1
+    assert cache.hits == 2 and cache.misses == 1
+
+
+def test_lru_respects_byte_budget():
+    cache = ModelCache(max_entries=10, max_bytes=3000)
+    cache.put_model("a", b"x" * 2000)
+    cache.put_model("b", b"y" * 2000)
+    assert len(cache) == 1
+    assert cache.get_model("b") is not None
+    assert cache.size_bytes <= 3000
+
+
+def test_explainers_follow_their_model():
+    cache = ModelCache(max_entries=1, max_bytes=10 * 1024 * 1024)
+    model = {"m": 1}
+    cache.put_model("a", model)
+    assert cache.key_for(model) == "a"
+    cache.put_explainer("a", "tree:bg", "explainer")
+    assert cache.get_explainer("a", "tree:bg") == "explainer"
+    cache.put_model("b", {"m": 2})
+    assert cache.key_for(model) is None
+    assert cache.get_explainer("a", "tree:bg") is None
+
+
+def test_train_quick_model_reuses_cached_model():
+    from ai_core.utils.model_helper import train_quick_model
+
+    X = pd.DataFrame({"f1": [0.1, 0.9, 0.2, 0.8, 0.3, 0.7], "f2": [1, 0, 1, 0, 1, 0]})
+    y = pd.Series([0, 1, 0, 1, 0, 1])
+    first = train_quick_model(X, y)
+    second = train_quick_model(X.copy(), y.copy())
+    assert first is second
+
+
+def test_size_estimate_needs_no_pickling():
+    import threading
+
+    import numpy as np
+    from sklearn.ensemble import RandomForestClassifier
+
+    from ai_core.utils.model_cache import _estimate_size
+
+    unpicklable = {"lock": threading.Lock(), "weights": np.zeros(10_000)}
+    assert _estimate_size(unpicklable) >= 80_000
+    rng = np.random.default_rng(0)
+    X, y = rng.random((2000, 4)), rng.integers(0, 2, 2000)
+    small = RandomForestClassifier(n_estimators=2, random_state=0).fit(X, y)
+    large = RandomForestClassifier(n_estimators=20, random_state=0).fit(X, y)
+    assert _estimate_size(large) > 5 * _estimate_size(small) > 0
+
+
+def test_shap_cache_key_is_the_training_fingerprint_without_a_model_cache(monkeypatch):
+    from ai_core.utils import model_helper
+
+    monkeypatch.setattr(model_helper, "_model_cache", lambda: ModelCache(max_entries=0))
+    X = pd.DataFrame({"f1": [0.3, 0.6, 0.1, 0.8, 0.2, 0.9], "f2": [1, 0, 1, 0, 0, 1]})
+    y = pd.Series([0, 1, 0, 1, 0, 1])
+    model = model_helper.train_quick_model(X, y)
+    expected = model_helper.training_fingerprint(X, y, model_helper._estimator_config())
+
+    def _no_pickle(*args, **kwargs):
+        raise AssertionError("trained models must not be pickled for their cache key")
+
+    monkeypatch.setattr(model_helper.pickle, "dumps", _no_pickle)
+    assert model_helper._model_hash(model) == expected
+    monkeypatch.undo()
+    foreign = model_helper._model_hash({"weights": [1, 2]})
+    assert len(foreign) == 64 and foreign != expected
+
+
+def test_size_estimate_counts_native_boosters():
+    from ai_core.utils.model_cache import _estimate_size
+
+    class Booster:  # stands in for lightgbm.Booster: the trees live in native memory
+        __module__ = "lightgbm.basic"
+
+        def model_to_string(self):
+            return "tree\n" * 200_000
+
+    class LGBMClassifier:
+        __module__ = "lightgbm.sklearn"
+
+        def __init__(self):
+            self.n_estimators = 100
+            self._Booster = Booster()
+
+    model = LGBMClassifier()
+    python_only = _estimate_size({"n_estimators": 100})
+    assert _estimate_size(model) >= 1_000_000 > 100 * python_only
@@ -84,8 +84,53 @@ def test_explain_model_writes_cache_on_miss(monkeypatch):
     model = train_quick_model(X, y)
     summary = explain_model(model, X)
 
+    # L2 writes are written behind; wait for them before inspecting the DB
+    from ai_core.utils.shap_cache import get_tiered_shap_cache
+    assert get_tiered_shap_cache().flush()
+
     # ensure cache was written
     coll = fake_db.get_collection("shap_cache")
     assert coll.replaced is not None
     assert "shap_summary" in coll.replaced
     assert isinstance(summary, dict)
+
+
+def test_shap_cache_hit_skips_background_clustering(monkeypatch):
+    persist: Any = types.ModuleType("ai_core.utils.persistence")
+    persist.get_db = lambda: object()
+    persist.get_shap_cache = lambda db, mh, bh: {"shap_summary": {"a": 1.0}}
+    persist.set_shap_cache = lambda db, mh, bh, summary: None
+    monkeypatch.setitem(sys.modules, "ai_core.utils.persistence", persist)
+
+    from ai_core.utils import model_helper
+
+    def no_clustering(*a, **k):
+        raise AssertionError("background must not be built on a cache hit")
+
+    monkeypatch.setattr(model_helper, "_build_shap_background", no_clustering)
+    X = pd.DataFrame({"a": [1.0, 2.0, 3.0], "b": [3.0, 4.0, 5.0]})
+    assert model_helper.explain_model(object(), X) == {"a": 1.0}
+
+
+def test_background_is_memoized_and_supports_minibatch(monkeypatch):
+    from ai_core.utils import model_helper
+
+    X = pd.DataFrame({"a": [float(i % 7) for i in range(60)], "b": [float(i % 5) for i in range(60)]})
+    key = model_helper.background_key(X, n_clusters=4, method="minibatch")
+    assert key == model_helper.background_key(X.copy(), n_clusters=4, method="minibatch")
+    assert key != model_helper.background_key(X, n_clusters=4, method="kmeans")
+
+    bg = model_helper.get_shap_background(X, key, n_clusters=4, method="minibatch")
+    assert bg.shape == (4, 2)
+    monkeypatch.setattr(model_helper, "_build_shap_background", lambda *a, **k: None)
+    assert model_helper.get_shap_background(X, key, n_clusters=4, method="minibatch") is bg
+
+
+def test_stratified_sample_background_keeps_each_label():
+    from ai_core.utils.model_helper import _build_shap_background
+
+    X = pd.DataFrame({"a": range(100)})
+    y = [0] * 90 + [1] * 10
+    bg = _build_shap_background(X, n_clusters=10, method="sample", y=y)
+    assert 9 <= len(bg) <= 11
+    assert (bg["a"] >= 90).any()
@@ -0,0 +1,117 @@
+import asyncio
+import time
+
+import pytest
+
+from ai_core.utils import persistence
+
+
+class FakeClient:
+    created = []
+
+    def __init__(self, uri, **kwargs):
+        self.uri = uri
+        self.kwargs = kwargs
+        self.closed = False
+        FakeClient.created.append(self)
+
+    def __getitem__(self, name):
+        return {"client": self, "name": name}
+
+    def close(self):
+        self.closed = True
+
+
+@pytest.fixture
+def fake_mongo(monkeypatch):
+    FakeClient.created = []
+    persistence.close_client()
+    monkeypatch.setattr(persistence, "MongoClient", FakeClient)
+    monkeypatch.setattr(persistence, "AsyncIOMotorClient", None)
+    monkeypatch.setenv("MONGO_URI", "mongodb://example:27017")
+    monkeypatch.setenv("AI_CORE_MONGO_MAX_POOL_SIZE", "7")
+    yield
+    persistence.close_client()
+
+
+def test_get_db_reuses_one_pooled_client(fake_mongo):
+    a = persistence.get_db()
+    b = persistence.get_db()
+    assert a["client"] is b["client"]
+    assert len(FakeClient.created) == 1
+    assert FakeClient.created[0].kwargs["maxPoolSize"] == 7
+    assert FakeClient.created[0].kwargs["connect"] is False
+
+
+def test_client_rebuilt_after_fork_and_uri_change(fake_mongo, monkeypatch):
+    first = persistence.get_client()
+    persistence._forget_clients_after_fork()
+    second = persistence.get_client()
+    assert second is not first and not first.closed
+
+    monkeypatch.setenv("MONGO_URI", "mongodb://other:27017")
+    third = persistence.get_client()
+    assert third is not second and second.closed
+
+
+def test_get_db_none_without_uri(monkeypatch):
+    monkeypatch.delenv("MONGO_URI", raising=False)
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    assert persistence.get_db() is None
+
+
+def test_async_helpers_fall_back_to_threads():
+    class Coll:
+        def __init__(self):
+            self.docs = {}
+
+        def find_one(self, q):
+            return self.docs.get((q["model_hash"], q["baseline_hash"]))
+
+        def replace_one(self, q, doc, upsert=False):
+            self.docs[(q["model_hash"], q["baseline_hash"])] = doc
+
+    class DB:
+        def __init__(self):
+            self.coll = Coll()
+
+        def get_collection(self, name):
+            return self.coll
+
+    db = DB()
+
+    async def run():
+        await persistence.aset_shap_cache(db, "m", "b", {"x": 1.0})
+        return await persistence.aget_shap_cache(db, "m", "b")
+
+    assert asyncio.run(run())["shap_summary"] == {"x": 1.0}
+    assert len(asyncio.run(persistence.astore_analysis(None, "d", {"a": 1}))) == 64
+
+
+def test_async_cache_lookup_awaits_a_native_async_driver():
+    now = int(time.time())
+
+    class Coll:
+        def __init__(self):
+            self.queries = []
+
+        async def find_one(self, query, projection=None, sort=None):
+            self.queries.append((query, sort))
+            return {"_id": "a1", "summary": {}, "created_at": now}
+
+    class MotorLikeDB:
+        __module__ = "motor.fake"
+
+        def __init__(self):
+            self.coll = Coll()
+
+        def get_collection(self, name):
+            return self.coll
+
+    db = MotorLikeDB()
+    doc = asyncio.run(persistence.afind_cached_analysis(db, "k", 60))
+    assert doc["_id"] == "a1"
+    query, sort = db.coll.queries[0]
+    assert query["cache_key"] == "k" and now - 60 <= query["created_at"]["$gte"] <= now - 59
+    assert sort == [("created_at", -1)]
+    assert asyncio.run(persistence.afind_cached_analysis(None, "k", 60)) is None
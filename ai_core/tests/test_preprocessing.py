@@ -0,0 +1,72 @@
+import numpy as np
+import pandas as pd
+from fastapi.testclient import TestClient
+
+from ai_core.main import app
+from ai_core.utils.performance import optimize_dataframe_memory
+from ai_core.utils.preprocessing import encode_features
+
+
+def test_optimize_dataframe_memory_is_lossless():
+    df = pd.DataFrame({
+        "small": np.array([-128, 0, 127], dtype=np.int64),
+        "wide": np.array([0, 40000, 1], dtype=np.int64),
+        "halves": np.array([0.5, 1.25, np.nan]),
+        "precise": np.array([0.1, 0.2, 0.3]),
+        "city": ["a", "b", "a"],
+    })
+    original = df.copy()
+    optimize_dataframe_memory(df, max_category_ratio=0.7)
+    assert df["small"].dtype == np.int8  # inclusive bounds
+    assert df["wide"].dtype == np.int32
+    assert df["halves"].dtype == np.float32
+    assert df["precise"].dtype == np.float64  # would lose precision as float32
+    assert isinstance(df["city"].dtype, pd.CategoricalDtype)
+    pd.testing.assert_frame_equal(df.astype(original.dtypes.to_dict()), original)
+
+
+def test_encode_features_leaves_no_object_columns():
+    n = 200
+    X = pd.DataFrame({
+        "x": np.arange(n, dtype=np.float32),
+        "city": pd.Series(["north", "south", None, "east"] * (n // 4)).astype("category"),
+        "user": [f"user-{i}" for i in range(n)],
+    })
+    F, report = encode_features(X, max_categories=8, hash_buckets=64)
+    assert list(F.columns) == ["x", "city", "user"]
+    assert all(F[c].dtype.kind in "biuf" for c in F.columns)
+    assert F["x"].equals(X["x"])
+    assert report["city"] == {"encoding": "category", "n_categories": 3}
+    assert (F["city"] == -1).sum() == n // 4
+    assert report["user"]["encoding"] == "hashed"
+    assert F["user"].between(0, 63).all()
+
+
+def test_analyze_accepts_string_columns(monkeypatch):
+    stored = {}
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: stored.setdefault("doc", doc) and "enc-1")
+    payload = {"dataset_name": "strings", "data": {
+        "region": ["n", "s", "e", "w"] * 5,
+        "income": [float(i) for i in range(20)],
+    }}
+    res = TestClient(app).post("/ai_core/analyze", json=payload)
+    assert res.status_code == 200, res.text
+    doc = stored["doc"]
+    assert doc["feature_encoding"]["region"]["encoding"] == "category"
+    assert set(doc["explanation"]) == {"region", "income"}
+
+
+def test_encode_features_datetimes_and_timedeltas_in_seconds_for_any_unit():
+    ts = pd.Series(pd.to_datetime(["1970-01-02", None, "2020-01-01"]))
+    X = pd.DataFrame({
+        "ns": ts,
+        "ms": ts.dt.as_unit("ms"),
+        "utc": ts.dt.tz_localize("UTC").dt.as_unit("us"),
+        "took": pd.to_timedelta([1.5, None, 90], unit="s").as_unit("ms"),
+    })
+    F, report = encode_features(X)
+    for col in ("ns", "ms", "utc"):
+        assert F[col].tolist() == [86400, -1, 1577836800]
+        assert report[col] == {"encoding": "epoch_seconds"}
+    assert F["took"].tolist() == [1, -1, 90]
+    assert report["took"] == {"encoding": "seconds"}
@@ -0,0 +1,65 @@
+import numpy as np
+import pandas as pd
+
+from ai_core.drift.baseline import BaselineManager
+from ai_core.utils.profiling import profile_frame
+
+
+def _frame():
+    rng = np.random.default_rng(0)
+    vals = rng.normal(size=300)
+    vals[::17] = np.nan
+    return pd.DataFrame(
+        {
+            "num": vals,
+            "ints": rng.integers(0, 7, size=300),
+            "flag": rng.integers(0, 2, size=300).astype(bool),
+            "cat": rng.choice(["a", "b", None], size=300),
+            "codes": pd.Categorical(rng.choice(["x", "y"], size=300)),
+        }
+    )
+
+
+def test_profile_matches_pandas():
+    df = _frame()
+    prof = profile_frame(df)
+    assert list(prof.columns) == list(df.columns)
+    for col in df.columns:
+        assert prof[col].n_missing == int(df[col].isna().sum())
+        assert prof[col].n_distinct == df[col].nunique(dropna=True)
+    num = df["num"].dropna().to_numpy()
+    assert np.isclose(prof["num"].mean, num.mean())
+    assert np.isclose(prof["num"].std, num.std())
+    assert np.isclose(prof["num"].p95, np.percentile(num, 95))
+    counts, edges = np.histogram(num, bins=20)
+    assert prof["num"].histogram == counts.tolist()
+    assert np.allclose(prof["num"].bin_edges, edges)
+    assert prof["cat"].kind == "categorical"
+    assert dict(zip(prof["cat"].categories, prof["cat"].counts)) == df["cat"].value_counts().to_dict()
+
+
+def test_baseline_from_frame_matches_record_baseline():
+    df = _frame()[["num", "ints"]].dropna()
+    df["risk_score"] = np.linspace(0, 1, len(df))
+    df["group"] = np.arange(len(df)) % 3
+    mgr = BaselineManager()
+    fast = mgr.create_baseline_from_frame("m", df, ["num", "ints"], protected_attrs=["group"])
+    slow = mgr.create_baseline("m", df.to_dict("records"), ["num", "ints"], protected_attrs=["group"])
+    for feature in ("num", "ints"):
+        for key in ("mean", "std", "p50", "p95", "min", "max"):
+            assert np.isclose(fast["feature_stats"][feature][key], slow["feature_stats"][feature][key])
+        assert fast["feature_stats"][feature]["histogram"] == slow["feature_stats"][feature]["histogram"]
+    assert np.isclose(fast["score_stats"]["mean"], slow["score_stats"]["mean"])
+    assert fast["fairness_stats"]["group"]["group_counts"] == slow["fairness_stats"]["group"]["group_counts"]
+    assert fast["data_quality"]["null_rates"] == slow["data_quality"]["null_rates"]
+
+
+def test_outlier_ratio_is_robust_to_masking():
+    rng = np.random.default_rng(1)
+    vals = np.concatenate([rng.normal(size=95), [30.0] * 5, [np.nan] * 3])
+    # the five spikes inflate the standard deviation enough to hide from |z| > 5
+    finite = vals[~np.isnan(vals)]
+    assert (np.abs(finite - finite.mean()) / finite.std()).max() < 5
+    prof = profile_frame(pd.DataFrame({"v": vals, "mostly_zero": [0.0] * 100 + [9.0] * 3}))
+    assert np.isclose(prof["v"].outlier_ratio, 0.05)
+    assert np.isclose(prof["mostly_zero"].outlier_ratio, 3 / 103)  # MAD is 0 here
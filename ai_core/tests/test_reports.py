@@ -0,0 +1,111 @@
+import sys
+import types
+
+from fastapi.testclient import TestClient
+
+from ai_core.utils import persistence
+
+
+DOCS = [
+    {"_id": f"a{i}", "dataset_name": "loans" if i % 2 else "credit", "created_at": 1000 + i,
+     "summary": {}, "explanation": {"x": 0.1 * i}, "fairness": {"dp": 0.9}}
+    for i in range(5)
+]
+
+
+def _fake_persistence(calls):
+    def get_analysis(db, analysis_id, projection=None):
+        calls.append(("get", analysis_id, projection))
+        for d in DOCS:
+            if d["_id"] == analysis_id:
+                return {k: v for k, v in d.items() if projection is None or k in projection or k == "_id"}
+        return None
+
+    def list_analyses(db, dataset_name=None, limit=50, after=None, projection=None):
+        calls.append(("list", dataset_name, limit, after))
+        docs = sorted(DOCS, key=lambda d: (d["created_at"], d["_id"]), reverse=True)
+        if dataset_name is not None:
+            docs = [d for d in docs if d["dataset_name"] == dataset_name]
+        if after is not None:
+            docs = [d for d in docs if (d["created_at"], d["_id"]) < tuple(after)]
+        return [{k: v for k, v in d.items() if k in projection or k == "_id"} for d in docs[:limit]]
+
+    return types.SimpleNamespace(get_db=lambda: object(), get_analysis=get_analysis, list_analyses=list_analyses)
+
+
+def _client(monkeypatch, calls):
+    from ai_core.main import app
+    from ai_core.routers import reports
+
+    monkeypatch.setitem(sys.modules, "ai_core.utils.persistence", _fake_persistence(calls))
+    monkeypatch.setattr(reports, "_CACHE", None)
+    return TestClient(app)
+
+
+def test_report_is_cached_and_revalidated_with_etag(monkeypatch):
+    calls = []
+    client = _client(monkeypatch, calls)
+    first = client.get("/ai_core/reports/a3")
+    assert first.status_code == 200
+    assert first.json()["report_id"] == "a3" and first.json()["explanation"] == {"x": 0.30000000000000004}
+    etag = first.headers["etag"]
+
+    again = client.get("/ai_core/reports/a3")
+    assert again.json() == first.json() and again.headers["etag"] == etag
+    not_modified = client.get("/ai_core/reports/a3", headers={"If-None-Match": etag})
+    assert not_modified.status_code == 304 and not_modified.content == b""
+    assert calls == [("get", "a3", None)]
+
+    assert client.get("/ai_core/reports/a3", headers={"If-None-Match": '"stale"'}).status_code == 200
+
+
+def test_report_field_projection(monkeypatch):
+    calls = []
+    client = _client(monkeypatch, calls)
+    res = client.get("/ai_core/reports/a1", params={"fields": "fairness,dataset_name"})
+    assert res.status_code == 200
+    assert res.json() == {"report_id": "a1", "dataset_name": "loans", "fairness": {"dp": 0.9}}
+    assert calls == [("get", "a1", {"dataset_name": 1, "fairness": 1})]
+    assert client.get("/ai_core/reports/a1", params={"fields": "password"}).status_code == 400
+    assert client.get("/ai_core/reports/missing").status_code == 404
+
+
+def test_report_listing_pages_with_cursor(monkeypatch):
+    calls = []
+    client = _client(monkeypatch, calls)
+    page = client.get("/ai_core/reports", params={"limit": 2}).json()
+    assert [i["report_id"] for i in page["items"]] == ["a4", "a3"]
+    assert "explanation" not in page["items"][0]
+    page2 = client.get("/ai_core/reports", params={"limit": 2, "cursor": page["next_cursor"]}).json()
+    assert [i["report_id"] for i in page2["items"]] == ["a2", "a1"]
+    last = client.get("/ai_core/reports", params={"limit": 2, "cursor": page2["next_cursor"]}).json()
+    assert [i["report_id"] for i in last["items"]] == ["a0"] and last["next_cursor"] is None
+
+    loans = client.get("/ai_core/reports", params={"dataset_name": "loans"}).json()
+    assert [i["report_id"] for i in loans["items"]] == ["a3", "a1"]
+    assert client.get("/ai_core/reports", params={"cursor": "bogus"}).status_code == 400
+
+
+def test_list_analyses_builds_keyset_query():
+    seen = {}
+
+    class _Cursor(list):
+        def sort(self, spec):
+            seen["sort"] = spec
+            return self
+
+        def limit(self, n):
+            seen["limit"] = n
+            return self
+
+    class _Coll:
+        def find(self, query, projection=None):
+            seen["query"], seen["projection"] = query, projection
+            return _Cursor()
+
+    persistence.list_analyses({"analyses": _Coll()}, dataset_name="loans", limit=10, after=(1003, "a3"), projection={"summary": 1})
+    assert seen["query"] == {
+        "dataset_name": "loans",
+        "$or": [{"created_at": {"$lt": 1003}}, {"created_at": 1003, "_id": {"$lt": "a3"}}],
+    }
+    assert seen["sort"] == [("created_at", -1), ("_id", -1)] and seen["limit"] == 10
@@ -38,8 +38,8 @@ def test_run_analysis_core_raises_on_unfairness(monkeypatch):
     mh_mod = types.ModuleType("ai_core.utils.model_helper")
     mh_mod.train_quick_model = fake_train  # type: ignore
     mh_mod.explain_model = fake_explain  # type: ignore
-    sys.modules["ai_core.utils.model_helper"] = mh_mod
-    sys.modules["utils.model_helper"] = mh_mod
+    monkeypatch.setitem(sys.modules, "ai_core.utils.model_helper", mh_mod)
+    monkeypatch.setitem(sys.modules, "utils.model_helper", mh_mod)
 
     # Monkeypatch persistence to avoid DB calls
     def fake_store(db, dataset_name, doc):
@@ -47,14 +47,14 @@ def test_run_analysis_core_raises_on_unfairness(monkeypatch):
     persist_mod = types.ModuleType("ai_core.utils.persistence")
     persist_mod.store_analysis = fake_store  # type: ignore
     persist_mod.get_db = lambda: None  # type: ignore
-    sys.modules["ai_core.utils.persistence"] = persist_mod
-    sys.modules["utils.persistence"] = persist_mod
+    monkeypatch.setitem(sys.modules, "ai_core.utils.persistence", persist_mod)
+    monkeypatch.setitem(sys.modules, "utils.persistence", persist_mod)
 
     # Inject a minimal fairlens helper used by run_analysis_core for summary
     ff_mod = types.ModuleType("ai_core.utils.fairlens_helper")
     ff_mod.run_fairness_stub = lambda meta: {"n_rows": int(meta.get("n_rows", 0))}  # type: ignore
-    sys.modules["ai_core.utils.fairlens_helper"] = ff_mod
-    sys.modules["utils.fairlens_helper"] = ff_mod
+    monkeypatch.setitem(sys.modules, "ai_core.utils.fairlens_helper", ff_mod)
+    monkeypatch.setitem(sys.modules, "utils.fairlens_helper", ff_mod)
 
     # call run_analysis_core and expect HTTPException due to fairness violation
     with pytest.raises(HTTPException) as exc:
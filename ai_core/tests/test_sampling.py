@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+
+from ai_core.utils.sampling import bootstrap_mean_ci, strata_codes, stratified_sample_indices
+
+
+def test_stratified_sample_keeps_minority_strata():
+    y = np.array([0] * 950 + [1] * 50)
+    s = np.array([0, 1] * 500)
+    strata = strata_codes([y, s], len(y))
+    assert len(np.unique(strata)) == 4
+    idx = stratified_sample_indices(strata, 100)
+    assert len(idx) == 100
+    assert len(np.unique(strata[idx])) == 4
+    assert 3 <= int((y[idx] == 1).sum()) <= 7
+
+
+def test_sample_larger_than_data_returns_everything():
+    idx = stratified_sample_indices(np.zeros(10, dtype=int), 50)
+    assert idx.tolist() == list(range(10))
+
+
+def test_bootstrap_interval_brackets_the_mean():
+    rng = np.random.default_rng(0)
+    values = rng.normal(loc=[1.0, 5.0], scale=1.0, size=(400, 2))
+    lo, hi = bootstrap_mean_ci(values, n_boot=500)
+    means = values.mean(axis=0)
+    assert np.all(lo <= means) and np.all(means <= hi)
+    assert np.all(hi - lo < 0.5)
+
+
+def test_budgeted_explanation_reports_sample_size_and_ci():
+    from ai_core.utils.model_helper import explain_model_budgeted, train_quick_model
+
+    rng = np.random.default_rng(1)
+    X = pd.DataFrame({"f1": rng.normal(size=300), "f2": rng.normal(size=300), "sensitive": rng.integers(0, 2, 300)})
+    y = pd.Series((X["f1"] > 0).astype(int))
+    model = train_quick_model(X, y)
+    out = explain_model_budgeted(model, X, y=y, sensitive=X["sensitive"], max_rows=60)
+    assert out["n_samples"] == 60
+    assert out["n_rows"] == 300
+    assert set(out["importances"]) == {"f1", "f2", "sensitive"}
+    for f, v in out["importances"].items():
+        assert out["ci_low"][f] <= v + 1e-12 <= out["ci_high"][f] + 2e-12
+
+
+def test_budgeted_cache_hit_skips_the_pilot(monkeypatch):
+    from ai_core.utils import model_helper
+
+    class _Cache:
+        def __init__(self):
+            self.store = {}
+
+        def get(self, mh, bh):
+            return self.store.get((mh, bh)), "l1"
+
+        def set(self, mh, bh, value):
+            self.store[(mh, bh)] = value
+
+    rng = np.random.default_rng(2)
+    X = pd.DataFrame({"f1": rng.normal(size=400), "f2": rng.normal(size=400)})
+    y = pd.Series((X["f1"] > 0).astype(int))
+    model = model_helper.train_quick_model(X, y)
+    cache = _Cache()
+    monkeypatch.setattr(model_helper, "_tiered_shap_cache", lambda: cache)
+    first = model_helper.explain_model_budgeted(model, X, y=y, max_seconds=5.0)
+    assert len(cache.store) == 1
+
+    def _no_shap(*args, **kwargs):
+        raise AssertionError("pilot ran on a cache hit")
+
+    monkeypatch.setattr(model_helper, "_shap_row_values", _no_shap)
+    assert model_helper.explain_model_budgeted(model, X, y=y, max_seconds=5.0) == first
+
+
+def test_invalid_budget_env_falls_back_to_no_budget(monkeypatch):
+    from ai_core.routers.analyze_impl import _explain_budget
+
+    monkeypatch.setenv("AI_CORE_EXPLAIN_MAX_ROWS", "lots")
+    monkeypatch.setenv("AI_CORE_EXPLAIN_MAX_SECONDS", "2.5")
+    assert _explain_budget() == {"max_rows": None, "max_seconds": 2.5}
+    monkeypatch.setenv("AI_CORE_EXPLAIN_MAX_SECONDS", "soon")
+    assert _explain_budget() is None
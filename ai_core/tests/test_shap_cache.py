@@ -0,0 +1,56 @@
+import sys
+import types
+
+import pytest
+
+from ai_core.utils.shap_cache import TieredShapCache
+
+
+@pytest.fixture
+def fake_l2(monkeypatch):
+    store = {}
+    calls = {"get": 0, "set": 0}
+
+    def get_shap_cache(db, mh, bh):
+        calls["get"] += 1
+        summary = store.get((mh, bh))
+        return {"shap_summary": summary} if summary is not None else None
+
+    def set_shap_cache(db, mh, bh, summary):
+        calls["set"] += 1
+        store[(mh, bh)] = summary
+
+    persist = types.ModuleType("ai_core.utils.persistence")
+    persist.get_db = lambda: object()  # type: ignore
+    persist.get_shap_cache = get_shap_cache  # type: ignore
+    persist.set_shap_cache = set_shap_cache  # type: ignore
+    monkeypatch.setitem(sys.modules, "ai_core.utils.persistence", persist)
+    return store, calls
+
+
+def test_l2_hit_is_promoted_to_l1(fake_l2):
+    store, calls = fake_l2
+    store[("m", "b")] = {"f": 0.5}
+    cache = TieredShapCache(max_entries=8, ttl_seconds=60, negative_ttl_seconds=60, write_behind=False)
+    assert cache.get("m", "b") == ({"f": 0.5}, "l2")
+    assert cache.get("m", "b") == ({"f": 0.5}, "l1")
+    assert calls["get"] == 1
+
+
+def test_negative_cache_avoids_repeated_l2_misses(fake_l2):
+    _, calls = fake_l2
+    cache = TieredShapCache(max_entries=8, ttl_seconds=60, negative_ttl_seconds=60, write_behind=False)
+    assert cache.get("m", "b") == (None, "miss")
+    assert cache.get("m", "b") == (None, "negative")
+    assert calls["get"] == 1
+    cache.set("m", "b", {"f": 1.0})
+    assert cache.get("m", "b") == ({"f": 1.0}, "l1")
+
+
+def test_write_behind_reaches_l2_after_flush(fake_l2):
+    store, calls = fake_l2
+    cache = TieredShapCache(max_entries=8, ttl_seconds=60, negative_ttl_seconds=0, write_behind=True)
+    cache.set("m", "b", {"f": 2.0})
+    assert cache.flush(timeout=5)
+    assert store[("m", "b")] == {"f": 2.0}
+    assert calls["set"] == 1
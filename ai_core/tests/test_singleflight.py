@@ -0,0 +1,165 @@
+import asyncio
+import threading
+import time
+
+import httpx
+
+from ai_core.utils.singleflight import SingleFlight
+
+
+class _Gauge:
+    def __init__(self):
+        self.value = 0
+        self.peak = 0
+
+    def inc(self):
+        self.value += 1
+        self.peak = max(self.peak, self.value)
+
+    def dec(self):
+        self.value -= 1
+
+
+def test_concurrent_threads_share_one_call():
+    gauge, calls, results = _Gauge(), [], []
+    sf = SingleFlight(inflight=gauge)
+    started = threading.Event()
+
+    def work():
+        calls.append(1)
+        started.set()
+        time.sleep(0.2)
+        return "analysis-1"
+
+    def leader():
+        results.append(sf.do("k", work))
+
+    def follower():
+        started.wait()
+        results.append(sf.do("k", work))
+
+    threads = [threading.Thread(target=leader)] + [threading.Thread(target=follower) for _ in range(3)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+    assert len(calls) == 1
+    assert sorted(results) == [("analysis-1", False)] + [("analysis-1", True)] * 3
+    assert gauge.peak == 1 and gauge.value == 0 and sf.in_flight() == 0
+
+
+def test_exceptions_are_shared_and_key_is_released():
+    sf = SingleFlight()
+
+    async def boom():
+        await asyncio.sleep(0.05)
+        raise ValueError("unfair")
+
+    async def main():
+        return await asyncio.gather(sf.ado("k", boom), sf.ado("k", boom), return_exceptions=True)
+
+    errors = asyncio.run(main())
+    assert all(isinstance(e, ValueError) for e in errors)
+    assert sf.do("k", lambda: 3) == (3, False)
+
+
+def test_identical_analyze_requests_get_the_same_analysis_id(monkeypatch):
+    from ai_core.main import app
+    from ai_core.routers import analyze_impl
+
+    calls = []
+
+    def slow_analysis(db, X, y, dataset_name, log_meta=None, **kwargs):
+        calls.append(dataset_name)
+        time.sleep(0.3)
+        return f"aid-{dataset_name}", {}
+
+    monkeypatch.setattr(analyze_impl, "run_analysis_core", slow_analysis)
+    payload = {"dataset_name": "dash", "data": {"a": [1, 2, 3, 4], "b": [4, 3, 2, 1]}}
+
+    async def main():
+        transport = httpx.ASGITransport(app=app)
+        async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+            same = [client.post("/ai_core/analyze", json=payload) for _ in range(4)]
+            other = client.post("/ai_core/analyze", json={**payload, "dataset_name": "other"})
+            return await asyncio.gather(*same, other)
+
+    responses = asyncio.run(main())
+    assert all(r.status_code == 200 for r in responses)
+    ids = [r.json()["analysis_id"] for r in responses]
+    assert len(set(ids[:4])) == 1 and ids[4] != ids[0]
+    assert sorted(calls) == ["dash", "other"]
+
+
+def test_coalescing_can_be_disabled(monkeypatch):
+    from ai_core.routers import analyze_impl
+
+    monkeypatch.setenv("AI_CORE_ANALYZE_COALESCE", "0")
+    assert not analyze_impl._coalesce_enabled()
+
+
+def test_cancelled_follower_does_not_cancel_the_shared_call():
+    sf = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.1)
+        return "analysis-1"
+
+    async def main():
+        leader = asyncio.ensure_future(sf.ado("k", work))
+        await asyncio.sleep(0)
+        followers = [asyncio.ensure_future(sf.ado("k", work)) for _ in range(2)]
+        await asyncio.sleep(0.02)
+        followers[0].cancel()
+        return await asyncio.gather(leader, *followers, return_exceptions=True)
+
+    leader, cancelled, follower = asyncio.run(main())
+    assert leader == ("analysis-1", False)
+    assert isinstance(cancelled, asyncio.CancelledError)
+    assert follower == ("analysis-1", True)
+    assert sf.in_flight() == 0
+
+
+def test_cancelled_leader_hands_over_to_a_follower():
+    sf = SingleFlight()
+    calls = []
+
+    async def work():
+        calls.append(1)
+        await asyncio.sleep(0.05)
+        return len(calls)
+
+    async def main():
+        leader = asyncio.ensure_future(sf.ado("k", work))
+        await asyncio.sleep(0)
+        follower = asyncio.ensure_future(sf.ado("k", work))
+        await asyncio.sleep(0.01)
+        leader.cancel()
+        return await asyncio.gather(leader, follower, return_exceptions=True)
+
+    leader, follower = asyncio.run(main())
+    assert isinstance(leader, asyncio.CancelledError)
+    assert follower == (2, False)
+
+
+def test_fingerprint_failure_falls_back_to_a_plain_analysis(monkeypatch):
+    from fastapi.testclient import TestClient
+
+    from ai_core.main import app
+    from ai_core.routers import analyze_impl
+
+    def broken_key(*args, **kwargs):
+        raise ValueError("cannot fingerprint")
+
+    monkeypatch.setattr(analyze_impl, "_analysis_key", broken_key)
+    monkeypatch.setattr(analyze_impl, "run_analysis_core", lambda db, X, y, name, meta=None, **kw: (f"aid-{kw['cache_key']}", {}))
+    payload = {"dataset_name": "plain", "data": {"a": [1, 2, 3, 4], "b": [4, 3, 2, 1]}}
+    res = TestClient(app).post("/ai_core/analyze", json=payload)
+    assert res.status_code == 200 and res.json()["analysis_id"] == "aid-None"
+
+    calls = []
+    monkeypatch.setattr(analyze_impl, "_analysis_key", lambda *a: calls.append(1) or "k")
+    monkeypatch.setenv("AI_CORE_ANALYZE_COALESCE", "0")
+    monkeypatch.setenv("AI_CORE_ANALYSIS_CACHE", "0")
+    assert TestClient(app).post("/ai_core/analyze", json=payload).status_code == 200
+    assert calls == []
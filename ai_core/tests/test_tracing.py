@@ -0,0 +1,62 @@
+from fastapi.testclient import TestClient
+
+from ai_core.main import app
+from ai_core.utils import tracing
+
+
+def test_stages_are_collected_only_inside_trace():
+    with tracing.stage("outside"):
+        pass
+    with tracing.trace() as spans:
+        with tracing.stage("parse"):
+            pass
+        tracing.record_stage("shap", 0.25)
+        tracing.record_stage("shap", 0.5)
+        assert [name for name, _ in tracing.current_spans()] == ["parse", "shap", "shap"]
+    assert tracing.current_spans() == []
+    assert tracing.stage_totals(spans)["shap"] == 0.75
+
+
+def test_server_timing_format():
+    header = tracing.server_timing([("parse", 0.0012), ("train", 0.5), ("train", 0.25)], total=1.0)
+    assert header == "parse;dur=1.2, train;dur=750.0, total;dur=1000.0"
+
+
+def test_analyze_sets_server_timing_header(monkeypatch):
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "traced-1")
+    payload = {"dataset_name": "traced", "data": {"a": [1, 2, 3, 4, 5, 6], "b": [3, 1, 4, 1, 5, 9]}}
+    res = TestClient(app).post("/ai_core/analyze", json=payload)
+    assert res.status_code == 200
+    header = res.headers["server-timing"]
+    for name in ("parse", "validate", "frame", "train", "shap", "persist", "total"):
+        assert f"{name};dur=" in header
+
+
+def test_server_timing_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("AI_CORE_SERVER_TIMING", "0")
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "traced-2")
+    res = TestClient(app).post("/ai_core/analyze", json={"dataset_name": "traced", "data": {"a": [1, 2, 3, 4]}})
+    assert res.status_code == 200
+    assert "server-timing" not in res.headers
+
+
+def _sample_total(name, **labels):
+    from prometheus_client import REGISTRY
+
+    return sum(
+        s.value
+        for metric in REGISTRY.collect()
+        for s in metric.samples
+        if s.name == name and all(s.labels.get(k) == v for k, v in labels.items())
+    )
+
+
+def test_analyze_records_shap_and_preprocessing_metrics(monkeypatch):
+    monkeypatch.setattr("ai_core.routers.analyze.store_analysis", lambda db, name, doc: "traced-3")
+    shap_before = _sample_total("ethixai_aicore_shap_samples_processed_total", backend="linear")
+    prep_before = _sample_total("ethixai_aicore_data_preprocessing_duration_seconds_count")
+    payload = {"dataset_name": "metered", "data": {"a": [1.0, 2, 3, 4, 5, 6], "b": [3.0, 1, 4, 1, 5, 9]}}
+    assert TestClient(app).post("/ai_core/analyze", json=payload).status_code == 200
+    assert _sample_total("ethixai_aicore_shap_samples_processed_total", backend="linear") == shap_before + 6
+    # "frame" and "encode" both feed the preprocessing histogram
+    assert _sample_total("ethixai_aicore_data_preprocessing_duration_seconds_count") >= prep_before + 2
@@ -0,0 +1,41 @@
+from fastapi.testclient import TestClient
+
+import ai_core.main as main
+from ai_core.utils import warmup
+
+
+def test_run_warmup_exercises_hot_paths(monkeypatch):
+    monkeypatch.setenv("AI_CORE_WARMUP_ROWS", "80")
+    state = warmup.run_warmup()
+    assert state["status"] == "done", state
+    assert {"train", "explain", "fairness"} <= set(state["stages"])
+
+
+def test_warmup_can_be_disabled(monkeypatch):
+    monkeypatch.setenv("AI_CORE_WARMUP", "0")
+    assert warmup.run_warmup()["status"] == "skipped"
+
+
+def test_probes_report_starting_until_warm(monkeypatch):
+    client = TestClient(main.app)
+    monkeypatch.setattr(main, "_STARTUP_COMPLETE", False)
+    r = client.get("/health/startup")
+    assert r.status_code == 503 and r.json()["status"] == "starting"
+    r = client.get("/health/readiness")
+    assert r.status_code == 503 and r.json()["status"] == "starting"
+
+    monkeypatch.setenv("AI_CORE_WARMUP", "0")
+    main._background_startup()
+    r = client.get("/health/startup")
+    assert r.status_code == 200 and r.json()["status"] == "started"
+
+
+def test_warmup_bypasses_model_and_shap_caches(monkeypatch):
+    from ai_core.utils import model_cache, shap_cache
+
+    touched = []
+    monkeypatch.setattr(model_cache, "get_model_cache", lambda: touched.append("model"))
+    monkeypatch.setattr(shap_cache, "get_tiered_shap_cache", lambda: touched.append("shap"))
+    monkeypatch.setenv("AI_CORE_WARMUP_ROWS", "80")
+    assert warmup.run_warmup()["status"] == "done"
+    assert touched == []
@@ -0,0 +1,149 @@
+import json
+import sys
+
+from ai_core.utils import persistence
+from ai_core.utils.write_behind import WriteBehindPersister, _file_lock
+
+
+class DuplicateKey(Exception):
+    def __init__(self, n):
+        super().__init__("duplicate key")
+        self.details = {"writeErrors": [{"code": 11000}] * n}
+
+
+class DocumentTooLarge(Exception):
+    pass
+
+
+class FakeColl:
+    def __init__(self, db):
+        self.db = db
+        self.docs = {}
+        self.upserts = []
+        self.calls = []
+
+    def insert_many(self, docs, ordered=True):
+        self.db.check()
+        if any(d.get("huge") for d in docs):
+            raise DocumentTooLarge("BSON document too large")
+        self.calls.append(("insert_many", len(docs)))
+        dupes = [d for d in docs if d["_id"] in self.docs]
+        for d in docs:
+            self.docs.setdefault(d["_id"], d)
+        if dupes:
+            raise DuplicateKey(len(dupes))
+
+    def bulk_write(self, requests, ordered=True):
+        self.db.check()
+        self.calls.append(("bulk_write", len(requests)))
+        self.upserts.extend(requests)
+
+
+class FakeDB:
+    def __init__(self):
+        self.up = True
+        self.colls = {}
+
+    def check(self):
+        if not self.up:
+            raise ConnectionError("mongo unreachable")
+
+    def get_collection(self, name):
+        return self.colls.setdefault(name, FakeColl(self))
+
+
+def _persister(db, tmp_path, **kw):
+    return WriteBehindPersister(lambda: db, spool_path=str(tmp_path / "spool.jsonl"), flush_interval=60, **kw)
+
+
+def test_batches_inserts_and_upserts(tmp_path):
+    db = FakeDB()
+    p = _persister(db, tmp_path, batch_size=50)
+    ids = [p.submit_insert("analyses", {"n": i}) for i in range(120)]
+    p.submit_upsert("shap_cache", {"model_hash": "m", "baseline_hash": "b"}, {"shap_summary": {"x": 1.0}})
+    assert p.flush()
+    analyses = db.get_collection("analyses")
+    assert set(analyses.docs) == set(ids)
+    assert analyses.calls == [("insert_many", 50), ("insert_many", 50), ("insert_many", 20)]
+    assert db.get_collection("shap_cache").calls == [("bulk_write", 1)]
+    p.close()
+
+
+def test_unreachable_db_spools_and_replays(tmp_path):
+    db = FakeDB()
+    db.up = False
+    p = _persister(db, tmp_path, batch_size=10)
+    ids = [p.submit_insert("analyses", {"n": i, "score": 0.5}) for i in range(25)]
+    assert not p.flush()
+    assert p.spool_size() > 0 and p.pending() == 0
+
+    db.up = True
+    # one document already landed before the outage was noticed: replay must not fail on it
+    db.get_collection("analyses").docs[ids[0]] = {"_id": ids[0]}
+    assert p.flush()
+    assert p.spool_size() == 0
+    assert set(db.get_collection("analyses").docs) == set(ids)
+    p.close()
+
+
+def test_full_queue_goes_to_spool(tmp_path):
+    db = FakeDB()
+    p = _persister(db, tmp_path, max_queue=2)
+    for i in range(5):
+        p.submit_insert("analyses", {"n": i})
+    assert p.pending() == 2 and p.spool_size() > 0
+    assert p.flush()
+    assert len(db.get_collection("analyses").docs) == 5
+    p.close()
+
+
+def test_analyze_store_returns_pre_generated_id(monkeypatch, tmp_path):
+    db = FakeDB()
+    monkeypatch.setitem(sys.modules, "ai_core.utils.persistence", persistence)
+    monkeypatch.setattr(persistence, "_PERSISTER", _persister(db, tmp_path))
+    monkeypatch.setattr(persistence, "get_persister", lambda: persistence._PERSISTER)
+    from ai_core.routers import analyze
+
+    aid = analyze.store_analysis(db, "wb", {"summary": {}})
+    assert db.get_collection("analyses").docs == {}  # nothing written on the request path
+    persistence._PERSISTER.flush()
+    assert [str(k) for k in db.get_collection("analyses").docs] == [aid]
+    persistence._PERSISTER.close()
+
+
+def test_write_behind_inactive_without_mongo(monkeypatch):
+    monkeypatch.delenv("MONGO_URI", raising=False)
+    monkeypatch.delenv("MONGO_URL", raising=False)
+    assert persistence.get_persister() is None
+    assert persistence.enqueue_analysis("x", {}) is None
+    assert persistence.enqueue_shap_cache("m", "b", {}) is False
+
+
+def test_rejected_documents_are_dead_lettered_not_replayed_forever(tmp_path):
+    db = FakeDB()
+    db.up = False
+    p = _persister(db, tmp_path, batch_size=10)
+    ids = [p.submit_insert("analyses", {"n": i, "huge": i == 3}) for i in range(12)]
+    assert not p.flush()
+
+    db.up = True
+    assert p.flush()
+    assert p.spool_size() == 0
+    assert set(db.get_collection("analyses").docs) == set(ids) - {ids[3]}
+    dead = [json.loads(line) for line in open(tmp_path / "spool.jsonl.dead")]
+    assert [d["doc"]["n"] for d in dead] == [3] and "DocumentTooLarge" in dead[0]["error"]
+    p.close()
+
+
+def test_replay_is_left_to_the_process_holding_the_replay_lock(tmp_path):
+    db = FakeDB()
+    db.up = False
+    p = _persister(db, tmp_path)
+    p.submit_insert("analyses", {"n": 1})
+    assert not p.flush()
+    db.up = True
+    with _file_lock(str(tmp_path / "spool.jsonl.replay.lock")):
+        assert p.flush()  # another worker is replaying: nothing to do here
+        assert db.get_collection("analyses").docs == {} and p.spool_size() > 0
+    assert p.flush() and len(db.get_collection("analyses").docs) == 1
+    p.close()
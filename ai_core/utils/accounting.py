@@ -0,0 +1,179 @@
+"""Per-request resource accounting.
+
+``track(endpoint)`` measures what one analysis costs: wall time, process CPU
+time (user + system, so BLAS/OpenMP worker threads are included), CPU time of
+the calling thread, RSS growth and the rows x features processed. Code deeper
+in the pipeline attaches what it used (estimator, explainer) through
+``note()``, which is a no-op outside a tracked request. ``finish()`` freezes
+the numbers and exports them as ``ethixai_aicore_request_*`` histograms; the
+dict form is stored on the analysis document as ``resource_usage``.
+
+Process CPU and RSS are process-wide, so concurrent requests inflate each
+other's figures; ``thread_cpu_seconds`` is the uncontended lower bound.
+
+Configuration (environment):
+- AI_CORE_ACCOUNTING_TRACEMALLOC (default 0): also report ``peak_traced_bytes``
+  via tracemalloc. Tracing slows allocation-heavy code noticeably, and the
+  peak is process-wide, so leave it off outside profiling runs.
+"""
+from __future__ import annotations
+
+import contextvars
+import importlib
+import os
+import sys
+import time
+import tracemalloc
+from contextlib import contextmanager
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterator, Optional
+
+try:
+    import resource  # type: ignore
+except ImportError:  # pragma: no cover - not available on Windows
+    resource = None  # type: ignore
+
+_CURRENT: contextvars.ContextVar[Optional["ResourceUsage"]] = contextvars.ContextVar("ai_core_usage", default=None)
+
+
+def _tracemalloc_enabled() -> bool:
+    return os.environ.get("AI_CORE_ACCOUNTING_TRACEMALLOC", "0").lower() in ("1", "true", "yes")
+
+
+def _rss_bytes() -> Optional[int]:
+    try:
+        with open("/proc/self/statm", "rb") as fh:
+            return int(fh.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    except Exception:
+        return None
+
+
+def _max_rss_bytes() -> Optional[int]:
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in kilobytes on Linux and bytes on macOS
+    return int(peak) if sys.platform == "darwin" else int(peak) * 1024
+
+
+def describe_estimator(model: Any) -> str:
+    """Class name of the final estimator (``Pipeline(StandardScaler, LogisticRegression)`` -> ``LogisticRegression``)."""
+    steps = getattr(model, "steps", None)
+    if steps:
+        return type(steps[-1][1]).__name__
+    return type(model).__name__
+
+
+@dataclass
+class ResourceUsage:
+    endpoint: str
+    n_rows: int = 0
+    n_features: int = 0
+    estimator: Optional[str] = None
+    explainer: Optional[str] = None
+    threads: Optional[int] = None
+    wall_seconds: float = 0.0
+    cpu_seconds: float = 0.0
+    thread_cpu_seconds: float = 0.0
+    rss_delta_bytes: Optional[int] = None
+    peak_rss_delta_bytes: Optional[int] = None
+    peak_traced_bytes: Optional[int] = None
+    _start: Dict[str, Any] = field(default_factory=dict, repr=False)
+    _finished: bool = field(default=False, repr=False)
+
+    @property
+    def row_features(self) -> int:
+        return int(self.n_rows) * int(self.n_features)
+
+    @property
+    def cpu_seconds_per_row_feature(self) -> Optional[float]:
+        return self.cpu_seconds / self.row_features if self.row_features else None
+
+    @property
+    def peak_memory_bytes(self) -> Optional[int]:
+        return self.peak_traced_bytes if self.peak_traced_bytes is not None else self.peak_rss_delta_bytes
+
+    def start(self) -> "ResourceUsage":
+        self._start = {
+            "wall": time.perf_counter(),
+            "cpu": time.process_time(),
+            "thread": time.thread_time(),
+            "rss": _rss_bytes(),
+            "max_rss": _max_rss_bytes(),
+        }
+        if _tracemalloc_enabled():
+            if not tracemalloc.is_tracing():
+                tracemalloc.start()
+            tracemalloc.reset_peak()
+            self._start["traced"] = tracemalloc.get_traced_memory()[0]
+        return self
+
+    def finish(self) -> "ResourceUsage":
+        """Freeze the measurements and export them; later calls are no-ops."""
+        if self._finished or not self._start:
+            return self
+        self._finished = True
+        s = self._start
+        self.wall_seconds = time.perf_counter() - s["wall"]
+        self.cpu_seconds = time.process_time() - s["cpu"]
+        self.thread_cpu_seconds = time.thread_time() - s["thread"]
+        rss = _rss_bytes()
+        if rss is not None and s["rss"] is not None:
+            self.rss_delta_bytes = rss - s["rss"]
+        max_rss = _max_rss_bytes()
+        if max_rss is not None and s["max_rss"] is not None:
+            # the lifetime peak only moves when this request pushed it higher
+            self.peak_rss_delta_bytes = max(max_rss - s["max_rss"], max(self.rss_delta_bytes or 0, 0))
+        if "traced" in s and tracemalloc.is_tracing():
+            self.peak_traced_bytes = max(tracemalloc.get_traced_memory()[1] - s["traced"], 0)
+        _export(self)
+        return self
+
+    def as_dict(self) -> Dict[str, Any]:
+        out = {k: v for k, v in asdict(self).items() if not k.startswith("_")}
+        out["row_features"] = self.row_features
+        out["cpu_seconds_per_row_feature"] = self.cpu_seconds_per_row_feature
+        return out
+
+
+def _export(usage: ResourceUsage) -> None:
+    try:
+        try:
+            m = importlib.import_module("ai_core.utils.metrics")
+        except Exception:
+            m = importlib.import_module("utils.metrics")
+        m.record_resource_usage(
+            usage.endpoint,
+            usage.cpu_seconds,
+            usage.wall_seconds,
+            peak_memory_bytes=usage.peak_memory_bytes,
+            row_features=usage.row_features,
+        )
+    except Exception:
+        pass
+
+
+@contextmanager
+def track(endpoint: str, n_rows: int = 0, n_features: int = 0) -> Iterator[ResourceUsage]:
+    """Account the enclosed block to ``endpoint``; finishes on exit if the caller has not."""
+    usage = ResourceUsage(endpoint=endpoint, n_rows=n_rows, n_features=n_features).start()
+    token = _CURRENT.set(usage)
+    try:
+        yield usage
+    finally:
+        _CURRENT.reset(token)
+        usage.finish()
+
+
+def current_usage() -> Optional[ResourceUsage]:
+    return _CURRENT.get()
+
+
+def note(**fields: Any) -> None:
+    """Set fields (e.g. ``explainer="tree"``) on the active request's usage, if any."""
+    usage = _CURRENT.get()
+    if usage is None:
+        return
+    for key, value in fields.items():
+        if hasattr(usage, key) and not key.startswith("_"):
+            setattr(usage, key, value)
@@ -0,0 +1,361 @@
+"""Cost-based admission control for analyses.
+
+``MAX_ROWS`` bounds a single request, not how many large requests run at once.
+The ``AdmissionController`` estimates what an analysis will cost before it
+starts and admits it only while the estimated cost of everything in flight
+stays within a global budget:
+
+- cost is estimated CPU seconds and peak memory, each ``rows x features``
+  times a per-row-feature rate. Rates are learned per (estimator, explainer)
+  from the ``resource_usage`` measured for every finished analysis (and from
+  stored analyses at startup); an estimate uses the most expensive explainer
+  seen for the estimator. Until there is history the priors below apply.
+- requests that do not fit wait in a bounded FIFO queue until capacity frees
+  up or their deadline passes; when the queue is full or the deadline passes
+  they are rejected with ``AdmissionRejected`` (HTTP 429 with Retry-After).
+- a request larger than the whole budget is admitted only when nothing else
+  is running, so it can still complete.
+
+Configuration (environment):
+- AI_CORE_ADMISSION: set to 0 to disable admission control (default 1)
+- AI_CORE_ADMISSION_CPU_SECONDS: in-flight CPU seconds budget (default 20 x cores)
+- AI_CORE_ADMISSION_MEMORY_BYTES: in-flight memory budget (default half the
+  cgroup/host memory; 0 disables the memory check)
+- AI_CORE_ADMISSION_QUEUE: requests allowed to wait (default 16)
+- AI_CORE_ADMISSION_WAIT_SECONDS: how long a request may wait (default 5)
+- AI_CORE_ADMISSION_CPU_PER_CELL: prior CPU seconds per row-feature (default 2e-6)
+- AI_CORE_ADMISSION_BYTES_PER_CELL: minimum bytes per row-feature (default 64)
+
+Exported metrics (when prometheus_client is installed):
+- ai_core_admission_queue_depth: requests waiting for admission
+- ai_core_admission_inflight_cpu_seconds: estimated CPU seconds admitted and running
+- ai_core_admission_rejected_total{reason}: requests shed (queue_full, timeout)
+- ai_core_admission_wait_seconds: time admitted requests spent waiting
+"""
+from __future__ import annotations
+
+import asyncio
+import math
+import os
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, Optional, Tuple
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+
+    ADMISSION_QUEUE_DEPTH = Gauge("ai_core_admission_queue_depth", "Requests waiting for admission")
+    ADMISSION_INFLIGHT_CPU = Gauge("ai_core_admission_inflight_cpu_seconds", "Estimated CPU seconds of admitted analyses")
+    ADMISSION_REJECTED = Counter("ai_core_admission_rejected_total", "Requests rejected by admission control", ["reason"])
+    ADMISSION_WAIT = Histogram("ai_core_admission_wait_seconds", "Time admitted requests waited for capacity")
+except Exception:  # pragma: no cover
+    ADMISSION_QUEUE_DEPTH = ADMISSION_INFLIGHT_CPU = ADMISSION_REJECTED = ADMISSION_WAIT = None
+
+
+def _observe(metric: Any, method: str, *args: Any, **labels: Any) -> None:
+    try:
+        if metric is not None:
+            getattr(metric.labels(**labels) if labels else metric, method)(*args)
+    except Exception:
+        pass
+
+
+class AdmissionRejected(Exception):
+    """Raised when a request is shed; ``retry_after`` is a hint in whole seconds."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(f"admission rejected ({reason})")
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+@dataclass(frozen=True)
+class Cost:
+    cpu_seconds: float
+    memory_bytes: float
+
+
+class CostModel:
+    """Per-row-feature CPU and memory rates learned from measured analyses.
+
+    Each (estimator, explainer) keeps exponentially decayed sums of measured
+    CPU seconds, peak bytes and row-features; the rate is their ratio, so
+    large analyses (the ones that matter for admission) dominate it.
+    """
+
+    def __init__(self, cpu_per_cell: float = 2e-6, bytes_per_cell: float = 64.0, min_cpu_seconds: float = 0.05, decay: float = 0.95):
+        self.cpu_per_cell = float(cpu_per_cell)
+        self.bytes_per_cell = float(bytes_per_cell)
+        self.min_cpu_seconds = float(min_cpu_seconds)
+        self.decay = float(decay)
+        self._sums: Dict[Tuple[str, str], list] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, usage: Any) -> bool:
+        """Learn from a ``ResourceUsage`` (or its ``as_dict()``); False if it was unusable."""
+        get = usage.get if isinstance(usage, dict) else (lambda k, d=None: getattr(usage, k, d))
+        cells = int(get("n_rows", 0) or 0) * int(get("n_features", 0) or 0)
+        cpu = get("cpu_seconds")
+        if cells <= 0 or not cpu or cpu <= 0:
+            return False
+        # a cached explanation skipped the expensive part; it would drag the rates down
+        if str(get("explainer") or "").startswith("cache:"):
+            return False
+        # process CPU also counts concurrent requests; bound it by this analysis' threads
+        wall, threads = get("wall_seconds"), get("threads")
+        if wall and threads:
+            cpu = min(cpu, wall * threads)
+        peak = get("peak_traced_bytes")
+        if peak is None:
+            peak = get("peak_rss_delta_bytes")
+        key = (str(get("estimator") or "*"), str(get("explainer") or "*"))
+        with self._lock:
+            s = self._sums.setdefault(key, [0.0, 0.0, 0.0, 0.0])  # cpu, cells, bytes, bytes_cells
+            s[0] = s[0] * self.decay + cpu
+            s[1] = s[1] * self.decay + cells
+            if peak and peak > 0:
+                s[2] = s[2] * self.decay + peak
+                s[3] = s[3] * self.decay + cells
+        return True
+
+    def calibrate(self, usages: Iterable[Any]) -> int:
+        """Observe stored measurements (oldest first); returns how many were usable."""
+        return sum(1 for usage in usages if usage and self.observe(usage))
+
+    def rates(self, estimator: Optional[str] = None) -> Tuple[float, float]:
+        """(CPU seconds, bytes) per row-feature for ``estimator`` (any estimator if unseen)."""
+        with self._lock:
+            keyed = [s for (est, _), s in self._sums.items() if est == estimator] if estimator else []
+            samples = keyed or list(self._sums.values())
+            cpu = [s[0] / s[1] for s in samples if s[1] > 0]
+            mem = [s[2] / s[3] for s in samples if s[3] > 0]
+        return (max(cpu) if cpu else self.cpu_per_cell, max(mem + [self.bytes_per_cell]))
+
+    def estimate(self, n_rows: int, n_features: int, estimator: Optional[str] = None) -> Cost:
+        cells = max(0, int(n_rows)) * max(0, int(n_features))
+        cpu_rate, mem_rate = self.rates(estimator)
+        return Cost(max(self.min_cpu_seconds, cpu_rate * cells), mem_rate * cells)
+
+
+class _Waiter:
+    __slots__ = ("cost", "wake", "granted")
+
+    def __init__(self, cost: Cost, wake: Callable[[], None]):
+        self.cost = cost
+        self.wake = wake
+        self.granted = False
+
+
+class AdmissionController:
+    """Admit work while the estimated in-flight cost fits the budget."""
+
+    def __init__(
+        self,
+        cpu_budget: float,
+        memory_budget: Optional[float] = None,
+        max_queue: int = 16,
+        max_wait: float = 5.0,
+        cores: int = 1,
+        model: Optional[CostModel] = None,
+    ):
+        self.cpu_budget = float(cpu_budget)
+        self.memory_budget = float(memory_budget) if memory_budget else None
+        self.max_queue = max(0, int(max_queue))
+        self.max_wait = float(max_wait)
+        self.cores = max(1, int(cores))
+        self.model = model or CostModel()
+        self._lock = threading.Lock()
+        self._waiters: Deque[_Waiter] = deque()
+        self._running = 0
+        self._cpu = 0.0
+        self._memory = 0.0
+
+    # -- estimates ------------------------------------------------------------
+
+    def estimate(self, n_rows: int, n_features: int, estimator: Optional[str] = None) -> Cost:
+        return self.model.estimate(n_rows, n_features, estimator)
+
+    def observe(self, usage: Any) -> bool:
+        return self.model.observe(usage)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {"running": self._running, "queued": len(self._waiters), "cpu_seconds": self._cpu, "memory_bytes": self._memory}
+
+    # -- admission --------------------------------------------------------------
+
+    def _fits(self, cost: Cost) -> bool:
+        if self._running == 0:
+            return True
+        if self._cpu + cost.cpu_seconds > self.cpu_budget:
+            return False
+        return self.memory_budget is None or self._memory + cost.memory_bytes <= self.memory_budget
+
+    def _take(self, cost: Cost) -> None:
+        self._running += 1
+        self._cpu += cost.cpu_seconds
+        self._memory += cost.memory_bytes
+        _observe(ADMISSION_INFLIGHT_CPU, "set", self._cpu)
+
+    def _grant_waiters(self) -> None:
+        # strict FIFO: a large request at the head is not starved by smaller ones
+        while self._waiters and self._fits(self._waiters[0].cost):
+            waiter = self._waiters.popleft()
+            self._take(waiter.cost)
+            waiter.granted = True
+            waiter.wake()
+        _observe(ADMISSION_QUEUE_DEPTH, "set", len(self._waiters))
+
+    def retry_after(self) -> int:
+        """Seconds until the admitted work should have drained (1..60)."""
+        return int(min(60, max(1, math.ceil(self._cpu / self.cores))))
+
+    def _reject(self, reason: str) -> AdmissionRejected:
+        _observe(ADMISSION_REJECTED, "inc", reason=reason)
+        return AdmissionRejected(reason, self.retry_after())
+
+    def _enter(self, cost: Cost, wake: Callable[[], None], bounded: bool) -> Optional[_Waiter]:
+        """Admit now (None) or enqueue and return the waiter; raises when the queue is full."""
+        with self._lock:
+            if not self._waiters and self._fits(cost):
+                self._take(cost)
+                return None
+            if bounded and len(self._waiters) >= self.max_queue:
+                raise self._reject("queue_full")
+            waiter = _Waiter(cost, wake)
+            self._waiters.append(waiter)
+            _observe(ADMISSION_QUEUE_DEPTH, "set", len(self._waiters))
+            return waiter
+
+    def _abandon(self, waiter: _Waiter) -> bool:
+        """Withdraw a waiter that stopped waiting; True if it was admitted meanwhile."""
+        with self._lock:
+            if waiter.granted:
+                return True
+            try:
+                self._waiters.remove(waiter)
+            except ValueError:
+                pass
+            self._grant_waiters()
+            return False
+
+    async def acquire(self, cost: Cost, timeout: Optional[float] = None) -> None:
+        """Wait (up to ``timeout``, default ``max_wait``) until ``cost`` is admitted."""
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+
+        def wake() -> None:
+            loop.call_soon_threadsafe(lambda: future.done() or future.set_result(None))
+
+        start = time.perf_counter()
+        waiter = self._enter(cost, wake, bounded=True)
+        if waiter is None:
+            _observe(ADMISSION_WAIT, "observe", 0.0)
+            return
+        try:
+            await asyncio.wait_for(asyncio.shield(future), self.max_wait if timeout is None else timeout)
+        except asyncio.TimeoutError:
+            if not self._abandon(waiter):
+                raise self._reject("timeout")
+        except BaseException:
+            # cancelled (client went away): give back capacity granted meanwhile
+            if self._abandon(waiter):
+                self.release(cost)
+            raise
+        _observe(ADMISSION_WAIT, "observe", time.perf_counter() - start)
+
+    def acquire_sync(self, cost: Cost, timeout: Optional[float] = None, bounded: bool = True) -> None:
+        """Blocking ``acquire`` for worker threads; ``timeout=None`` with ``bounded=False`` waits indefinitely."""
+        event = threading.Event()
+        start = time.perf_counter()
+        waiter = self._enter(cost, event.set, bounded=bounded)
+        if waiter is None:
+            _observe(ADMISSION_WAIT, "observe", 0.0)
+            return
+        wait = timeout if timeout is not None else (self.max_wait if bounded else None)
+        if not event.wait(wait) and not self._abandon(waiter):
+            raise self._reject("timeout")
+        _observe(ADMISSION_WAIT, "observe", time.perf_counter() - start)
+
+    def release(self, cost: Cost) -> None:
+        with self._lock:
+            self._running = max(0, self._running - 1)
+            self._cpu = max(0.0, self._cpu - cost.cpu_seconds) if self._running else 0.0
+            self._memory = max(0.0, self._memory - cost.memory_bytes) if self._running else 0.0
+            _observe(ADMISSION_INFLIGHT_CPU, "set", self._cpu)
+            self._grant_waiters()
+
+    @contextmanager
+    def admitted(self, cost: Cost, timeout: Optional[float] = None, bounded: bool = True) -> Iterator[Cost]:
+        """Hold admission for ``cost`` in a worker thread for the enclosed block."""
+        self.acquire_sync(cost, timeout=timeout, bounded=bounded)
+        try:
+            yield cost
+        finally:
+            self.release(cost)
+
+
+def admission_enabled() -> bool:
+    return os.environ.get("AI_CORE_ADMISSION", "1").lower() not in ("0", "false", "no")
+
+
+def _memory_limit_bytes() -> Optional[int]:
+    """cgroup memory limit, else total host memory."""
+    for path in ("/sys/fs/cgroup/memory.max", "/sys/fs/cgroup/memory/memory.limit_in_bytes"):
+        try:
+            with open(path, encoding="ascii") as fh:
+                raw = fh.read().strip()
+            if raw != "max" and int(raw) < 1 << 60:
+                return int(raw)
+        except (OSError, ValueError):
+            continue
+    try:
+        with open("/proc/meminfo", encoding="ascii") as fh:
+            for line in fh:
+                if line.startswith("MemTotal:"):
+                    return int(line.split()[1]) * 1024
+    except (OSError, ValueError, IndexError):
+        pass
+    return None
+
+
+def _default_cores() -> int:
+    try:
+        from .cpu_budget import get_budget
+
+        return get_budget().cores
+    except Exception:
+        return os.cpu_count() or 1
+
+
+_CONTROLLER: Optional[AdmissionController] = None
+_CONTROLLER_LOCK = threading.Lock()
+
+
+def get_controller() -> AdmissionController:
+    """Process-wide controller built from the environment on first use."""
+    global _CONTROLLER
+    if _CONTROLLER is None:
+        with _CONTROLLER_LOCK:
+            if _CONTROLLER is None:
+                cores = _default_cores()
+                cpu_budget = os.environ.get("AI_CORE_ADMISSION_CPU_SECONDS")
+                memory_budget = os.environ.get("AI_CORE_ADMISSION_MEMORY_BYTES")
+                if memory_budget is None:
+                    limit = _memory_limit_bytes()
+                    memory_budget = str(limit // 2) if limit else "0"
+                _CONTROLLER = AdmissionController(
+                    cpu_budget=float(cpu_budget) if cpu_budget else 20.0 * cores,
+                    memory_budget=float(memory_budget) or None,
+                    max_queue=int(os.environ.get("AI_CORE_ADMISSION_QUEUE", "16")),
+                    max_wait=float(os.environ.get("AI_CORE_ADMISSION_WAIT_SECONDS", "5")),
+                    cores=cores,
+                    model=CostModel(
+                        cpu_per_cell=float(os.environ.get("AI_CORE_ADMISSION_CPU_PER_CELL", "2e-6")),
+                        bytes_per_cell=float(os.environ.get("AI_CORE_ADMISSION_BYTES_PER_CELL", "64")),
+                    ),
+                )
+    return _CONTROLLER
@@ -0,0 +1,254 @@
+"""CPU thread budget shared by concurrent analyses.
+
+LightGBM, XGBoost, BLAS and OpenMP (KMeans) each size their thread pools to
+every core in the machine. With several analyses in flight per worker and
+several uvicorn workers per host, that multiplies into far more runnable
+threads than cores. ``CpuBudget`` holds a pool of ``cores`` thread tokens and
+leases each analysis ``cores // in-flight analyses`` of them (at least
+``min_threads``, at most the tokens left) for its whole run. An analysis that
+arrives while fewer than ``min_threads`` tokens are free waits for one to end,
+so the leased threads never add up to more than ``cores``:
+
+- estimators get it as ``n_jobs`` (see ``model_helper._fit_estimator``);
+- BLAS and OpenMP pools are limited through threadpoolctl when it is
+  installed. BLAS limits are process-wide and follow the current quota;
+  OpenMP limits are per thread, are set in the thread running the analysis
+  and restored there when the lease ends.
+
+The core count defaults to the CPUs this process may run on (affinity and the
+cgroup CPU quota) divided by every process that budgets for itself: each
+uvicorn worker (WEB_CONCURRENCY) plus the analysis job pool processes it
+starts (AI_CORE_JOB_WORKERS, see ``jobs``).
+
+Configuration (environment):
+- AI_CORE_CPU_BUDGET: set to 0 to disable quotas (default 1)
+- AI_CORE_CPU_CORES: cores available to this worker process (default: derived)
+- AI_CORE_MIN_THREADS: smallest quota handed out (default 1)
+
+Exported metrics (when prometheus_client is installed):
+- ai_core_cpu_active_analyses: analyses currently holding a quota
+- ai_core_cpu_thread_quota: quota handed to the most recent analysis
+"""
+from __future__ import annotations
+
+import contextvars
+import logging
+import math
+import os
+import sys
+import threading
+from contextlib import contextmanager
+from typing import Any, Iterator, Optional
+
+from .jobs import job_worker_processes
+
+logger = logging.getLogger("ai_core.cpu_budget")
+
+try:
+    from prometheus_client import Gauge  # type: ignore
+
+    CPU_ACTIVE_ANALYSES = Gauge("ai_core_cpu_active_analyses", "Analyses currently holding a CPU thread quota")
+    CPU_THREAD_QUOTA = Gauge("ai_core_cpu_thread_quota", "Thread quota assigned to the most recent analysis")
+except Exception:  # pragma: no cover
+    CPU_ACTIVE_ANALYSES = CPU_THREAD_QUOTA = None
+
+_THREADS: contextvars.ContextVar[Optional[int]] = contextvars.ContextVar("ai_core_cpu_threads", default=None)
+
+
+def _observe(metric: Any, method: str, *args: Any) -> None:
+    try:
+        if metric is not None:
+            getattr(metric, method)(*args)
+    except Exception:
+        pass
+
+
+def _cgroup_cpu_limit() -> Optional[int]:
+    """Whole CPUs allowed by a cgroup v2 (or v1) CPU quota, if any."""
+    try:
+        with open("/sys/fs/cgroup/cpu.max", encoding="ascii") as fh:
+            quota, period = fh.read().split()[:2]
+        if quota != "max":
+            return max(1, math.ceil(int(quota) / int(period)))
+        return None
+    except (OSError, ValueError):
+        pass
+    try:
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_quota_us", encoding="ascii") as fh:
+            quota_us = int(fh.read())
+        with open("/sys/fs/cgroup/cpu/cpu.cfs_period_us", encoding="ascii") as fh:
+            period_us = int(fh.read())
+        if quota_us > 0 and period_us > 0:
+            return max(1, math.ceil(quota_us / period_us))
+    except (OSError, ValueError):
+        pass
+    return None
+
+
+def available_cores() -> int:
+    """Cores this worker process should use when AI_CORE_CPU_CORES is unset."""
+    try:
+        cores = len(os.sched_getaffinity(0))
+    except (AttributeError, OSError):
+        cores = os.cpu_count() or 1
+    limit = _cgroup_cpu_limit()
+    if limit is not None:
+        cores = min(cores, limit)
+    try:
+        workers = max(1, int(os.environ.get("WEB_CONCURRENCY", "1")))
+    except ValueError:
+        workers = 1
+    # every web worker and each of its job pool processes holds its own budget
+    return max(1, cores // (workers * (1 + job_worker_processes())))
+
+
+class _ThreadpoolLimiter:
+    """Apply limits to native thread pools through threadpoolctl (optional)."""
+
+    def __init__(self):
+        self._controller: Any = None
+        self._modules_seen = 0
+        self._unavailable = False
+
+    def _get_controller(self) -> Any:
+        if self._unavailable:
+            return None
+        # rescan when new modules were imported: they may have loaded new pools
+        if self._controller is None or len(sys.modules) != self._modules_seen:
+            try:
+                from threadpoolctl import ThreadpoolController  # type: ignore
+            except Exception:
+                self._unavailable = True
+                return None
+            self._modules_seen = len(sys.modules)
+            self._controller = ThreadpoolController()
+        return self._controller
+
+    def limit(self, threads: int, user_api: Optional[str] = None) -> Any:
+        """Limit the pools to ``threads``; returns a handle for ``restore``."""
+        try:
+            controller = self._get_controller()
+            if controller is None:
+                return None
+            if user_api is not None:
+                controller = controller.select(user_api=user_api)
+            return controller.limit(limits=threads)
+        except Exception:
+            logger.debug("threadpool limit failed", exc_info=True)
+            return None
+
+    def restore(self, handle: Any) -> None:
+        """Put back the limits that were in place before ``limit`` returned ``handle``."""
+        try:
+            if handle is not None:
+                handle.restore_original_limits()
+        except Exception:
+            logger.debug("threadpool restore failed", exc_info=True)
+
+
+class CpuBudget:
+    """Lease ``cores`` thread tokens to concurrent analyses."""
+
+    def __init__(self, cores: int, min_threads: int = 1, limiter: Optional[Any] = None):
+        self.cores = max(1, int(cores))
+        self.min_threads = max(1, min(int(min_threads), self.cores))
+        self._limiter = limiter if limiter is not None else _ThreadpoolLimiter()
+        self._cond = threading.Condition()
+        self._active = 0  # leased or waiting for tokens
+        self._free = self.cores
+
+    def active(self) -> int:
+        with self._cond:
+            return self._active
+
+    def free(self) -> int:
+        """Thread tokens not leased to any analysis."""
+        with self._cond:
+            return self._free
+
+    def _quota(self, active: int) -> int:
+        share = max(self.min_threads, self.cores // max(1, active))
+        return max(self.min_threads, min(share, self._free))
+
+    def quota(self) -> int:
+        """Threads a new analysis would get right now (or once tokens free up)."""
+        with self._cond:
+            return self._quota(self._active + 1)
+
+    @contextmanager
+    def lease(self) -> Iterator[int]:
+        """Hold a thread quota for the enclosed analysis; yields the quota.
+
+        A lease nested in one already held by this context reuses its quota.
+        """
+        outer = _THREADS.get()
+        if outer is not None:
+            yield outer
+            return
+        with self._cond:
+            self._active += 1
+            try:
+                self._cond.wait_for(lambda: self._free >= self.min_threads)
+            except BaseException:
+                self._active -= 1
+                self._cond.notify_all()
+                raise
+            threads = self._quota(self._active)
+            self._free -= threads
+            active = self._active
+        _observe(CPU_ACTIVE_ANALYSES, "set", active)
+        _observe(CPU_THREAD_QUOTA, "set", threads)
+        # BLAS limits are process-wide, OpenMP limits belong to this thread
+        self._limiter.limit(threads, user_api="blas")
+        openmp = self._limiter.limit(threads, user_api="openmp")
+        token = _THREADS.set(threads)
+        try:
+            yield threads
+        finally:
+            _THREADS.reset(token)
+            self._limiter.restore(openmp)
+            with self._cond:
+                self._free += threads
+                self._active -= 1
+                active = self._active
+                blas = self._quota(active) if active else self.cores
+                self._cond.notify_all()
+            _observe(CPU_ACTIVE_ANALYSES, "set", active)
+            self._limiter.limit(blas, user_api="blas")
+
+
+def budget_enabled() -> bool:
+    return os.environ.get("AI_CORE_CPU_BUDGET", "1").lower() not in ("0", "false", "no")
+
+
+_BUDGET: Optional[CpuBudget] = None
+_BUDGET_LOCK = threading.Lock()
+
+
+def get_budget() -> CpuBudget:
+    """Process-wide budget built from the environment on first use."""
+    global _BUDGET
+    if _BUDGET is None:
+        with _BUDGET_LOCK:
+            if _BUDGET is None:
+                cores = os.environ.get("AI_CORE_CPU_CORES")
+                _BUDGET = CpuBudget(
+                    int(cores) if cores else available_cores(),
+                    min_threads=int(os.environ.get("AI_CORE_MIN_THREADS", "1")),
+                )
+    return _BUDGET
+
+
+@contextmanager
+def cpu_lease() -> Iterator[Optional[int]]:
+    """``get_budget().lease()``, or a no-op yielding None when budgeting is off."""
+    if not budget_enabled():
+        yield None
+        return
+    with get_budget().lease() as threads:
+        yield threads
+
+
+def current_threads() -> Optional[int]:
+    """Thread quota of the analysis running in this context, if any."""
+    return _THREADS.get()
@@ -1,4 +1,6 @@
-from typing import Sequence, Dict, Union
+import itertools
+from typing import Any, Dict, List, Mapping, Optional, Sequence, Tuple, Union
+
 import numpy as np
 
 
@@ -6,47 +8,291 @@ def _as_array(x):
     return np.asarray(x)
 
 
+# Columns of the per-group confusion tensor
+TP, FP, TN, FN = 0, 1, 2, 3
+
+GROUP_METRICS = (
+    "demographic_parity_difference",
+    "equal_opportunity_difference",
+    "false_positive_rate_difference",
+    "predictive_parity_difference",
+    "disparate_impact_ratio",
+)
+
+
+def _factorize(values) -> Tuple[np.ndarray, List[Any]]:
+    """Integer codes (-1 for missing) and sorted group labels for one attribute."""
+    import pandas as pd
+
+    series = pd.Series(_as_array(values))
+    try:
+        codes, uniques = pd.factorize(series, sort=True)
+    except TypeError:  # mixed, unorderable labels
+        codes, uniques = pd.factorize(series)
+    return codes.astype(np.int64), list(uniques.tolist())
+
+
+def confusion_tensor(y_true, y_pred, codes: np.ndarray, n_groups: int) -> np.ndarray:
+    """Count (TP, FP, TN, FN) per group with a single ``np.bincount``.
+
+    ``codes`` holds one group index per row (negative = excluded). ``y_true``
+    may be None, in which case positives/negatives are all counted as
+    FP/TN (only selection rates are meaningful). Returns (n_groups, 4) ints.
+    """
+    pred = np.broadcast_to(_as_array(y_pred) == 1, codes.shape)
+    true = np.broadcast_to(False if y_true is None else (_as_array(y_true) == 1), codes.shape)
+    cell = np.where(pred, np.where(true, TP, FP), np.where(true, FN, TN))
+    keep = codes >= 0
+    flat = np.bincount(codes[keep] * 4 + cell[keep], minlength=n_groups * 4)
+    return flat.reshape(n_groups, 4)
+
+
+def _ratio(num: np.ndarray, den: np.ndarray) -> np.ndarray:
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(den > 0, num / np.maximum(den, 1), np.nan)
+
+
+def group_rates(tensor: np.ndarray) -> Dict[str, np.ndarray]:
+    """Per-group rates derived from a (..., 4) confusion tensor; NaN where undefined."""
+    tp, fp, tn, fn = (tensor[..., i].astype(float) for i in (TP, FP, TN, FN))
+    n = tp + fp + tn + fn
+    return {
+        "n": n,
+        "selection_rate": _ratio(tp + fp, n),
+        "tpr": _ratio(tp, tp + fn),
+        "fpr": _ratio(fp, fp + tn),
+        "ppv": _ratio(tp, tp + fp),
+    }
+
+
+def _spread(rate: np.ndarray) -> Optional[float]:
+    """Signed difference for two groups (second - first), max - min otherwise."""
+    vals = rate[~np.isnan(rate)]
+    if vals.size < 2:
+        return None
+    if rate.size == 2:
+        return float(rate[1] - rate[0])
+    return float(vals.max() - vals.min())
+
+
+def metrics_from_tensor(tensor: np.ndarray) -> Dict[str, Optional[float]]:
+    """Group-fairness metrics over the groups (rows) of a (g, 4) tensor.
+
+    Groups with no rows are ignored. Differences are signed for binary
+    attributes (matching ``compute_metrics``) and max - min otherwise;
+    disparate impact is min/max selection rate.
+    """
+    tensor = tensor[tensor.sum(axis=1) > 0]
+    r = group_rates(tensor)
+    sel = r["selection_rate"]
+    di = None
+    if sel.size >= 2 and np.nanmax(sel) > 0:
+        di = float(np.nanmin(sel) / np.nanmax(sel))
+    return {
+        "demographic_parity_difference": _spread(sel),
+        "equal_opportunity_difference": _spread(r["tpr"]),
+        "false_positive_rate_difference": _spread(r["fpr"]),
+        "predictive_parity_difference": _spread(r["ppv"]),
+        "disparate_impact_ratio": di,
+    }
+
+
+def _group_table(tensor: np.ndarray, labels: List[Any]) -> Dict[str, Dict[str, Any]]:
+    r = group_rates(tensor)
+    out = {}
+    for i, label in enumerate(labels):
+        if r["n"][i] == 0:
+            continue
+        out[str(label)] = {
+            k: (int(v[i]) if k == "n" else (None if np.isnan(v[i]) else float(v[i]))) for k, v in r.items()
+        }
+    return out
+
+
+def _collapse(cells: np.ndarray, tensor: np.ndarray, subset: Sequence[int]) -> Tuple[np.ndarray, np.ndarray]:
+    """Sum a (m, 4) tensor over occupied joint cells into the groups of ``subset``."""
+    keys, inverse = np.unique(cells[:, list(subset)], axis=0, return_inverse=True)
+    out = np.zeros((len(keys), 4), dtype=np.int64)
+    np.add.at(out, inverse.ravel(), tensor)
+    return keys, out
+
+
+def evaluate_groups(
+    y_true,
+    y_pred,
+    sensitive: Mapping[str, Any],
+    intersections: bool = True,
+) -> Dict[str, Any]:
+    """Fairness report for several sensitive attributes and their intersections.
+
+    Rows are binned once into the occupied cells of the joint
+    (attr_1 x ... x attr_k) grid and counted with one ``np.bincount``;
+    per-attribute and intersectional tensors are sums over those cells, so
+    memory follows the rows rather than the product of the attribute
+    cardinalities. Rows with a missing value in any attribute are excluded.
+
+    Returns {"attributes": {name: {"groups", "metrics"}}, "intersections": {...}}.
+    """
+    names = list(sensitive)
+    report: Dict[str, Any] = {"attributes": {}, "intersections": {}}
+    if not names:
+        return report
+    factorized = [_factorize(sensitive[n]) for n in names]
+    codes = np.stack([c for c, _ in factorized], axis=1)
+    keep = (codes >= 0).all(axis=1)
+    cells, inverse = np.unique(codes[keep], axis=0, return_inverse=True)
+    joint = np.full(len(codes), -1, dtype=np.int64)
+    joint[keep] = inverse.ravel()
+    tensor = confusion_tensor(y_true, y_pred, joint, len(cells))
+
+    def labels_of(keys: np.ndarray, subset: Sequence[int]) -> List[str]:
+        return [" & ".join(str(factorized[a][1][c]) for a, c in zip(subset, key)) for key in keys]
+
+    axes = list(range(len(names)))
+    for i, name in enumerate(names):
+        keys, marginal = _collapse(cells, tensor, [i])
+        report["attributes"][name] = {
+            "groups": _group_table(marginal, labels_of(keys, [i])),
+            "metrics": metrics_from_tensor(marginal),
+        }
+    if intersections and len(names) > 1:
+        for subset in _subsets(axes):
+            keys, sub = _collapse(cells, tensor, subset)
+            report["intersections"]["&".join(names[a] for a in subset)] = {
+                "groups": _group_table(sub, labels_of(keys, subset)),
+                "metrics": metrics_from_tensor(sub),
+            }
+    return report
+
+
+def _subsets(axes: List[int]):
+    for k in range(2, len(axes) + 1):
+        yield from itertools.combinations(axes, k)
+
+
+def _binary_tensor(y_true, y_pred, sensitive) -> np.ndarray:
+    codes = _as_array(sensitive).astype(bool).astype(np.int64)
+    return confusion_tensor(y_true, y_pred, codes, 2)
+
+
+def _binary_metric_arrays(tensor: np.ndarray) -> Dict[str, np.ndarray]:
+    """``compute_metrics`` over a (..., 2, 4) tensor, vectorized over leading axes.
+
+    Group 1 is S truthy, group 0 is S falsy. NaN marks an undefined metric.
+    """
+    r = group_rates(tensor)
+    empty = (r["n"] == 0).any(axis=-1)
+    sel = r["selection_rate"]
+    tpr = np.nan_to_num(r["tpr"], nan=0.0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        hi = np.fmax(sel[..., 0], sel[..., 1])
+        di = np.where(empty | ~(hi > 0), np.nan, np.fmin(sel[..., 0], sel[..., 1]) / hi)
+    return {
+        "demographic_parity_difference": np.where(empty, 0.0, sel[..., 1] - sel[..., 0]),
+        "equal_opportunity_difference": tpr[..., 1] - tpr[..., 0],
+        "false_positive_rate_difference": r["fpr"][..., 1] - r["fpr"][..., 0],
+        "predictive_parity_difference": r["ppv"][..., 1] - r["ppv"][..., 0],
+        "disparate_impact_ratio": di,
+    }
+
+
 def demographic_parity_difference(y_pred: Union[Sequence, np.ndarray], sensitive: Union[Sequence, np.ndarray]) -> float:
     """Compute demographic parity difference: P(y_pred=1 | S=1) - P(y_pred=1 | S=0).
 
     Assumes binary sensitive values (truthy=1, falsy=0). Returns float in [-1,1].
     """
-    y = _as_array(y_pred)
-    s = _as_array(sensitive)
-    mask1 = s.astype(bool)
-    if mask1.sum() == 0 or (~mask1).sum() == 0:
-        return 0.0
-    p1 = float((y[mask1] == 1).mean())
-    p0 = float((y[~mask1] == 1).mean())
-    return p1 - p0
+    t = _binary_tensor(None, y_pred, sensitive)
+    return float(_binary_metric_arrays(t)["demographic_parity_difference"])
 
 
 def equal_opportunity_difference(y_true: Union[Sequence, np.ndarray], y_pred: Union[Sequence, np.ndarray], sensitive: Union[Sequence, np.ndarray]) -> float:
     """Compute equal opportunity difference: TPR(S=1) - TPR(S=0).
 
-    TPR = TP / (TP + FN) computed per group.
+    TPR = TP / (TP + FN) computed per group (0.0 for a group without positives).
     """
-    y = _as_array(y_true)
-    yhat = _as_array(y_pred)
-    s = _as_array(sensitive)
-    def tpr_for(mask):
-        pos_mask = (y == 1) & mask
-        if pos_mask.sum() == 0:
-            return 0.0
-        tp = int(((yhat == 1) & pos_mask).sum())
-        return float(tp) / float(pos_mask.sum())
-
-    mask1 = s.astype(bool)
-    tpr1 = tpr_for(mask1)
-    tpr0 = tpr_for(~mask1)
-    return tpr1 - tpr0
+    t = _binary_tensor(y_true, y_pred, sensitive)
+    return float(_binary_metric_arrays(t)["equal_opportunity_difference"])
 
 
 def compute_metrics(y_true: Union[Sequence, np.ndarray], y_pred: Union[Sequence, np.ndarray], sensitive: Union[Sequence, np.ndarray]) -> Dict[str, float]:
-    return {
-        "demographic_parity_difference": float(demographic_parity_difference(y_pred, sensitive)),
-        "equal_opportunity_difference": float(equal_opportunity_difference(y_true, y_pred, sensitive)),
-    }
+    """Binary-attribute metrics (S truthy vs falsy) from one confusion tensor.
+
+    Metrics that are undefined for the data (e.g. FPR with no negatives) are omitted.
+    """
+    arrays = _binary_metric_arrays(_binary_tensor(y_true, y_pred, sensitive))
+    return {k: float(v) for k, v in arrays.items() if not np.isnan(v)}
+
+
+def bootstrap_intervals(
+    tensor: np.ndarray,
+    n_boot: int = 1000,
+    alpha: float = 0.05,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """Percentile bootstrap intervals for the binary metrics of a (2, 4) tensor.
+
+    Rows are resampled with replacement within each group (a stratified
+    bootstrap), which only changes how a group's rows spread over its 4
+    outcome cells: each replicate draws Multinomial(n_g, cell counts / n_g)
+    per group. Group sizes stay fixed, so no replicate loses a group and
+    turns a metric undefined. All replicates are drawn at once as an
+    (n_boot, 2, 4) tensor and the metrics are evaluated on it in one
+    vectorized call; no per-row arrays are materialised.
+
+    Returns {metric: {"value", "ci_low", "ci_high"}}; entries are None when
+    the metric is undefined.
+    """
+    tensor = np.asarray(tensor, dtype=np.int64)
+    point = _binary_metric_arrays(tensor)
+    total = int(tensor.sum())
+    boot = None
+    if total > 0 and n_boot > 0:
+        rng = np.random.default_rng(seed)
+        reps = np.zeros((n_boot,) + tensor.shape, dtype=np.int64)
+        for g, cells in enumerate(tensor):
+            n_g = int(cells.sum())
+            if n_g:
+                reps[:, g] = rng.multinomial(n_g, cells / float(n_g), size=n_boot)
+        boot = _binary_metric_arrays(reps)
+
+    out: Dict[str, Dict[str, Optional[float]]] = {}
+    for k, v in point.items():
+        entry: Dict[str, Optional[float]] = {"value": None if np.isnan(v) else float(v), "ci_low": None, "ci_high": None}
+        if boot is not None:
+            samples = boot[k][~np.isnan(boot[k])]
+            if samples.size:
+                entry["ci_low"] = float(np.quantile(samples, alpha / 2.0))
+                entry["ci_high"] = float(np.quantile(samples, 1.0 - alpha / 2.0))
+        out[k] = entry
+    return out
+
+
+def metric_intervals(
+    y_true,
+    y_pred,
+    sensitive,
+    n_boot: int = 1000,
+    alpha: float = 0.05,
+    seed: int = 0,
+) -> Dict[str, Dict[str, Optional[float]]]:
+    """Bootstrap intervals for ``compute_metrics`` on a binary sensitive attribute."""
+    return bootstrap_intervals(_binary_tensor(y_true, y_pred, sensitive), n_boot=n_boot, alpha=alpha, seed=seed)
+
+
+def interval_bound(entry: Dict[str, Optional[float]]) -> Optional[float]:
+    """The interval end closest to zero (0.0 if the interval straddles zero).
+
+    Comparing ``abs(interval_bound(...))`` with a threshold flags only
+    violations the whole confidence interval agrees on.
+    """
+    lo, hi = entry.get("ci_low"), entry.get("ci_high")
+    if lo is None or hi is None:
+        return entry.get("value")
+    if lo > 0:
+        return lo
+    if hi < 0:
+        return hi
+    return 0.0
 
 
 def validate_against_thresholds(metrics: Dict[str, float], thresholds: Dict[str, float]):
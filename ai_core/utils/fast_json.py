@@ -0,0 +1,87 @@
+"""Fast path for JSON analyze payloads.
+
+The regular path validates ``{"dataset_name": ..., "data": {col: [...]}}``
+through pydantic, which re-materialises every cell as a Python object before
+pandas copies it again. This module decodes the raw body with ``orjson`` (when
+installed, stdlib ``json`` otherwise) and turns each column into a typed numpy
+array straight away, releasing the decoded list as it goes.
+
+Structural checks (column names, list-likeness, equal lengths, row cap) run
+over the column lengths before any cell is touched and raise ``PayloadError``
+with the same details the regular path uses. Payloads whose top-level shape
+needs pydantic's 422 reporting raise ``FastPathUnsupported`` so the caller can
+fall back.
+"""
+from __future__ import annotations
+
+import json
+from typing import Any, Dict, Tuple
+
+import numpy as np
+
+from .validation import invalid_payload_detail, max_rows_detail, mismatched_lengths_detail
+
+try:
+    import orjson  # type: ignore
+except Exception:
+    orjson = None  # optional dependency; stdlib json is the fallback
+
+
+class FastPathUnsupported(Exception):
+    """The body is not a well-formed analyze payload; use the pydantic path."""
+
+
+class PayloadError(Exception):
+    """Structurally invalid dataset; ``detail`` is the 400 message."""
+
+    def __init__(self, detail: str):
+        super().__init__(detail)
+        self.detail = detail
+
+
+def loads(body: bytes) -> Any:
+    if orjson is not None:
+        return orjson.loads(body)
+    return json.loads(body)
+
+
+def _column_array(values: list) -> np.ndarray:
+    try:
+        arr = np.asarray(values) if values else np.asarray(values, dtype=float)
+    except ValueError:  # ragged nested lists; left to the caller's nested-value check
+        arr = None
+    if arr is not None and arr.ndim == 1 and arr.dtype.kind in "biuf":
+        return arr
+    # mixed / nullable / string / nested columns: let pandas infer exactly as DataFrame(dict) would
+    import pandas as pd
+
+    return pd.Series(values).to_numpy()
+
+
+def decode_analyze_body(body: bytes, max_rows: int) -> Tuple[Dict[str, Any], Dict[str, np.ndarray]]:
+    """Return (scalar fields, {column: ndarray}) for a JSON analyze body."""
+    try:
+        payload = loads(body)
+    except Exception:
+        raise FastPathUnsupported("invalid JSON")
+    if not isinstance(payload, dict) or not isinstance(payload.get("data"), dict):
+        raise FastPathUnsupported("unexpected payload shape")
+    data = payload.pop("data")
+
+    col_lengths: Dict[str, int] = {}
+    for name, values in data.items():
+        if name.strip() == "":
+            raise PayloadError(invalid_payload_detail(f"invalid column name: {name!r}"))
+        if not isinstance(values, list):
+            raise PayloadError(invalid_payload_detail(f"column {name} is not list-like"))
+        col_lengths[name] = len(values)
+    if len(set(col_lengths.values())) > 1:
+        raise PayloadError(mismatched_lengths_detail(col_lengths))
+    n_rows = max(col_lengths.values()) if col_lengths else 0
+    if n_rows > max_rows:
+        raise PayloadError(max_rows_detail(max_rows, n_rows))
+
+    columns: Dict[str, np.ndarray] = {}
+    for name in list(data):
+        columns[name] = _column_array(data.pop(name))
+    return payload, columns
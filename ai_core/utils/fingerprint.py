@@ -0,0 +1,86 @@
+"""Content fingerprints for datasets, hyperparameters and models.
+
+Fingerprints are computed column-by-column over the raw numpy buffers (no
+pickling, no text formatting) with a fast non-cryptographic hash: ``xxhash``
+(xxh3_128) when installed, otherwise ``hashlib.blake2b``. The same fingerprint
+keys the model cache, the SHAP cache and stored analyses.
+"""
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import Any
+
+import numpy as np
+
+try:
+    import xxhash  # type: ignore
+except Exception:
+    xxhash = None  # optional dependency; blake2b is the fallback
+
+
+def _new_hasher():
+    if xxhash is not None:
+        return xxhash.xxh3_128()
+    return hashlib.blake2b(digest_size=16)
+
+
+def _update_array(h, values) -> None:
+    arr = np.asarray(values)
+    if arr.dtype.kind in "biufcmM":
+        h.update(arr.dtype.str.encode())
+        if arr.dtype.kind in "mM":
+            # datetime64/timedelta64 do not export a buffer; the unit is in dtype.str
+            arr = arr.view("i8")
+        h.update(memoryview(np.ascontiguousarray(arr)).cast("B"))
+        return
+    # object / string / mixed columns: hash element-wise into a uint64 buffer
+    import pandas as pd
+
+    obj = np.asarray(arr, dtype=object)
+    try:
+        hashed = pd.util.hash_array(obj, categorize=True)
+    except TypeError:  # unhashable cells (lists, dicts): hash their string form
+        hashed = pd.util.hash_array(np.array([str(v) for v in obj], dtype=object), categorize=True)
+    h.update(b"obj")
+    h.update(memoryview(hashed).cast("B"))
+
+
+def _update_frame(h, df) -> None:
+    h.update(str(df.shape).encode())
+    for name in df.columns:
+        col = df[name]
+        h.update(repr(name).encode())
+        h.update(str(col.dtype).encode())
+        if str(col.dtype) == "category":
+            _update_array(h, col.cat.codes.to_numpy())
+            _update_array(h, col.cat.categories.to_numpy())
+        else:
+            _update_array(h, col.to_numpy())
+
+
+def params_fingerprint(params: Any) -> str:
+    """Fingerprint of a JSON-like hyperparameter structure (order-insensitive)."""
+    h = _new_hasher()
+    h.update(json.dumps(params, sort_keys=True, default=repr).encode())
+    return h.hexdigest()
+
+
+def frame_fingerprint(df) -> str:
+    """Fingerprint of a DataFrame's column names, dtypes and values (index ignored)."""
+    h = _new_hasher()
+    _update_frame(h, df)
+    return h.hexdigest()
+
+
+def training_fingerprint(X, y, config: Any = None) -> str:
+    """Fingerprint of (X, y, estimator config); keys models, SHAP and analyses."""
+    h = _new_hasher()
+    _update_frame(h, X)
+    if y is None:
+        h.update(b"y:none")
+    else:
+        h.update(b"y:")
+        _update_array(h, getattr(y, "to_numpy", lambda: y)())
+    h.update(params_fingerprint(config).encode())
+    return h.hexdigest()
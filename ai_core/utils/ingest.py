@@ -0,0 +1,130 @@
+"""Decode columnar binary request bodies into DataFrames.
+
+Supported content types:
+- ``application/vnd.apache.arrow.stream`` (Arrow IPC stream) and
+  ``application/vnd.apache.arrow.file`` (Arrow IPC file)
+- ``application/vnd.apache.parquet`` / ``application/x-parquet``
+- ``application/x-npy`` (a single structured NumPy array, one field per column)
+
+Arrow and Parquet need the optional ``pyarrow`` dependency. Buffers are
+wrapped without copying and converted with ``split_blocks``/``self_destruct``
+so null-free numeric columns come out as zero-copy numpy views. NPY bodies are
+read with ``np.frombuffer`` (no pickle, no copy of the payload).
+"""
+from __future__ import annotations
+
+import io
+from typing import TYPE_CHECKING, Optional
+
+if TYPE_CHECKING:  # numpy/pandas are imported per call to keep app import light
+    import pandas as pd
+
+ARROW_STREAM = "application/vnd.apache.arrow.stream"
+ARROW_FILE = "application/vnd.apache.arrow.file"
+PARQUET_TYPES = ("application/vnd.apache.parquet", "application/x-parquet")
+NPY_TYPES = ("application/x-npy", "application/npy")
+
+BINARY_CONTENT_TYPES = (ARROW_STREAM, ARROW_FILE) + PARQUET_TYPES + NPY_TYPES
+
+
+class IngestError(Exception):
+    """Raised for undecodable bodies; carries the HTTP status to return."""
+
+    def __init__(self, status_code: int, detail: str):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def media_type(content_type: Optional[str]) -> str:
+    """Strip parameters (``; charset=...``) and normalise case."""
+    return (content_type or "").split(";", 1)[0].strip().lower()
+
+
+def is_binary_content_type(content_type: Optional[str]) -> bool:
+    return media_type(content_type) in BINARY_CONTENT_TYPES
+
+
+def _pyarrow():
+    try:
+        import pyarrow  # type: ignore
+        return pyarrow
+    except Exception:
+        raise IngestError(415, "Arrow/Parquet payloads require pyarrow on the server")
+
+
+def _table_to_frame(table) -> pd.DataFrame:
+    return table.to_pandas(split_blocks=True, self_destruct=True)
+
+
+def decode_arrow_stream(body: bytes) -> pd.DataFrame:
+    pa = _pyarrow()
+    try:
+        reader = pa.ipc.open_stream(pa.py_buffer(body))
+        return _table_to_frame(reader.read_all())
+    except IngestError:
+        raise
+    except Exception as exc:
+        raise IngestError(400, f"Invalid Arrow stream: {exc}")
+
+
+def decode_arrow_file(body: bytes) -> pd.DataFrame:
+    pa = _pyarrow()
+    try:
+        reader = pa.ipc.open_file(pa.py_buffer(body))
+        return _table_to_frame(reader.read_all())
+    except IngestError:
+        raise
+    except Exception as exc:
+        raise IngestError(400, f"Invalid Arrow file: {exc}")
+
+
+def decode_parquet(body: bytes) -> pd.DataFrame:
+    pa = _pyarrow()
+    try:
+        import pyarrow.parquet as pq  # type: ignore
+
+        return _table_to_frame(pq.read_table(pa.BufferReader(body)))
+    except IngestError:
+        raise
+    except Exception as exc:
+        raise IngestError(400, f"Invalid Parquet payload: {exc}")
+
+
+def decode_npy(body: bytes) -> pd.DataFrame:
+    import numpy as np
+    import pandas as pd
+
+    try:
+        fp = io.BytesIO(body)
+        version = np.lib.format.read_magic(fp)
+        if version == (1, 0):
+            shape, fortran_order, dtype = np.lib.format.read_array_header_1_0(fp)
+        else:
+            shape, fortran_order, dtype = np.lib.format.read_array_header_2_0(fp)
+    except Exception as exc:
+        raise IngestError(400, f"Invalid NPY payload: {exc}")
+    if dtype.hasobject:
+        raise IngestError(400, "Invalid NPY payload: object arrays are not accepted")
+    if dtype.names is None or len(shape) != 1:
+        raise IngestError(400, "Invalid NPY payload: expected a 1-d structured array with one field per column")
+    count = int(np.prod(shape)) if shape else 1
+    try:
+        arr = np.frombuffer(body, dtype=dtype, count=count, offset=fp.tell())
+    except Exception as exc:
+        raise IngestError(400, f"Invalid NPY payload: {exc}")
+    return pd.DataFrame({name: arr[name] for name in dtype.names})
+
+
+def decode_frame(body: bytes, content_type: Optional[str]) -> pd.DataFrame:
+    """Decode a binary body according to its content type."""
+    mt = media_type(content_type)
+    if mt == ARROW_STREAM:
+        return decode_arrow_stream(body)
+    if mt == ARROW_FILE:
+        return decode_arrow_file(body)
+    if mt in PARQUET_TYPES:
+        return decode_parquet(body)
+    if mt in NPY_TYPES:
+        return decode_npy(body)
+    raise IngestError(415, f"Unsupported content type: {mt or 'none'}")
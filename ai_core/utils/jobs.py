@@ -0,0 +1,200 @@
+"""Background job execution for long-running analyses.
+
+CPU-heavy work (training, SHAP, fairness) is submitted to a bounded
+``ProcessPoolExecutor`` so it neither holds Starlette's request thread pool
+nor competes for the GIL with health probes. Job state lives in memory on the
+submitting process; finished jobs are retained for a configurable window.
+
+Configuration (environment):
+- AI_CORE_JOB_WORKERS: pool size (default: min(4, cpu count))
+- AI_CORE_JOB_QUEUE_DEPTH: jobs allowed to wait beyond the running ones (default 32)
+- AI_CORE_JOB_EXECUTOR: ``process`` (default) or ``thread``
+- AI_CORE_JOB_START_METHOD: multiprocessing start method (default ``spawn``)
+- AI_CORE_JOB_RETENTION_SECONDS: how long finished jobs stay queryable (default 3600)
+"""
+from __future__ import annotations
+
+import multiprocessing
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Optional
+
+
+class JobQueueFull(Exception):
+    """Raised when the pool and its wait queue are saturated."""
+
+
+class JobFailed(Exception):
+    """Failure raised from a job body that carries an HTTP status and detail.
+
+    Arguments are kept in ``args`` so the exception pickles cleanly across the
+    process boundary.
+    """
+
+    def __init__(self, status_code: int, detail: Any = None):
+        super().__init__(status_code, detail)
+        self.status_code = status_code
+        self.detail = detail
+
+
+def _env_int(name: str, default: int) -> int:
+    try:
+        return int(os.environ.get(name, default))
+    except (TypeError, ValueError):
+        return default
+
+
+def _default_workers() -> int:
+    return _env_int("AI_CORE_JOB_WORKERS", min(4, os.cpu_count() or 1))
+
+
+def job_worker_processes() -> int:
+    """Pool processes each web worker starts for analysis jobs (0 with the thread executor)."""
+    if os.environ.get("AI_CORE_JOB_EXECUTOR", "process").lower() == "thread":
+        return 0
+    return max(1, _default_workers())
+
+
+class JobManager:
+    """Submit callables to a bounded executor and track their status by id."""
+
+    def __init__(
+        self,
+        max_workers: Optional[int] = None,
+        max_queue: Optional[int] = None,
+        executor: Optional[str] = None,
+        retention_seconds: Optional[int] = None,
+        start_method: Optional[str] = None,
+    ):
+        self.max_workers = max(1, max_workers or _default_workers())
+        self.max_queue = max(0, max_queue if max_queue is not None else _env_int("AI_CORE_JOB_QUEUE_DEPTH", 32))
+        self.executor_kind = (executor or os.environ.get("AI_CORE_JOB_EXECUTOR", "process")).lower()
+        self.retention_seconds = retention_seconds if retention_seconds is not None else _env_int("AI_CORE_JOB_RETENTION_SECONDS", 3600)
+        self.start_method = start_method or os.environ.get("AI_CORE_JOB_START_METHOD", "spawn")
+        self._executor: Optional[Executor] = None
+        self._jobs: Dict[str, Dict[str, Any]] = {}
+        self._futures: Dict[str, Future] = {}
+        self._lock = threading.Lock()
+
+    def _get_executor(self) -> Executor:
+        # Created lazily so importing the router never forks or spawns workers.
+        if self._executor is None:
+            if self.executor_kind == "thread":
+                self._executor = ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix="ai_core_job")
+            else:
+                ctx = multiprocessing.get_context(self.start_method)
+                self._executor = ProcessPoolExecutor(max_workers=self.max_workers, mp_context=ctx)
+        return self._executor
+
+    def active_count(self) -> int:
+        with self._lock:
+            return sum(1 for f in self._futures.values() if not f.done())
+
+    def submit(
+        self,
+        fn: Callable[..., Any],
+        *args: Any,
+        meta: Optional[Dict[str, Any]] = None,
+        on_done: Optional[Callable[[], None]] = None,
+        **kwargs: Any,
+    ) -> str:
+        """Schedule ``fn(*args, **kwargs)`` and return its job id.
+
+        ``on_done`` runs in the submitting process once the job finishes,
+        however it ends. Raises JobQueueFull when running plus waiting jobs
+        would exceed ``max_workers + max_queue``; ``on_done`` is not called then.
+        """
+        self._prune()
+        with self._lock:
+            active = sum(1 for f in self._futures.values() if not f.done())
+            if active >= self.max_workers + self.max_queue:
+                raise JobQueueFull(f"job queue full ({active} active)")
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "job_id": job_id,
+                "status": "queued",
+                "submitted_at": time.time(),
+                "finished_at": None,
+                "result": None,
+                "error": None,
+                "meta": dict(meta or {}),
+            }
+            fut = self._get_executor().submit(fn, *args, **kwargs)
+            self._futures[job_id] = fut
+        fut.add_done_callback(lambda f, jid=job_id: self._on_done(jid, f))
+        if on_done is not None:
+            fut.add_done_callback(lambda f: on_done())
+        return job_id
+
+    def _on_done(self, job_id: str, fut: Future) -> None:
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return
+            job["finished_at"] = time.time()
+            if fut.cancelled():
+                job["status"] = "cancelled"
+                return
+            exc = fut.exception()
+            if exc is None:
+                job["status"] = "succeeded"
+                job["result"] = fut.result()
+            elif isinstance(exc, JobFailed):
+                job["status"] = "failed"
+                job["error"] = {"status_code": exc.status_code, "detail": exc.detail}
+            else:
+                job["status"] = "failed"
+                job["error"] = {"status_code": 500, "detail": f"{type(exc).__name__}: {exc}"}
+
+    def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        """Return a snapshot of the job record, or None if unknown/expired."""
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+            snapshot = dict(job)
+            fut = self._futures.get(job_id)
+        if snapshot["status"] == "queued" and fut is not None and fut.running():
+            snapshot["status"] = "running"
+        return snapshot
+
+    def _prune(self) -> None:
+        if self.retention_seconds <= 0:
+            return
+        cutoff = time.time() - self.retention_seconds
+        with self._lock:
+            expired = [jid for jid, j in self._jobs.items() if j["finished_at"] is not None and j["finished_at"] < cutoff]
+            for jid in expired:
+                self._jobs.pop(jid, None)
+                self._futures.pop(jid, None)
+
+    def shutdown(self, wait: bool = False) -> None:
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=True)
+            self._executor = None
+
+
+_MANAGER: Optional[JobManager] = None
+_MANAGER_LOCK = threading.Lock()
+
+
+def get_job_manager() -> JobManager:
+    """Return the process-wide JobManager, creating it on first use."""
+    global _MANAGER
+    if _MANAGER is None:
+        with _MANAGER_LOCK:
+            if _MANAGER is None:
+                _MANAGER = JobManager()
+    return _MANAGER
+
+
+def reset_job_manager(manager: Optional[JobManager] = None) -> None:
+    """Shut down the current manager and optionally install a replacement (tests)."""
+    global _MANAGER
+    with _MANAGER_LOCK:
+        if _MANAGER is not None:
+            _MANAGER.shutdown(wait=False)
+        _MANAGER = manager
@@ -0,0 +1,113 @@
+"""Deferred imports and an import-time budget report.
+
+Heavy dependencies (pandas, sklearn, shap, pymongo) are only needed once a
+request does real work, so modules on the startup path reference them through
+``lazy_module`` proxies that import on first attribute access. Every import
+performed through this module (lazy or ``timed_import``) is timed and listed
+by ``import_report()`` so cold-start regressions are visible.
+
+Configuration (environment):
+- AI_CORE_IMPORT_BUDGET_MS: warn when the app import exceeds this (default 1000)
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import sys
+import threading
+import time
+import types
+from contextlib import contextmanager
+from typing import Any, Dict, List, Optional
+
+logger = logging.getLogger("ai_core.lazy")
+
+_TIMINGS: Dict[str, float] = {}
+_LOCK = threading.Lock()
+
+
+def import_budget_seconds() -> float:
+    return float(os.environ.get("AI_CORE_IMPORT_BUDGET_MS", "1000")) / 1000.0
+
+
+def _record(name: str, seconds: float) -> None:
+    with _LOCK:
+        _TIMINGS[name] = _TIMINGS.get(name, 0.0) + seconds
+
+
+@contextmanager
+def timed_import(name: str):
+    """Time a block of imports under ``name`` for the budget report."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        _record(name, time.perf_counter() - start)
+
+
+def import_first(*names: str) -> types.ModuleType:
+    """Import the first importable module name (``ai_core.utils.x`` then ``utils.x``)."""
+    last: Optional[BaseException] = None
+    for name in names:
+        loaded = sys.modules.get(name)
+        if loaded is not None:
+            return loaded
+        start = time.perf_counter()
+        try:
+            mod = importlib.import_module(name)
+        except ImportError as exc:
+            last = exc
+            continue
+        _record(name, time.perf_counter() - start)
+        return mod
+    raise ImportError(f"none of {names} could be imported") from last
+
+
+class _LazyModule(types.ModuleType):
+    """Module proxy that performs the import on first attribute access."""
+
+    def __init__(self, names):
+        super().__init__(names[0])
+        self.__dict__["_lazy_names"] = tuple(names)
+        self.__dict__["_lazy_target"] = None
+
+    def _load(self) -> types.ModuleType:
+        target = self.__dict__["_lazy_target"]
+        if target is None:
+            target = import_first(*self.__dict__["_lazy_names"])
+            self.__dict__["_lazy_target"] = target
+        return target
+
+    def __getattr__(self, attr: str) -> Any:
+        return getattr(self._load(), attr)
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.__dict__["_lazy_target"] is not None else "not loaded"
+        return f"<lazy module {self.__dict__['_lazy_names'][0]!r} ({state})>"
+
+
+def lazy_module(*names: str) -> types.ModuleType:
+    """Return a proxy for the first importable of ``names``, imported on first use."""
+    return _LazyModule(names)
+
+
+def lazy_util(name: str) -> types.ModuleType:
+    """``lazy_module`` for an ai_core utils module under either package layout."""
+    return lazy_module(f"ai_core.utils.{name}", f"utils.{name}")
+
+
+def import_report() -> List[Dict[str, Any]]:
+    """Recorded import timings, slowest first."""
+    with _LOCK:
+        items = sorted(_TIMINGS.items(), key=lambda kv: kv[1], reverse=True)
+    return [{"module": name, "seconds": round(sec, 4)} for name, sec in items]
+
+
+def check_import_budget(name: str, seconds: float) -> bool:
+    """Record ``seconds`` for ``name`` and warn when it exceeds the budget."""
+    _record(name, seconds)
+    within = seconds <= import_budget_seconds()
+    if not within:
+        logger.warning({"msg": "import_budget_exceeded", "module": name, "seconds": round(seconds, 3), "slowest": import_report()[:5]})
+    return within
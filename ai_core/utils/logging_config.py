@@ -12,82 +12,105 @@ Features:
 
 import sys
 import os
+import threading
 from pathlib import Path
 from loguru import logger
 import json
 from datetime import datetime
 from typing import Dict, Any, Optional
 
-# Remove default handler
-logger.remove()
-
 # Determine log level from environment
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO').upper()
 ENVIRONMENT = os.getenv('ENVIRONMENT', 'development')
 
-# Create logs directory
 LOGS_DIR = Path(__file__).parent.parent / 'logs'
-LOGS_DIR.mkdir(exist_ok=True)
-
-# Console handler (colorized for development)
-logger.add(
-    sys.stdout,
-    format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
-    level=LOG_LEVEL,
-    colorize=True,
-    backtrace=True,
-    diagnose=True
-)
-
-# File handler - All logs (rotating)
-logger.add(
-    LOGS_DIR / "ai_core.log",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
-    level="DEBUG",
-    rotation="10 MB",
-    retention="30 days",
-    compression="zip",
-    backtrace=True,
-    diagnose=True,
-    enqueue=True  # Thread-safe
-)
-
-# File handler - Errors only
-logger.add(
-    LOGS_DIR / "error.log",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}\n{exception}",
-    level="ERROR",
-    rotation="5 MB",
-    retention="60 days",
-    compression="zip",
-    backtrace=True,
-    diagnose=True,
-    enqueue=True
-)
-
-# File handler - JSON format for parsing
-logger.add(
-    LOGS_DIR / "ai_core.json",
-    format="{message}",
-    level="INFO",
-    rotation="20 MB",
-    retention="30 days",
-    compression="zip",
-    serialize=True,  # JSON format
-    enqueue=True
-)
-
-# Audit log (compliance events)
-logger.add(
-    LOGS_DIR / "audit.log",
-    format="{time:YYYY-MM-DD HH:mm:ss} | {message}",
-    level="INFO",
-    rotation="10 MB",
-    retention="90 days",  # Longer retention for compliance
-    compression="zip",
-    filter=lambda record: record["extra"].get("audit", False),
-    enqueue=True
-)
+
+_CONFIGURED = False
+_CONFIGURE_LOCK = threading.Lock()
+
+
+def configure_logging() -> None:
+    """Install the console and rotating file sinks (idempotent).
+
+    Called on first use of ``ai_logger`` rather than at import, so importing
+    this module neither touches the filesystem nor starts enqueue threads.
+    """
+    global _CONFIGURED
+    if _CONFIGURED:
+        return
+    with _CONFIGURE_LOCK:
+        if _CONFIGURED:
+            return
+        _install_sinks()
+        _CONFIGURED = True
+
+
+def _install_sinks() -> None:
+    # Remove default handler
+    logger.remove()
+
+    # Create logs directory
+    LOGS_DIR.mkdir(exist_ok=True)
+
+    # Console handler (colorized for development)
+    logger.add(
+        sys.stdout,
+        format="<green>{time:YYYY-MM-DD HH:mm:ss}</green> | <level>{level: <8}</level> | <cyan>{name}</cyan>:<cyan>{function}</cyan>:<cyan>{line}</cyan> - <level>{message}</level>",
+        level=LOG_LEVEL,
+        colorize=True,
+        backtrace=True,
+        diagnose=True
+    )
+
+    # File handler - All logs (rotating)
+    logger.add(
+        LOGS_DIR / "ai_core.log",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}",
+        level="DEBUG",
+        rotation="10 MB",
+        retention="30 days",
+        compression="zip",
+        backtrace=True,
+        diagnose=True,
+        enqueue=True  # Thread-safe
+    )
+
+    # File handler - Errors only
+    logger.add(
+        LOGS_DIR / "error.log",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {level: <8} | {name}:{function}:{line} - {message}\n{exception}",
+        level="ERROR",
+        rotation="5 MB",
+        retention="60 days",
+        compression="zip",
+        backtrace=True,
+        diagnose=True,
+        enqueue=True
+    )
+
+    # File handler - JSON format for parsing
+    logger.add(
+        LOGS_DIR / "ai_core.json",
+        format="{message}",
+        level="INFO",
+        rotation="20 MB",
+        retention="30 days",
+        compression="zip",
+        serialize=True,  # JSON format
+        enqueue=True
+    )
+
+    # Audit log (compliance events)
+    logger.add(
+        LOGS_DIR / "audit.log",
+        format="{time:YYYY-MM-DD HH:mm:ss} | {message}",
+        level="INFO",
+        rotation="10 MB",
+        retention="90 days",  # Longer retention for compliance
+        compression="zip",
+        filter=lambda record: record["extra"].get("audit", False),
+        enqueue=True
+    )
 
 
 class AILogger:
@@ -314,18 +337,33 @@ class AILogger:
         )
 
 
-# Create global logger instance
-ai_logger = AILogger()
+_AI_LOGGER: Optional[AILogger] = None
+
+
+def get_ai_logger() -> AILogger:
+    """Return the shared AILogger, configuring sinks on first call."""
+    global _AI_LOGGER
+    if _AI_LOGGER is None:
+        configure_logging()
+        _AI_LOGGER = AILogger()
+        # Startup log
+        _AI_LOGGER.logger.info(
+            f"AI Core logger initialized",
+            extra={
+                "log_level": LOG_LEVEL,
+                "environment": ENVIRONMENT,
+                "logs_directory": str(LOGS_DIR)
+            }
+        )
+    return _AI_LOGGER
+
+
+def __getattr__(name: str):
+    # `from logging_config import ai_logger` keeps working, lazily
+    if name == "ai_logger":
+        return get_ai_logger()
+    raise AttributeError(name)
 
-# Startup log
-ai_logger.logger.info(
-    f"AI Core logger initialized",
-    extra={
-        "log_level": LOG_LEVEL,
-        "environment": ENVIRONMENT,
-        "logs_directory": str(LOGS_DIR)
-    }
-)
 
 # Export
-__all__ = ['ai_logger', 'logger']
+__all__ = ['ai_logger', 'logger', 'configure_logging', 'get_ai_logger']
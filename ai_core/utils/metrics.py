@@ -68,20 +68,20 @@ bias_metrics_computed = Counter(
 shap_computation_duration = Histogram(
     'ethixai_aicore_shap_computation_duration_seconds',
     'Duration of SHAP value computation in seconds',
-    ['model_type'],
+    ['model_type', 'backend'],
     buckets=(0.1, 0.5, 1.0, 2.0, 5.0, 10.0, 30.0, 60.0, 120.0)
 )
 
 shap_samples_processed = Counter(
     'ethixai_aicore_shap_samples_processed_total',
     'Total number of samples processed for SHAP values',
-    ['model_type']
+    ['model_type', 'backend']
 )
 
 shap_features_analyzed = Gauge(
     'ethixai_aicore_shap_features_analyzed',
     'Number of features analyzed in SHAP computation',
-    ['model_type']
+    ['model_type', 'backend']
 )
 
 # ========================================
@@ -100,6 +100,12 @@ model_cache_misses = Counter(
     ['model_type']
 )
 
+model_cache_evictions = Counter(
+    'ethixai_aicore_model_cache_evictions_total',
+    'Total number of model cache evictions',
+    ['model_type']
+)
+
 model_cache_size = Gauge(
     'ethixai_aicore_model_cache_size_bytes',
     'Current size of model cache in bytes'
@@ -140,6 +146,13 @@ data_preprocessing_duration = Histogram(
     buckets=(0.01, 0.05, 0.1, 0.5, 1.0, 5.0, 10.0)
 )
 
+analyze_stage_duration = Histogram(
+    'ethixai_aicore_analyze_stage_duration_seconds',
+    'Duration of individual analyze pipeline stages in seconds',
+    ['stage'],
+    buckets=(0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+)
+
 # ========================================
 # Performance Metrics
 # ========================================
@@ -160,6 +173,34 @@ active_requests = Gauge(
     'Number of currently active requests'
 )
 
+request_cpu_seconds = Histogram(
+    'ethixai_aicore_request_cpu_seconds',
+    'Process CPU time (user + system) consumed per analysis request',
+    ['endpoint'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+request_wall_seconds = Histogram(
+    'ethixai_aicore_request_wall_seconds',
+    'Wall-clock time per analysis request',
+    ['endpoint'],
+    buckets=(0.01, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+)
+
+request_peak_memory_bytes = Histogram(
+    'ethixai_aicore_request_peak_memory_bytes',
+    'Peak memory growth per analysis request (traced allocations or RSS)',
+    ['endpoint'],
+    buckets=(1e6, 5e6, 1e7, 5e7, 1e8, 2.5e8, 5e8, 1e9, 2e9, 4e9)
+)
+
+request_row_features = Histogram(
+    'ethixai_aicore_request_row_features',
+    'Rows x features processed per analysis request',
+    ['endpoint'],
+    buckets=(100, 1000, 10000, 100000, 1e6, 1e7, 1e8)
+)
+
 # ========================================
 # API Metrics
 # ========================================
@@ -232,7 +273,7 @@ def track_inference_time(model_type: str) -> Callable:
     return decorator
 
 
-def track_shap_computation(model_type: str) -> Callable:
+def track_shap_computation(model_type: str, backend: str = 'unknown') -> Callable:
     """
     Decorator to track SHAP computation time
 
@@ -251,7 +292,7 @@ def track_shap_computation(model_type: str) -> Callable:
                 return result
             finally:
                 duration = time.time() - start_time
-                shap_computation_duration.labels(model_type=model_type).observe(duration)
+                shap_computation_duration.labels(model_type=model_type, backend=backend).observe(duration)
 
         return wrapper
     return decorator
@@ -303,12 +344,13 @@ def record_shap_computation(
     model_type: str,
     duration_seconds: float,
     num_samples: int,
-    num_features: int
+    num_features: int,
+    backend: str = 'unknown'
 ):
-    """Record SHAP computation metrics"""
-    shap_computation_duration.labels(model_type=model_type).observe(duration_seconds)
-    shap_samples_processed.labels(model_type=model_type).inc(num_samples)
-    shap_features_analyzed.labels(model_type=model_type).set(num_features)
+    """Record SHAP computation metrics (backend: linear, native:lightgbm, shap:TreeExplainer, ...)"""
+    shap_computation_duration.labels(model_type=model_type, backend=backend).observe(duration_seconds)
+    shap_samples_processed.labels(model_type=model_type, backend=backend).inc(num_samples)
+    shap_features_analyzed.labels(model_type=model_type, backend=backend).set(num_features)
 
 
 def record_model_cache_operation(model_type: str, hit: bool):
@@ -319,6 +361,11 @@ def record_model_cache_operation(model_type: str, hit: bool):
         model_cache_misses.labels(model_type=model_type).inc()
 
 
+def record_model_cache_eviction(model_type: str):
+    """Record a model cache eviction"""
+    model_cache_evictions.labels(model_type=model_type).inc()
+
+
 def record_model_load(model_type: str, duration_seconds: float):
     """Record model load duration"""
     model_load_duration.labels(model_type=model_type).observe(duration_seconds)
@@ -332,6 +379,26 @@ def record_data_validation(duration_seconds: float, errors: int = 0, error_type:
         data_validation_errors.labels(error_type=error_type).inc(errors)
 
 
+def record_analyze_stage(stage: str, duration_seconds: float):
+    """Record one analyze pipeline stage (also feeds the data validation/preprocessing histograms)"""
+    analyze_stage_duration.labels(stage=stage).observe(duration_seconds)
+    if stage == 'validate':
+        data_validation_duration.observe(duration_seconds)
+    elif stage in ('frame', 'encode', 'compact'):
+        data_preprocessing_duration.observe(duration_seconds)
+
+
+def record_resource_usage(endpoint: str, cpu_seconds: float, wall_seconds: float,
+                          peak_memory_bytes: Optional[int] = None, row_features: int = 0):
+    """Record the measured cost of one analysis request"""
+    request_cpu_seconds.labels(endpoint=endpoint).observe(cpu_seconds)
+    request_wall_seconds.labels(endpoint=endpoint).observe(wall_seconds)
+    if peak_memory_bytes is not None:
+        request_peak_memory_bytes.labels(endpoint=endpoint).observe(peak_memory_bytes)
+    if row_features:
+        request_row_features.labels(endpoint=endpoint).observe(row_features)
+
+
 def record_http_request(method: str, endpoint: str, status_code: int, duration_seconds: float):
     """Record HTTP request metrics"""
     http_requests_total.labels(
@@ -377,8 +444,15 @@ __all__ = [
     'shap_samples_processed',
     'model_cache_hits',
     'model_cache_misses',
+    'model_cache_evictions',
+    'model_cache_size',
     'http_requests_total',
     'http_request_duration',
+    'analyze_stage_duration',
+    'request_cpu_seconds',
+    'request_wall_seconds',
+    'request_peak_memory_bytes',
+    'request_row_features',
 
     # Decorators
     'track_inference_time',
@@ -392,8 +466,11 @@ __all__ = [
     'update_fairness_score',
     'record_shap_computation',
     'record_model_cache_operation',
+    'record_model_cache_eviction',
     'record_model_load',
     'record_data_validation',
+    'record_analyze_stage',
+    'record_resource_usage',
     'record_http_request',
     'update_system_metrics',
 
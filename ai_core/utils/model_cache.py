@@ -0,0 +1,231 @@
+"""In-process LRU cache for fitted models and their SHAP explainers.
+
+Entries are keyed by a content fingerprint of the training inputs plus the
+estimator configuration, so resubmitting an identical dataset skips training
+and explainer construction. The cache is bounded both by entry count and by an
+approximate memory budget; hits, misses and evictions are exported through the
+``ethixai_aicore_model_cache_*`` metrics.
+
+Configuration (environment):
+- AI_CORE_MODEL_CACHE_ENTRIES: maximum cached models (default 32, 0 disables)
+- AI_CORE_MODEL_CACHE_MAX_MB: approximate memory budget in MB (default 256)
+"""
+from __future__ import annotations
+
+import importlib
+import os
+import sys
+import threading
+import types
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+import numpy as np
+
+
+def _metrics():
+    try:
+        return importlib.import_module("ai_core.utils.metrics")
+    except Exception:
+        try:
+            return importlib.import_module("utils.metrics")
+        except Exception:
+            return None
+
+
+_SKIP_TYPES = (type, types.ModuleType, types.FunctionType, types.BuiltinFunctionType, types.MethodType)
+
+
+def _booster_size(booster: Any) -> int:
+    """Native LightGBM/XGBoost booster memory, approximated by its serialized model."""
+    if hasattr(booster, "model_to_string"):  # lightgbm.Booster
+        return len(booster.model_to_string())
+    return len(booster.save_raw())  # xgboost.Booster
+
+
+def _estimate_size(obj: Any, max_objects: int = 10000) -> int:
+    """Approximate in-memory size of ``obj`` without serializing it.
+
+    Walks containers and instance ``__dict__``s, counting ``sys.getsizeof``
+    for each object and ``nbytes`` for numpy arrays (pandas objects through
+    ``memory_usage``); sklearn's compiled trees count their node and value
+    arrays and LightGBM/XGBoost boosters their serialized model length.
+    Shared objects are counted once; classes, modules and functions are
+    skipped, and other memory held by native libraries is not seen.
+    """
+    total, seen, stack = 0, set(), [obj]
+    while stack and len(seen) < max_objects:
+        o = stack.pop()
+        if id(o) in seen or isinstance(o, _SKIP_TYPES):
+            continue
+        seen.add(id(o))
+        try:
+            if isinstance(o, np.ndarray):
+                total += o.nbytes + sys.getsizeof(np.empty(0))
+                if o.dtype == object:
+                    stack.extend(o.ravel().tolist())
+                continue
+            if type(o).__name__ == "Tree" and hasattr(o, "node_count"):
+                # sklearn.tree._tree.Tree: 64-byte node structs plus the value array
+                total += int(o.node_count) * 64 + int(o.value.nbytes)
+                continue
+            if type(o).__name__ == "Booster" and type(o).__module__.split(".", 1)[0] in ("lightgbm", "xgboost"):
+                total += _booster_size(o)
+                continue
+            memory_usage = getattr(o, "memory_usage", None)
+            if memory_usage is not None and hasattr(o, "index"):
+                usage = memory_usage(index=True)
+                total += int(usage.sum() if hasattr(usage, "sum") else usage)
+                continue
+            total += sys.getsizeof(o)
+            if isinstance(o, dict):
+                stack.extend(o.keys())
+                stack.extend(o.values())
+            elif isinstance(o, (list, tuple, set, frozenset)):
+                stack.extend(o)
+            elif not isinstance(o, (str, bytes, bytearray, int, float, complex, bool)):
+                state = getattr(o, "__dict__", None)
+                if isinstance(state, dict):
+                    stack.append(state)
+        except Exception:
+            continue
+    return total
+
+
+class ModelCache:
+    """Thread-safe LRU of ``key -> {model, explainers}`` with a byte budget."""
+
+    def __init__(self, max_entries: Optional[int] = None, max_bytes: Optional[int] = None):
+        if max_entries is None:
+            max_entries = int(os.environ.get("AI_CORE_MODEL_CACHE_ENTRIES", "32"))
+        if max_bytes is None:
+            max_bytes = int(float(os.environ.get("AI_CORE_MODEL_CACHE_MAX_MB", "256")) * 1024 * 1024)
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+        self._keys_by_model: Dict[int, str] = {}
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    @property
+    def size_bytes(self) -> int:
+        return self._bytes
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get_model(self, key: str, model_type: str = "unknown") -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        m = _metrics()
+        if m is not None:
+            try:
+                m.record_model_cache_operation(model_type, entry is not None)
+            except Exception:
+                pass
+        return entry["model"] if entry is not None else None
+
+    def put_model(self, key: str, model: Any, model_type: str = "unknown") -> None:
+        if not self.enabled:
+            return
+        size = _estimate_size(model)
+        with self._lock:
+            old = self._entries.pop(key, None)
+            if old is not None:
+                self._drop(key, old)
+            self._entries[key] = {"model": model, "model_type": model_type, "explainers": {}, "size": size}
+            self._keys_by_model[id(model)] = key
+            self._bytes += size
+            self._evict()
+        self._export_size()
+
+    def key_for(self, model: Any) -> Optional[str]:
+        """Return the cache key of a model currently held by the cache."""
+        with self._lock:
+            key = self._keys_by_model.get(id(model))
+            if key is not None and self._entries.get(key, {}).get("model") is model:
+                return key
+        return None
+
+    def get_explainer(self, key: str, kind: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            self._entries.move_to_end(key)
+            item = entry["explainers"].get(kind)
+            return item[0] if item is not None else None
+
+    def put_explainer(self, key: str, kind: str, explainer: Any) -> None:
+        size = _estimate_size(explainer)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return
+            prev = entry["explainers"].get(kind)
+            if prev is not None:
+                entry["size"] -= prev[1]
+                self._bytes -= prev[1]
+            entry["explainers"][kind] = (explainer, size)
+            entry["size"] += size
+            self._bytes += size
+            self._evict()
+        self._export_size()
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+            self._keys_by_model.clear()
+            self._bytes = 0
+        self._export_size()
+
+    def _drop(self, key: str, entry: Dict[str, Any]) -> None:
+        self._bytes -= entry["size"]
+        self._keys_by_model.pop(id(entry["model"]), None)
+
+    def _evict(self) -> None:
+        # Caller holds the lock. Always keep the most recent entry even if it
+        # alone exceeds the byte budget; otherwise a large model never caches.
+        m = _metrics()
+        while len(self._entries) > 1 and (len(self._entries) > self.max_entries or self._bytes > self.max_bytes):
+            key, entry = self._entries.popitem(last=False)
+            self._drop(key, entry)
+            self.evictions += 1
+            if m is not None:
+                try:
+                    m.record_model_cache_eviction(entry.get("model_type", "unknown"))
+                except Exception:
+                    pass
+
+    def _export_size(self) -> None:
+        m = _metrics()
+        if m is not None:
+            try:
+                m.model_cache_size.set(self._bytes)
+            except Exception:
+                pass
+
+
+_CACHE: Optional[ModelCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_model_cache() -> ModelCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = ModelCache()
+    return _CACHE
@@ -1,16 +1,24 @@
 from typing import Tuple, Dict, Any
 import pandas as pd
 import numpy as np
-from sklearn.linear_model import LogisticRegression
-from sklearn.preprocessing import StandardScaler
-from sklearn.pipeline import make_pipeline
+import contextvars
 import hashlib
 import pickle
 import importlib
 import importlib.util
-from sklearn.cluster import KMeans
 import logging
-from typing import Optional, TYPE_CHECKING
+import os
+import time
+import weakref
+from contextlib import contextmanager
+from typing import Iterator, Optional, TYPE_CHECKING
+
+from .fingerprint import frame_fingerprint, training_fingerprint
+from .performance import LRUCache
+from .sampling import bootstrap_mean_ci, strata_codes, stratified_sample_indices
+from .accounting import note as _note_usage
+from .cpu_budget import current_threads
+from .tracing import stage
 try:
     from prometheus_client import Counter  # type: ignore
 except Exception:  # pragma: no cover
@@ -18,20 +26,96 @@ except Exception:  # pragma: no cover
     Counter = None  # type: ignore
 
 
-def _build_shap_background(X: pd.DataFrame, n_clusters: int = 10) -> pd.DataFrame:
-    """Build a small background dataset for TreeExplainer using KMeans cluster centers.
+# Background summarisation strategy: "auto" (KMeans for small inputs,
+# MiniBatchKMeans above AI_CORE_SHAP_BACKGROUND_LARGE_ROWS), "kmeans",
+# "minibatch" or "sample" (stratified by label when one is given).
+SHAP_BACKGROUND_METHOD = os.environ.get("AI_CORE_SHAP_BACKGROUND", "auto").lower()
+SHAP_BACKGROUND_LARGE_ROWS = int(os.environ.get("AI_CORE_SHAP_BACKGROUND_LARGE_ROWS", "20000"))
+
+# Memoized backgrounds keyed by background_key(); avoids re-clustering the
+# same dataset on every request.
+_BACKGROUND_CACHE = LRUCache(max_entries=int(os.environ.get("AI_CORE_SHAP_BACKGROUND_CACHE", "64")))
+
+
+def _resolve_background_method(n_rows: int, method: Optional[str] = None) -> str:
+    method = (method or SHAP_BACKGROUND_METHOD).lower()
+    if method == "auto":
+        return "minibatch" if n_rows > SHAP_BACKGROUND_LARGE_ROWS else "kmeans"
+    return method
+
+
+def background_key(X: pd.DataFrame, n_clusters: int = 10, method: Optional[str] = None, data_fingerprint: Optional[str] = None) -> str:
+    """Identity of the background that _build_shap_background would produce.
+
+    Derived from the dataset fingerprint and summarisation settings only, so a
+    SHAP cache lookup can happen before any clustering work.
+    """
+    fp = data_fingerprint or frame_fingerprint(X)
+    return f"{fp}:{_resolve_background_method(len(X), method)}:{n_clusters}"
+
+
+def _build_shap_background(X: pd.DataFrame, n_clusters: int = 10, method: Optional[str] = None, y=None) -> pd.DataFrame:
+    """Build a small background dataset for TreeExplainer.
 
-    Returns a DataFrame with cluster centers (n_clusters x n_features).
+    Uses KMeans cluster centers (n_clusters x n_features) by default,
+    MiniBatchKMeans over a larger sample for big inputs, or a label-stratified
+    row sample when method is "sample".
     """
-    n_samples = min(len(X), 1000)
+    method = _resolve_background_method(len(X), method)
+    if method == "sample":
+        k = min(n_clusters, len(X))
+        if y is not None and k > 0:
+            rng = np.random.default_rng(0)
+            labels = np.asarray(y)
+            picks = []
+            for cls in np.unique(labels):
+                pos = np.flatnonzero(labels == cls)
+                n = min(len(pos), max(1, int(round(len(pos) * k / float(len(X))))))
+                picks.append(rng.choice(pos, size=n, replace=False))
+            return X.iloc[np.sort(np.concatenate(picks))]
+        return X.sample(n=k, random_state=0)
+
+    n_samples = min(len(X), 10000 if method == "minibatch" else 1000)
     sample = X.sample(n=n_samples, random_state=0)
     k = min(n_clusters, len(sample))
     if k <= 0:
         return sample
-    kmeans = KMeans(n_clusters=k, random_state=0).fit(sample.values)
+    if method == "minibatch":
+        from sklearn.cluster import MiniBatchKMeans
+
+        kmeans = MiniBatchKMeans(n_clusters=k, random_state=0, batch_size=1024, n_init=3).fit(sample.values)
+    else:
+        from sklearn.cluster import KMeans
+
+        kmeans = KMeans(n_clusters=k, random_state=0).fit(sample.values)
     centers = pd.DataFrame(kmeans.cluster_centers_, columns=sample.columns)
     return centers
 
+
+def get_shap_background(X: pd.DataFrame, key: str, n_clusters: int = 10, method: Optional[str] = None, y=None) -> pd.DataFrame:
+    """Return the memoized background for ``key``, building it on first use."""
+    bg = _BACKGROUND_CACHE.get(key)
+    if bg is None:
+        with stage("background"):
+            bg = _build_shap_background(X, n_clusters=n_clusters, method=method, y=y)
+        _BACKGROUND_CACHE.set(key, bg)
+    return bg
+
+# Budgeted explanations: bootstrap replicates for the CI and the pilot batch
+# size used to translate a time budget into rows.
+EXPLAIN_BOOTSTRAP_REPLICATES = int(os.environ.get("AI_CORE_EXPLAIN_BOOTSTRAP", "200"))
+EXPLAIN_PILOT_ROWS = 32
+
+# Explanation backend: "auto" uses exact linear SHAP for linear models and the
+# native TreeSHAP of LightGBM/XGBoost (pred_contrib) before falling back to the
+# shap package; "shap" always goes through shap.
+EXPLAIN_BACKEND_MODE = os.environ.get("AI_CORE_EXPLAIN_BACKEND", "auto").lower()
+
+# Bump when an explanation backend changes what or in which units it reports
+# (e.g. log-odds from linear/native paths vs. probabilities from shap), so
+# cached summaries from older code are not served for newer ones.
+EXPLAIN_CACHE_VERSION = 2
+
 # Defer importing shap until explain_model is called to avoid pulling heavy
 # native dependencies at module import time (helps tests and CI where
 # SHAP/numpy versions may not be compatible).
@@ -49,176 +133,486 @@ if Counter is not None:  # type: ignore[truthy-bool]
         SHAP_CACHE_HITS = Counter("ai_core_shap_cache_hits_total", "Total SHAP cache hits")
         SHAP_CACHE_MISSES = Counter("ai_core_shap_cache_misses_total", "Total SHAP cache misses")
         SHAP_CACHE_WRITES = Counter("ai_core_shap_cache_writes_total", "Total SHAP cache writes")
+        # Per-tier breakdown of SHAP_CACHE_HITS, plus misses served from the negative cache
+        SHAP_CACHE_L1_HITS = Counter("ai_core_shap_cache_l1_hits_total", "SHAP cache hits served from the in-process L1")
+        SHAP_CACHE_L2_HITS = Counter("ai_core_shap_cache_l2_hits_total", "SHAP cache hits served from the Mongo L2")
+        SHAP_CACHE_NEGATIVE_HITS = Counter("ai_core_shap_cache_negative_hits_total", "SHAP cache misses answered by the L1 negative cache")
+        EXPLAIN_BACKEND = Counter("ai_core_explain_backend_total", "Explanations computed per backend", ["backend"])
     except Exception:  # pragma: no cover
         # If metrics already registered (multiple imports/reloads) or prometheus disabled, use None
         SHAP_CACHE_HITS = SHAP_CACHE_MISSES = SHAP_CACHE_WRITES = None
+        SHAP_CACHE_L1_HITS = SHAP_CACHE_L2_HITS = SHAP_CACHE_NEGATIVE_HITS = None
+        EXPLAIN_BACKEND = None
 else:
     SHAP_CACHE_HITS = SHAP_CACHE_MISSES = SHAP_CACHE_WRITES = None
+    SHAP_CACHE_L1_HITS = SHAP_CACHE_L2_HITS = SHAP_CACHE_NEGATIVE_HITS = None
+    EXPLAIN_BACKEND = None
 
 
-def train_quick_model(X: pd.DataFrame, y: pd.Series):
-    """Train a tiny model quickly and return a pipeline.
+def _inc(counter) -> None:
+    try:
+        if counter is not None:
+            counter.inc()
+    except Exception:
+        pass
 
-    Keep training light so this is safe to run during development.
-    If y is None, create a synthetic binary target for demonstration.
+
+def _record_backend(backend: str) -> None:
+    """Report which explanation backend produced the values (usage + metric)."""
+    _note_usage(explainer=backend)
+    try:
+        if EXPLAIN_BACKEND is not None:
+            EXPLAIN_BACKEND.labels(backend=backend).inc()
+    except Exception:
+        pass
+
+
+# Set while caches_bypassed() is active: the model and SHAP cache accessors
+# return None, so nothing is looked up, stored, persisted or counted.
+_CACHES_BYPASSED: contextvars.ContextVar[bool] = contextvars.ContextVar("ai_core_caches_bypassed", default=False)
+
+
+@contextmanager
+def caches_bypassed() -> Iterator[None]:
+    """Run the block without the model cache and the tiered SHAP cache."""
+    token = _CACHES_BYPASSED.set(True)
+    try:
+        yield
+    finally:
+        _CACHES_BYPASSED.reset(token)
+
+
+def _model_cache():
+    if _CACHES_BYPASSED.get():
+        return None
+    try:
+        return importlib.import_module("ai_core.utils.model_cache").get_model_cache()
+    except Exception:
+        try:
+            return importlib.import_module("utils.model_cache").get_model_cache()
+        except Exception:
+            return None
+
+
+def _tiered_shap_cache():
+    if _CACHES_BYPASSED.get():
+        return None
+    try:
+        return importlib.import_module("ai_core.utils.shap_cache").get_tiered_shap_cache()
+    except Exception:
+        try:
+            return importlib.import_module("utils.shap_cache").get_tiered_shap_cache()
+        except Exception:
+            return None
+
+
+def _explain_cache_key(baseline_hash: str) -> str:
+    """SHAP cache key for a background: tagged with the backend mode and version."""
+    return f"{baseline_hash}:explain={EXPLAIN_BACKEND_MODE}:v{EXPLAIN_CACHE_VERSION}"
+
+
+# Training fingerprint of every model train_quick_model returned, whether or not
+# the model cache holds (or still holds) it.
+_TRAINING_KEYS: "weakref.WeakKeyDictionary[Any, str]" = weakref.WeakKeyDictionary()
+
+
+def _remember_training_key(model, key: Optional[str]) -> None:
+    if key is None:
+        return
+    try:
+        _TRAINING_KEYS[model] = key
+    except TypeError:  # not weak-referenceable
+        pass
+
+
+def _model_hash(model) -> str:
+    """Cache key for a model: its training fingerprint when train_quick_model
+    produced it, otherwise a one-off serialization hash for foreign models."""
+    try:
+        key = _TRAINING_KEYS.get(model)
+    except TypeError:
+        key = None
+    if key is None:
+        cache = _model_cache()
+        key = cache.key_for(model) if cache is not None else None
+    if key is not None:
+        return key
+    try:
+        return hashlib.sha256(pickle.dumps(model)).hexdigest()
+    except Exception:
+        return hashlib.sha256(repr(model).encode()).hexdigest()
+
+
+def _estimator_config() -> Tuple[str, Dict[str, Any]]:
+    """Return (model_type, params) for the estimator train_quick_model will fit."""
+    if LIGHTGBM_AVAILABLE:
+        return "lightgbm", {"n_estimators": 100, "max_depth": 4, "learning_rate": 0.1}
+    if XGBOOST_AVAILABLE:
+        return "xgboost", {"n_estimators": 100, "max_depth": 4, "learning_rate": 0.1, "use_label_encoder": False, "eval_metric": "logloss"}
+    return "logistic_regression", {"max_iter": 200}
+
+
+def _thread_params(params: Dict[str, Any]) -> Dict[str, Any]:
+    """``params`` plus ``n_jobs`` from the running analysis' CPU quota.
+
+    Applied at fit time only, so the quota never becomes part of the model
+    cache key built from ``_estimator_config``.
     """
-    # If no target, create a synthetic one for demo purposes
-    if y is None:
-        # Create a simple synthetic target that alternates (ensures both classes present)
-        # This ensures we have samples of both classes for binary classification
-        y = pd.Series(np.arange(len(X)) % 2, index=X.index)
+    threads = current_threads()
+    return {**params, "n_jobs": threads} if threads else params
+
 
+def _fit_estimator(model_type: str, params: Dict[str, Any], X: pd.DataFrame, y: pd.Series):
     # Prefer a lightweight tree ensemble if available for faster SHAP TreeExplainer
     try:
-        if LIGHTGBM_AVAILABLE:
+        if model_type == "lightgbm":
             lgb = importlib.import_module("lightgbm")
 
-            lgbm = lgb.LGBMClassifier(n_estimators=100, max_depth=4, learning_rate=0.1)
+            lgbm = lgb.LGBMClassifier(**_thread_params(params))
             lgbm.fit(X, y)
             return lgbm
-        if XGBOOST_AVAILABLE:
+        if model_type == "xgboost":
             xgb = importlib.import_module("xgboost")
 
-            xgbm = xgb.XGBClassifier(n_estimators=100, max_depth=4, learning_rate=0.1, use_label_encoder=False, eval_metric='logloss')
+            xgbm = xgb.XGBClassifier(**_thread_params(params))
             xgbm.fit(X, y)
             return xgbm
     except Exception:
         # fall back to logistic regression pipeline
         pass
 
-    model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=200))
+    # sklearn is imported on first fit so importing this module stays cheap
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import make_pipeline
+    from sklearn.preprocessing import StandardScaler
+
+    model = make_pipeline(StandardScaler(), LogisticRegression(max_iter=params.get("max_iter", 200)))
     model.fit(X, y)
     return model
 
 
+def train_quick_model(X: pd.DataFrame, y: pd.Series):
+    """Train a tiny model quickly and return a pipeline.
+
+    Keep training light so this is safe to run during development.
+    If y is None, create a synthetic binary target for demonstration.
+    Fitted models are memoized in the process-wide model cache keyed by a
+    fingerprint of (X, y, estimator config).
+    """
+    model_type, params = _estimator_config()
+    # The fingerprint also keys the SHAP cache, so compute it even when the
+    # model cache is off.
+    try:
+        key = training_fingerprint(X, y, (model_type, params))
+    except Exception:
+        key = None
+    cache = _model_cache()
+    if key is not None and cache is not None and cache.enabled:
+        try:
+            cached_model = cache.get_model(key, model_type)
+            if cached_model is not None:
+                _remember_training_key(cached_model, key)
+                return cached_model
+        except Exception:
+            pass
+
+    # If no target, create a synthetic one for demo purposes
+    if y is None:
+        # Create a simple synthetic target that alternates (ensures both classes present)
+        # This ensures we have samples of both classes for binary classification
+        y = pd.Series(np.arange(len(X)) % 2, index=X.index)
+
+    model = _fit_estimator(model_type, params, X, y)
+    _remember_training_key(model, key)
+    if key is not None and cache is not None and cache.enabled:
+        cache.put_model(key, model, model_type)
+    return model
+
+
 def explain_model(model, X: pd.DataFrame) -> Dict[str, float]:
     """Return feature importances/explanations.
 
     If SHAP is available, compute SHAP mean absolute values. Otherwise
     fall back to model coefficients.
     """
-    feature_names = list(X.columns)
-    # compute model hash for caching (best-effort) so fallback paths can write cache
-    try:
-        mh = hashlib.sha256(pickle.dumps(model)).hexdigest()
-    except Exception:
-        mh = hashlib.sha256(repr(model).encode()).hexdigest()
+    # model hash for caching (best-effort) so fallback paths can write cache
+    mh = _model_hash(model)
 
-    # build a small background: kmeans centers (10 clusters)
+    # Background identity (10 cluster centers) is derived from the data
+    # fingerprint; the clustering itself only runs on a SHAP cache miss.
     try:
-        bg = _build_shap_background(X, n_clusters=10)
-        baseline_hash = hashlib.sha256(bg.to_csv(index=False).encode()).hexdigest()
+        baseline_hash = background_key(X, n_clusters=10)
     except Exception:
-        bg = None
         baseline_hash = ""
 
     logger = logging.getLogger("ai_core.model_helper")
 
-    # Try to load cached summary from DB if persistence is available.
-    # Do this before attempting to import shap so a cached result is returned
-    # even when shap is not installed in the test/CI environment.
-    try:
-        # Import the persistence module fresh each time so tests that inject
-        # a fake persistence into sys.modules are honored.
+    # Two-tier cache lookup (process L1, then Mongo L2). Do this before
+    # attempting to import shap so a cached result is returned even when shap
+    # is not installed in the test/CI environment.
+    cache_bh = _explain_cache_key(baseline_hash)
+    shap_cache = _tiered_shap_cache()
+    if shap_cache is not None:
         try:
-            persistence = importlib.import_module("ai_core.utils.persistence")
+            cached, tier = shap_cache.get(mh, cache_bh)
         except Exception:
-            persistence = importlib.import_module("utils.persistence")
+            cached, tier = None, "miss"
+        if cached is not None:
+            _inc(SHAP_CACHE_HITS)
+            _inc(SHAP_CACHE_L1_HITS if tier == "l1" else SHAP_CACHE_L2_HITS)
+            _note_usage(explainer=f"cache:{tier}")
+            logger.info({"msg": "shap_cache_hit", "tier": tier, "model_hash": mh, "baseline_hash": baseline_hash})
+            return cached
+        _inc(SHAP_CACHE_MISSES)
+        if tier == "negative":
+            _inc(SHAP_CACHE_NEGATIVE_HITS)
+        logger.info({"msg": "shap_cache_miss", "tier": tier, "model_hash": mh, "baseline_hash": baseline_hash})
 
-        cached = None
-        if hasattr(persistence, "get_db") and hasattr(persistence, "get_shap_cache"):
-            db = persistence.get_db()
-            cached = persistence.get_shap_cache(db, mh, baseline_hash)
+    result = _compute_explanation(model, X, baseline_hash)
 
-        if cached and "shap_summary" in cached:
-            try:
-                if SHAP_CACHE_HITS is not None:
-                    SHAP_CACHE_HITS.inc()
-            except Exception:
-                pass
-            logger.info({"msg": "shap_cache_hit", "model_hash": mh, "baseline_hash": baseline_hash})
-            return cached["shap_summary"]
-        else:
+    # Single write per request: L1 now, L2 written behind.
+    if shap_cache is not None:
+        try:
+            shap_cache.set(mh, cache_bh, result)
+            _inc(SHAP_CACHE_WRITES)
+        except Exception:
+            pass
+    return result
+
+
+def _linear_weights(model) -> Optional[np.ndarray]:
+    """Per-feature log-odds weights of a binary linear model in raw input units.
+
+    Handles a bare linear classifier or a Pipeline of StandardScaler steps
+    ending in one; the scalers are folded into the coefficients
+    (``coef / scale``). Returns None for anything else.
+    """
+    steps = [est for _, est in getattr(model, "steps", [("", model)])]
+    final = steps[-1]
+    coef = getattr(final, "coef_", None)
+    if coef is None or np.ndim(coef) != 2 or coef.shape[0] != 1:
+        return None
+    weights = np.asarray(coef, dtype=np.float64)[0].copy()
+    for est in steps[:-1]:
+        if type(est).__name__ != "StandardScaler":
+            return None
+        scale = getattr(est, "scale_", None)
+        if scale is not None:
+            weights = weights / np.asarray(scale, dtype=np.float64)
+    return weights
+
+
+def _linear_shap_values(model, X: pd.DataFrame, X_eval: pd.DataFrame) -> Optional[np.ndarray]:
+    """Exact SHAP values (log-odds) for linear models, or None if ``model`` is not linear.
+
+    With independent features the SHAP value of feature j is
+    ``w_j * (x_j - E[x_j])``, the expectation taken over X (the same
+    background the generic explainer would use), so this is O(n*d) with no
+    shap import and no model evaluations.
+    """
+    weights = _linear_weights(model)
+    if weights is None or weights.shape[0] != X.shape[1]:
+        return None
+    background_mean = X.to_numpy(dtype=np.float64).mean(axis=0)
+    return (X_eval.to_numpy(dtype=np.float64) - background_mean) * weights
+
+
+def _native_tree_backend(model) -> Optional[str]:
+    """"lightgbm" / "xgboost" when ``model`` exposes native TreeSHAP contributions."""
+    module = type(model).__module__.split(".", 1)[0]
+    if module == "lightgbm" or type(model).__name__.startswith("LGBM"):
+        return "lightgbm"
+    if module == "xgboost" or (type(model).__name__.startswith("XGB") and hasattr(model, "get_booster")):
+        return "xgboost"
+    return None
+
+
+def _native_tree_contributions(model, X_eval: pd.DataFrame) -> Optional[np.ndarray]:
+    """Exact TreeSHAP values (rows x features, raw margin) from LightGBM/XGBoost.
+
+    Uses ``predict(..., pred_contrib=True)`` / ``pred_contribs=True``, which run
+    multithreaded inside the library with no background data (path-dependent
+    TreeSHAP). The trailing bias column is dropped. Returns None for
+    non-native models or multiclass output so callers can fall back to shap.
+    """
+    backend = _native_tree_backend(model)
+    # a cached model keeps the thread count it was trained with; use this analysis' quota
+    threads = current_threads()
+    if backend == "lightgbm":
+        extra = {"num_threads": threads} if threads else {}
+        contrib = model.predict(X_eval, pred_contrib=True, **extra)
+    elif backend == "xgboost":
+        xgb = importlib.import_module("xgboost")
+        # the booster may be shared through the model cache, so the quota goes on
+        # this call's DMatrix instead of set_param() on the booster
+        extra = {"nthread": threads} if threads else {}
+        dmatrix = xgb.DMatrix(X_eval, enable_categorical=True, **extra)
+        contrib = model.get_booster().predict(dmatrix, pred_contribs=True)
+    else:
+        return None
+    contrib = np.asarray(contrib)
+    if contrib.ndim != 2 or contrib.shape[1] != X_eval.shape[1] + 1:
+        return None
+    return contrib[:, :-1]
+
+
+def _shap_row_values(model, X: pd.DataFrame, X_eval: pd.DataFrame, baseline_hash: str) -> Optional[np.ndarray]:
+    """Per-row SHAP values (rows of X_eval x features, positive class).
+
+    X is the full dataset used for the background/masker. Linear models are
+    explained analytically and LightGBM/XGBoost through their native
+    contribution APIs; everything else goes through shap. Returns None when
+    shap is unavailable or the explanation fails.
+    """
+    if EXPLAIN_BACKEND_MODE != "shap":
+        for backend, compute in (
+            ("linear", lambda: _linear_shap_values(model, X, X_eval)),
+            ("native:" + str(_native_tree_backend(model)), lambda: _native_tree_contributions(model, X_eval)),
+        ):
             try:
-                if SHAP_CACHE_MISSES is not None:
-                    SHAP_CACHE_MISSES.inc()
+                values = compute()
             except Exception:
-                pass
-            logger.info({"msg": "shap_cache_miss", "model_hash": mh, "baseline_hash": baseline_hash})
-    except Exception:
-        cached = None
+                logging.getLogger("ai_core.model_helper").debug("explain backend %s failed", backend, exc_info=True)
+                values = None
+            if values is not None:
+                _record_backend(backend)
+                return values
 
     # Try to import shap on-demand. If it's not available or fails (e.g. ABI
-    # mismatch with numpy), fall back to coefficient-based explanations.
+    # mismatch with numpy), callers fall back to coefficient-based explanations.
     try:
         shap_mod = importlib.import_module("shap")
         # If model is tree-based, use TreeExplainer (much faster)
         is_tree = any(name in type(model).__name__.lower() for name in ("lgbm", "xgb", "xgboost", "lightgbm", "gbm", "tree", "randomforest"))
 
-        if is_tree:
-            explainer = shap_mod.TreeExplainer(model, data=bg if bg is not None else None)
-        else:
-            explainer = shap_mod.Explainer(model.predict_proba, X)
+        kind = ("tree:" if is_tree else "generic:") + baseline_hash
+        cache = _model_cache()
+        model_key = cache.key_for(model) if cache is not None else None
+        explainer = cache.get_explainer(model_key, kind) if model_key is not None else None
+        if explainer is None:
+            if is_tree:
+                try:
+                    if baseline_hash:
+                        bg = get_shap_background(X, baseline_hash, n_clusters=10)
+                    else:
+                        bg = _build_shap_background(X, n_clusters=10)
+                except Exception:
+                    bg = None
+                explainer = shap_mod.TreeExplainer(model, data=bg if bg is not None else None)
+            else:
+                explainer = shap_mod.Explainer(model.predict_proba, X)
+            if model_key is not None:
+                cache.put_explainer(model_key, kind, explainer)
 
-        shap_values = explainer(X)
+        values = explainer(X_eval).values
+        _record_backend("shap:" + type(explainer).__name__)
         # shap_values for class 1 if multi-class
-        vals = np.abs(shap_values.values[..., 1]).mean(axis=0) if shap_values.values.ndim == 3 else np.abs(shap_values.values).mean(axis=0)
-        result = {n: float(v) for n, v in zip(feature_names, vals)}
-
-        # store cache if possible (use persistence module at write time to honor fakes)
-        try:
-            try:
-                persistence = importlib.import_module("ai_core.utils.persistence")
-            except Exception:
-                persistence = importlib.import_module("utils.persistence")
-            if hasattr(persistence, "set_shap_cache") and hasattr(persistence, "get_db"):
-                db = persistence.get_db()
-                persistence.set_shap_cache(db, mh, baseline_hash, result)
-        except Exception:
-            pass
-
-        return result
+        return values[..., 1] if values.ndim == 3 else values
     except Exception:
-        # shap import or explanation failed; fall back to coefficients
-        pass
+        return None
 
+
+def _coefficient_importances(model, feature_names) -> Dict[str, float]:
     # fallback: use logistic regression coefficients if present
     try:
         # extract coef from pipeline
         lr = None
-        for step in model.steps[::-1]:
+        for _, step in reversed(getattr(model, "steps", [("", model)])):
             if hasattr(step, "coef_"):
                 lr = step
                 break
-        if lr is None:
-            # sklearn pipeline: model.named_steps['logisticregression']
-            lr = model.named_steps.get("logisticregression")
         coefs = np.abs(lr.coef_).flatten()
         # normalize
         coefs = coefs / (coefs.sum() + 1e-9)
-        result = {n: float(v) for n, v in zip(feature_names, coefs)}
-        try:
-            try:
-                persistence = importlib.import_module("ai_core.utils.persistence")
-            except Exception:
-                persistence = importlib.import_module("utils.persistence")
-            if hasattr(persistence, "set_shap_cache") and hasattr(persistence, "get_db"):
-                db = persistence.get_db()
-                persistence.set_shap_cache(db, mh, baseline_hash, result)
-        except Exception:
-            pass
-        return result
+        _note_usage(explainer="coefficients")
+        return {n: float(v) for n, v in zip(feature_names, coefs)}
     except Exception:
         # last resort: uniform small importances
-        result = {n: 1.0 / len(feature_names) for n in feature_names}
+        _note_usage(explainer="uniform")
+        return {n: 1.0 / len(feature_names) for n in feature_names}
+
+
+def _compute_explanation(model, X: pd.DataFrame, baseline_hash: str) -> Dict[str, float]:
+    feature_names = list(X.columns)
+    values = _shap_row_values(model, X, X, baseline_hash)
+    if values is not None:
+        vals = np.abs(values).mean(axis=0)
+        return {n: float(v) for n, v in zip(feature_names, vals)}
+    return _coefficient_importances(model, feature_names)
+
+
+def explain_model_budgeted(
+    model,
+    X: pd.DataFrame,
+    y=None,
+    sensitive=None,
+    max_rows: Optional[int] = None,
+    max_seconds: Optional[float] = None,
+) -> Dict[str, Any]:
+    """Explain a stratified subsample sized to a row and/or time budget.
+
+    Rows are sampled proportionally across (label, sensitive group) strata.
+    A time budget is converted to rows by timing a small pilot batch once the
+    explainer is warm. Returns mean |SHAP| per feature ("importances") with a
+    bootstrap confidence interval ("ci_low"/"ci_high"), the sample size used
+    ("n_samples") and the dataset size ("n_rows").
+    """
+    feature_names = list(X.columns)
+    n_rows = len(X)
+    target = n_rows if max_rows is None else max(1, min(n_rows, int(max_rows)))
+    strata = strata_codes([y, sensitive], n_rows)
+    mh = _model_hash(model)
+    try:
+        baseline_hash = background_key(X, n_clusters=10)
+    except Exception:
+        baseline_hash = ""
+
+    # Budgeted results are approximations; keep them apart from full runs. Key on
+    # the requested budget (not the pilot-derived row count) so a hit skips the pilot.
+    cache_bh = f"{_explain_cache_key(baseline_hash)}:budget=rows={max_rows},seconds={max_seconds}"
+    shap_cache = _tiered_shap_cache()
+    if shap_cache is not None:
         try:
-            try:
-                persistence = importlib.import_module("ai_core.utils.persistence")
-            except Exception:
-                persistence = importlib.import_module("utils.persistence")
-            if hasattr(persistence, "set_shap_cache") and hasattr(persistence, "get_db"):
-                db = persistence.get_db()
-                persistence.set_shap_cache(db, mh, baseline_hash, result)
+            cached, tier = shap_cache.get(mh, cache_bh)
+        except Exception:
+            cached, tier = None, "miss"
+        if cached is not None and "importances" in cached:
+            _inc(SHAP_CACHE_HITS)
+            _inc(SHAP_CACHE_L1_HITS if tier == "l1" else SHAP_CACHE_L2_HITS)
+            _note_usage(explainer=f"cache:{tier}")
+            return cached
+        _inc(SHAP_CACHE_MISSES)
+
+    if max_seconds is not None and target > EXPLAIN_PILOT_ROWS:
+        pilot_idx = stratified_sample_indices(strata, EXPLAIN_PILOT_ROWS, seed=1)
+        # first call builds (and caches) the explainer so the pilot times rows only
+        if _shap_row_values(model, X, X.iloc[pilot_idx[:1]], baseline_hash) is not None:
+            t0 = time.perf_counter()
+            _shap_row_values(model, X, X.iloc[pilot_idx], baseline_hash)
+            per_row = (time.perf_counter() - t0) / float(len(pilot_idx))
+            if per_row > 0:
+                target = max(EXPLAIN_PILOT_ROWS, min(target, int(float(max_seconds) / per_row)))
+
+    idx = stratified_sample_indices(strata, target)
+    values = _shap_row_values(model, X, X.iloc[idx], baseline_hash)
+    if values is not None:
+        abs_vals = np.abs(values)
+        means = abs_vals.mean(axis=0)
+        lo, hi = bootstrap_mean_ci(abs_vals, n_boot=EXPLAIN_BOOTSTRAP_REPLICATES)
+        result = {
+            "importances": {n: float(v) for n, v in zip(feature_names, means)},
+            "ci_low": {n: float(v) for n, v in zip(feature_names, lo)},
+            "ci_high": {n: float(v) for n, v in zip(feature_names, hi)},
+        }
+    else:
+        imp = _coefficient_importances(model, feature_names)
+        result = {"importances": imp, "ci_low": dict(imp), "ci_high": dict(imp)}
+    result.update({"n_samples": int(len(idx)), "n_rows": int(n_rows), "confidence": 0.95})
+
+    if shap_cache is not None:
+        try:
+            shap_cache.set(mh, cache_bh, result)
+            _inc(SHAP_CACHE_WRITES)
         except Exception:
             pass
-        return result
+    return result
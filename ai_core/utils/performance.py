@@ -3,10 +3,12 @@ Performance optimization utilities for EthixAI
 Provides caching, batch processing, and optimization helpers
 """
 
+from collections import OrderedDict
 from functools import lru_cache, wraps
-from typing import Any, Callable, List, Dict
+from typing import Any, Callable, List, Dict, Optional
 import hashlib
 import json
+import threading
 import time
 import numpy as np
 from datetime import datetime, timedelta
@@ -50,6 +52,63 @@ class PerformanceCache:
             del self._cache[key]
 
 
+class LRUCache:
+    """Thread-safe bounded LRU cache with optional TTL.
+
+    ``ttl_seconds`` of None or 0 means entries never expire; ``set`` accepts a
+    per-entry override (e.g. a shorter TTL for negative entries).
+    """
+
+    def __init__(self, max_entries: int = 128, ttl_seconds: Optional[float] = None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._data: "OrderedDict[Any, tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """Return the cached value (refreshing recency) or default."""
+        with self._lock:
+            item = self._data.get(key)
+            if item is None:
+                return default
+            value, expires_at = item
+            if expires_at is not None and time.time() >= expires_at:
+                del self._data[key]
+                return default
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Any, value: Any, ttl_seconds: Optional[float] = None):
+        """Insert or replace a value, evicting the least recently used entries."""
+        if self.max_entries <= 0:
+            return
+        ttl = self.ttl_seconds if ttl_seconds is None else ttl_seconds
+        expires_at = time.time() + ttl if ttl else None
+        with self._lock:
+            self._data[key] = (value, expires_at)
+            self._data.move_to_end(key)
+            while len(self._data) > self.max_entries:
+                self._data.popitem(last=False)
+
+    def pop(self, key: Any, default: Any = None) -> Any:
+        with self._lock:
+            item = self._data.pop(key, None)
+        return default if item is None else item[0]
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+    def __contains__(self, key: Any) -> bool:
+        return self.get(key, _MISSING) is not _MISSING
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+
+_MISSING = object()
+
+
 # Global cache instance
 _analysis_cache = PerformanceCache(ttl_seconds=300)
 
@@ -102,29 +161,51 @@ def batch_process(items: List[Any], batch_size: int = 50) -> List[List[Any]]:
     return batches
 
 
-def optimize_dataframe_memory(df):
-    """Optimize pandas DataFrame memory usage"""
+def _narrowest_int(c_min, c_max, candidates):
+    for dtype in candidates:
+        info = np.iinfo(dtype)
+        if info.min <= c_min and c_max <= info.max:
+            return dtype
+    return None
+
+
+def optimize_dataframe_memory(df, max_category_ratio: float = 0.5):
+    """Optimize pandas DataFrame memory usage
+
+    Columns are cast in place to the narrowest dtype that holds their values
+    exactly: integers to the smallest (u)int type whose range contains them,
+    floats to float32 only when every value round-trips, and object/string
+    columns with at most ``max_category_ratio`` distinct values per row to
+    ``category``. Returns ``df``.
+    """
     try:
         import pandas as pd
 
         for col in df.columns:
-            col_type = df[col].dtype
-
-            if col_type != object:
-                # Optimize numeric columns
-                c_min = df[col].min()
-                c_max = df[col].max()
-
-                if str(col_type)[:3] == 'int':
-                    if c_min > np.iinfo(np.int8).min and c_max < np.iinfo(np.int8).max:
-                        df[col] = df[col].astype(np.int8)
-                    elif c_min > np.iinfo(np.int16).min and c_max < np.iinfo(np.int16).max:
-                        df[col] = df[col].astype(np.int16)
-                    elif c_min > np.iinfo(np.int32).min and c_max < np.iinfo(np.int32).max:
-                        df[col] = df[col].astype(np.int32)
-                else:
-                    if c_min > np.finfo(np.float16).min and c_max < np.finfo(np.float16).max:
-                        df[col] = df[col].astype(np.float32)
+            s = df[col]
+            kind = s.dtype.kind
+            if len(s) == 0:
+                continue
+            if kind in "iu":
+                c_min, c_max = s.min(), s.max()
+                candidates = (np.uint8, np.uint16, np.uint32) if kind == "u" else (np.int8, np.int16, np.int32)
+                target = _narrowest_int(c_min, c_max, candidates)
+                if target is not None and np.dtype(target).itemsize < s.dtype.itemsize:
+                    df[col] = s.astype(target)
+            elif kind == "f" and s.dtype.itemsize > 4:
+                values = s.to_numpy()
+                narrowed = values.astype(np.float32)
+                with np.errstate(over="ignore", invalid="ignore"):
+                    exact = (narrowed.astype(values.dtype) == values) | np.isnan(values)
+                if exact.all():
+                    df[col] = pd.Series(narrowed, index=s.index, name=s.name)
+            elif kind == "O" or isinstance(s.dtype, pd.StringDtype):
+                try:
+                    n_distinct = s.nunique(dropna=True)
+                except TypeError:  # unhashable cells (lists, dicts)
+                    continue
+                if n_distinct <= max_category_ratio * len(s):
+                    df[col] = s.astype("category")
 
         return df
     except Exception as e:
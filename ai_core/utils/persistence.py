@@ -1,27 +1,154 @@
+import asyncio
 import os
+import tempfile
+import threading
 import time
 import json
 import hashlib
-from typing import Any, Optional
+from typing import Any, Dict, Optional
 
 try:
     from pymongo import MongoClient
 except Exception:
     MongoClient = None  # optional dependency; tests may provide a fake DB
 
+try:
+    from motor.motor_asyncio import AsyncIOMotorClient  # type: ignore
+except Exception:
+    AsyncIOMotorClient = None  # optional; async helpers fall back to worker threads
+
+
+# Retention of shap_cache documents (TTL index on created_at); the in-process
+# L1 in utils/shap_cache.py uses the same lifetime.
+SHAP_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+# One pooled client per process (and per URI). MongoClient is thread-safe but
+# not fork-safe, so a child process discards the parent's client and lazily
+# builds its own.
+_CLIENT_LOCK = threading.Lock()
+_CLIENT: Optional[Any] = None
+_CLIENT_KEY: Optional[tuple] = None
+_ASYNC_CLIENT: Optional[Any] = None
+_ASYNC_CLIENT_KEY: Optional[tuple] = None
+
+
+def _mongo_uri() -> Optional[str]:
+    return os.environ.get("MONGO_URI") or os.environ.get("MONGO_URL")
+
+
+def client_options() -> Dict[str, Any]:
+    """Pool size and timeouts for Mongo clients, from the environment.
+
+    - AI_CORE_MONGO_MAX_POOL_SIZE (default 50)
+    - AI_CORE_MONGO_MIN_POOL_SIZE (default 0)
+    - AI_CORE_MONGO_CONNECT_TIMEOUT_MS (default 2000)
+    - AI_CORE_MONGO_SERVER_SELECTION_TIMEOUT_MS (default 2000)
+    - AI_CORE_MONGO_SOCKET_TIMEOUT_MS (default 10000)
+    """
+    env = os.environ.get
+    return {
+        "maxPoolSize": int(env("AI_CORE_MONGO_MAX_POOL_SIZE", "50")),
+        "minPoolSize": int(env("AI_CORE_MONGO_MIN_POOL_SIZE", "0")),
+        "connectTimeoutMS": int(env("AI_CORE_MONGO_CONNECT_TIMEOUT_MS", "2000")),
+        "serverSelectionTimeoutMS": int(env("AI_CORE_MONGO_SERVER_SELECTION_TIMEOUT_MS", "2000")),
+        "socketTimeoutMS": int(env("AI_CORE_MONGO_SOCKET_TIMEOUT_MS", "10000")),
+    }
+
+
+def get_client() -> Optional[Any]:
+    """Return the process-wide pooled MongoClient, creating it on first use.
+
+    Returns None when MONGO_URI is unset or pymongo is unavailable.
+    """
+    global _CLIENT, _CLIENT_KEY
+    uri = _mongo_uri()
+    if not uri or MongoClient is None:
+        return None
+    key = (os.getpid(), uri)
+    client = _CLIENT
+    if client is not None and _CLIENT_KEY == key:
+        return client
+    with _CLIENT_LOCK:
+        if _CLIENT is None or _CLIENT_KEY != key:
+            if _CLIENT is not None and _CLIENT_KEY is not None and _CLIENT_KEY[0] == key[0]:
+                # same process, different URI: release the old pool
+                try:
+                    _CLIENT.close()
+                except Exception:
+                    pass
+            # connect=False defers the first connection to the first operation
+            _CLIENT = MongoClient(uri, connect=False, **client_options())
+            _CLIENT_KEY = key
+        return _CLIENT
+
+
+def close_client() -> None:
+    """Close the pooled clients (app shutdown, tests)."""
+    global _CLIENT, _CLIENT_KEY, _ASYNC_CLIENT, _ASYNC_CLIENT_KEY
+    with _CLIENT_LOCK:
+        for client, key in ((_CLIENT, _CLIENT_KEY), (_ASYNC_CLIENT, _ASYNC_CLIENT_KEY)):
+            if client is not None and key is not None and key[0] == os.getpid():
+                try:
+                    client.close()
+                except Exception:
+                    pass
+        _CLIENT = _CLIENT_KEY = _ASYNC_CLIENT = _ASYNC_CLIENT_KEY = None
+
+
+def _forget_clients_after_fork() -> None:
+    # Sockets and monitor threads are not usable in the child; drop without closing.
+    global _CLIENT, _CLIENT_KEY, _ASYNC_CLIENT, _ASYNC_CLIENT_KEY
+    _CLIENT = _CLIENT_KEY = _ASYNC_CLIENT = _ASYNC_CLIENT_KEY = None
+
+
+if hasattr(os, "register_at_fork"):
+    os.register_at_fork(after_in_child=_forget_clients_after_fork)
+
 
 def get_db() -> Optional[Any]:
     """Return a pymongo Database object if MONGO_URI is configured and
     pymongo is available. Otherwise return None.
 
+    The database comes from the pooled process-wide client (see get_client).
     Tests may monkeypatch this module with a fake DB object.
     """
-    uri = os.environ.get("MONGO_URI") or os.environ.get("MONGO_URL")
-    db_name = os.environ.get("MONGO_DB", "ai_core")
-    if not uri or MongoClient is None:
+    client = get_client()
+    if client is None:
         return None
-    client = MongoClient(uri)
-    return client[db_name]
+    return client[os.environ.get("MONGO_DB", "ai_core")]
+
+
+def get_async_db() -> Optional[Any]:
+    """Database handle for async code.
+
+    With motor installed this is a motor database on a per-process, per-event-loop
+    pooled client; otherwise it is the pooled pymongo database and the ``a*``
+    helpers below run its calls on worker threads.
+    """
+    global _ASYNC_CLIENT, _ASYNC_CLIENT_KEY
+    uri = _mongo_uri()
+    if not uri or AsyncIOMotorClient is None:
+        return get_db()
+    try:
+        loop = asyncio.get_running_loop()
+    except RuntimeError:
+        loop = None
+    key = (os.getpid(), uri, id(loop))
+    with _CLIENT_LOCK:
+        if _ASYNC_CLIENT is None or _ASYNC_CLIENT_KEY != key:
+            if _ASYNC_CLIENT is not None and _ASYNC_CLIENT_KEY is not None and _ASYNC_CLIENT_KEY[0] == key[0]:
+                try:
+                    _ASYNC_CLIENT.close()
+                except Exception:
+                    pass
+            _ASYNC_CLIENT = AsyncIOMotorClient(uri, **client_options())
+            _ASYNC_CLIENT_KEY = key
+        client = _ASYNC_CLIENT
+    return client[os.environ.get("MONGO_DB", "ai_core")]
+
+
+def _is_async_db(db: Any) -> bool:
+    return db is not None and type(db).__module__.startswith("motor")
 
 
 def _collection(db: Any, name: str = "shap_cache"):
@@ -78,7 +205,7 @@ def set_shap_cache(db: Any, model_hash: str, baseline_hash: str, shap_summary: d
         return
 
 
-def ensure_shap_cache_index(db: Any, ttl_seconds: int = 30 * 24 * 3600) -> None:
+def ensure_shap_cache_index(db: Any, ttl_seconds: int = SHAP_CACHE_TTL_SECONDS) -> None:
     """Ensure the `shap_cache` collection has an index on `created_at` with TTL.
 
     This is a no-op if db or collection doesn't expose `create_index` (e.g. a test fake).
@@ -94,6 +221,120 @@ def ensure_shap_cache_index(db: Any, ttl_seconds: int = 30 * 24 * 3600) -> None:
         return
 
 
+def ensure_analysis_cache_index(db: Any) -> None:
+    """Index `analyses` on (cache_key, created_at) for completed-analysis cache lookups.
+
+    No-op when db is None or the collection has no `create_index` (test fakes).
+    """
+    if db is None:
+        return
+    coll = _collection(db, "analyses")
+    try:
+        if hasattr(coll, "create_index"):
+            coll.create_index([("cache_key", 1), ("created_at", -1)])
+    except Exception:
+        return
+
+
+# Fields returned for a cache hit; the full document (profile, fairness report,
+# explanation) stays in Mongo.
+ANALYSIS_CACHE_PROJECTION = {"_id": 1, "summary": 1, "created_at": 1, "dataset_name": 1}
+
+
+def _cached_analysis_query(cache_key: str, max_age_seconds: int) -> tuple:
+    oldest = int(time.time()) - int(max_age_seconds)
+    return oldest, {"cache_key": cache_key, "created_at": {"$gte": oldest}}
+
+
+def find_cached_analysis(db: Any, cache_key: str, max_age_seconds: int) -> Optional[dict]:
+    """Newest analysis stored under `cache_key` within `max_age_seconds`, or None."""
+    if db is None or not cache_key:
+        return None
+    coll = _collection(db, "analyses")
+    oldest, query = _cached_analysis_query(cache_key, max_age_seconds)
+    try:
+        doc = coll.find_one(query, ANALYSIS_CACHE_PROJECTION, sort=[("created_at", -1)])
+    except Exception:
+        return None
+    if doc is None or int(doc.get("created_at") or 0) < oldest:
+        return None
+    return doc
+
+
+def ensure_analysis_listing_index(db: Any) -> None:
+    """Index `analyses` on (dataset_name, created_at, _id) for paginated report listings."""
+    if db is None:
+        return
+    coll = _collection(db, "analyses")
+    try:
+        if hasattr(coll, "create_index"):
+            coll.create_index([("dataset_name", 1), ("created_at", -1), ("_id", -1)])
+            coll.create_index([("created_at", -1), ("_id", -1)])
+    except Exception:
+        return
+
+
+def _analysis_id_value(analysis_id: str) -> Any:
+    """ObjectId for 24-hex ids (Mongo-generated), the raw string otherwise."""
+    try:
+        from bson import ObjectId  # type: ignore
+
+        if ObjectId.is_valid(analysis_id):
+            return ObjectId(analysis_id)
+    except Exception:
+        pass
+    return analysis_id
+
+
+def get_analysis(db: Any, analysis_id: str, projection: Optional[Dict[str, int]] = None) -> Optional[dict]:
+    """Load one stored analysis by id, returning only `projection` fields when given."""
+    if db is None:
+        return None
+    coll = _collection(db, "analyses")
+    return coll.find_one({"_id": _analysis_id_value(analysis_id)}, projection)
+
+
+def list_analyses(
+    db: Any,
+    dataset_name: Optional[str] = None,
+    limit: int = 50,
+    after: Optional[tuple] = None,
+    projection: Optional[Dict[str, int]] = None,
+) -> list:
+    """Newest-first page of analyses, optionally for one dataset.
+
+    Keyset pagination: ``after`` is the (created_at, _id) of the last item of
+    the previous page, so each page is one index range scan regardless of depth.
+    """
+    if db is None:
+        return []
+    query: Dict[str, Any] = {}
+    if dataset_name is not None:
+        query["dataset_name"] = dataset_name
+    if after is not None:
+        created_at, last_id = after
+        last_id = _analysis_id_value(str(last_id))
+        query["$or"] = [
+            {"created_at": {"$lt": created_at}},
+            {"created_at": created_at, "_id": {"$lt": last_id}},
+        ]
+    cursor = _collection(db, "analyses").find(query, projection).sort([("created_at", -1), ("_id", -1)]).limit(int(limit))
+    return list(cursor)
+
+
+def recent_resource_usage(db: Any, limit: int = 500) -> list:
+    """``resource_usage`` of the newest stored analyses, oldest first (for cost calibration)."""
+    if db is None:
+        return []
+    cursor = (
+        _collection(db, "analyses")
+        .find({"resource_usage": {"$exists": True}}, {"resource_usage": 1, "_id": 0})
+        .sort([("created_at", -1)])
+        .limit(int(limit))
+    )
+    return [d.get("resource_usage") for d in reversed(list(cursor))]
+
+
 def store_analysis(db: Any, dataset_name: str, analysis_doc: dict) -> str:
     """Persist analysis document and return an analysis_id.
 
@@ -128,3 +369,128 @@ def store_analysis(db: Any, dataset_name: str, analysis_doc: dict) -> str:
                 return hashlib.sha256(json.dumps(doc, sort_keys=True).encode()).hexdigest()
     except Exception:
         return hashlib.sha256(json.dumps(doc, sort_keys=True).encode()).hexdigest()
+
+
+# Write-behind persistence (see utils/write_behind.py); only used when a Mongo
+# URI is configured.
+_PERSISTER: Optional[Any] = None
+_PERSISTER_LOCK = threading.Lock()
+
+
+def write_behind_enabled() -> bool:
+    return os.environ.get("AI_CORE_WRITE_BEHIND", "1").lower() not in ("0", "false", "no")
+
+
+def get_persister() -> Optional[Any]:
+    """Process-wide write-behind persister, or None when disabled or no DB is configured.
+
+    - AI_CORE_WRITE_BEHIND (default 1)
+    - AI_CORE_PERSIST_SPOOL (default <tmpdir>/ai_core_persist_spool.jsonl)
+    - AI_CORE_PERSIST_BATCH_SIZE (default 200)
+    - AI_CORE_PERSIST_FLUSH_INTERVAL_MS (default 500)
+    - AI_CORE_PERSIST_MAX_QUEUE (default 10000; beyond it operations go straight to the spool)
+    """
+    global _PERSISTER
+    if not write_behind_enabled() or not _mongo_uri() or MongoClient is None:
+        return None
+    if _PERSISTER is None:
+        with _PERSISTER_LOCK:
+            if _PERSISTER is None:
+                try:
+                    from ai_core.utils.write_behind import WriteBehindPersister
+                except Exception:
+                    from utils.write_behind import WriteBehindPersister  # type: ignore
+                env = os.environ.get
+                _PERSISTER = WriteBehindPersister(
+                    get_db,
+                    spool_path=env("AI_CORE_PERSIST_SPOOL") or os.path.join(tempfile.gettempdir(), "ai_core_persist_spool.jsonl"),
+                    batch_size=int(env("AI_CORE_PERSIST_BATCH_SIZE", "200")),
+                    flush_interval=int(env("AI_CORE_PERSIST_FLUSH_INTERVAL_MS", "500")) / 1000.0,
+                    max_queue=int(env("AI_CORE_PERSIST_MAX_QUEUE", "10000")),
+                )
+    return _PERSISTER
+
+
+def close_persister() -> None:
+    """Flush and stop the write-behind persister (app shutdown)."""
+    global _PERSISTER
+    with _PERSISTER_LOCK:
+        persister, _PERSISTER = _PERSISTER, None
+    if persister is not None:
+        persister.close()
+
+
+def enqueue_analysis(dataset_name: str, analysis_doc: dict) -> Optional[str]:
+    """Queue an analysis for write-behind insert and return its pre-generated id.
+
+    Returns None when write-behind is not active; callers then use store_analysis.
+    """
+    persister = get_persister()
+    if persister is None:
+        return None
+    doc = dict(analysis_doc)
+    doc.setdefault("dataset_name", dataset_name)
+    doc.setdefault("created_at", int(time.time()))
+    return str(persister.submit_insert("analyses", doc))
+
+
+def enqueue_shap_cache(model_hash: str, baseline_hash: str, shap_summary: dict) -> bool:
+    """Queue a SHAP cache upsert; False when write-behind is not active."""
+    persister = get_persister()
+    if persister is None:
+        return False
+    key = {"model_hash": model_hash, "baseline_hash": baseline_hash}
+    persister.submit_upsert("shap_cache", key, {**key, "shap_summary": shap_summary, "created_at": int(time.time())})
+    return True
+
+
+async def aget_shap_cache(db: Any, model_hash: str, baseline_hash: str) -> Optional[dict]:
+    """Async ``get_shap_cache``: native on motor, otherwise on a worker thread."""
+    if _is_async_db(db):
+        try:
+            return await _collection(db, "shap_cache").find_one({"model_hash": model_hash, "baseline_hash": baseline_hash})
+        except Exception:
+            return None
+    return await asyncio.to_thread(get_shap_cache, db, model_hash, baseline_hash)
+
+
+async def aset_shap_cache(db: Any, model_hash: str, baseline_hash: str, shap_summary: dict) -> None:
+    """Async ``set_shap_cache``."""
+    if _is_async_db(db):
+        doc = {"model_hash": model_hash, "baseline_hash": baseline_hash, "shap_summary": shap_summary, "created_at": int(time.time())}
+        try:
+            await _collection(db, "shap_cache").replace_one({"model_hash": model_hash, "baseline_hash": baseline_hash}, doc, upsert=True)
+        except Exception:
+            pass
+        return
+    await asyncio.to_thread(set_shap_cache, db, model_hash, baseline_hash, shap_summary)
+
+
+async def astore_analysis(db: Any, dataset_name: str, analysis_doc: dict) -> str:
+    """Async ``store_analysis``."""
+    if _is_async_db(db):
+        doc = dict(analysis_doc)
+        doc.setdefault("dataset_name", dataset_name)
+        doc.setdefault("created_at", int(time.time()))
+        try:
+            res = await _collection(db, "analyses").insert_one(doc)
+            return str(res.inserted_id)
+        except Exception:
+            return hashlib.sha256(json.dumps(doc, sort_keys=True, default=str).encode()).hexdigest()
+    return await asyncio.to_thread(store_analysis, db, dataset_name, analysis_doc)
+
+
+async def afind_cached_analysis(db: Any, cache_key: str, max_age_seconds: int) -> Optional[dict]:
+    """Async ``find_cached_analysis``."""
+    if not _is_async_db(db):
+        return await asyncio.to_thread(find_cached_analysis, db, cache_key, max_age_seconds)
+    if not cache_key:
+        return None
+    oldest, query = _cached_analysis_query(cache_key, max_age_seconds)
+    try:
+        doc = await _collection(db, "analyses").find_one(query, ANALYSIS_CACHE_PROJECTION, sort=[("created_at", -1)])
+    except Exception:
+        return None
+    if doc is None or int(doc.get("created_at") or 0) < oldest:
+        return None
+    return doc
@@ -0,0 +1,98 @@
+"""Turn an analysis DataFrame into numeric model features.
+
+Numeric and boolean columns pass through unchanged. Non-numeric columns never
+reach the estimator as objects:
+
+- low-cardinality columns (at most ``max_categories`` distinct values) become
+  pandas categoricals and are fed to the model as their integer codes
+  (missing -> -1);
+- higher-cardinality columns are hashed (``pd.util.hash_array``) into
+  ``hash_buckets`` integer buckets (missing -> -1);
+- datetimes become seconds since the epoch and timedeltas whole seconds
+  (missing -> -1), whatever the column's storage unit.
+
+Column names and order are preserved so explanations stay keyed by the
+caller's feature names. The returned report records what happened to each
+encoded column.
+
+Configuration (environment):
+- AI_CORE_MAX_CATEGORIES (default 32)
+- AI_CORE_HASH_BUCKETS (default 1024)
+"""
+from __future__ import annotations
+
+import os
+from typing import Any, Dict, Optional, Tuple
+
+import numpy as np
+import pandas as pd
+
+
+def _smallest_int(max_value: int) -> type:
+    for dtype in (np.int8, np.int16, np.int32):
+        if max_value <= np.iinfo(dtype).max:
+            return dtype
+    return np.int64
+
+
+def _category_codes(s: pd.Series) -> Tuple[pd.Series, int]:
+    cat = s if isinstance(s.dtype, pd.CategoricalDtype) else s.astype("category")
+    cat = cat.cat.remove_unused_categories()
+    n = len(cat.cat.categories)
+    return cat.cat.codes.astype(_smallest_int(n)), n
+
+
+def _hashed(s: pd.Series, buckets: int) -> pd.Series:
+    values = s.to_numpy(dtype=object)
+    missing = pd.isna(values)
+    try:
+        hashed = pd.util.hash_array(values, categorize=True)
+    except TypeError:  # mixed or unhashable types: hash their string form
+        hashed = pd.util.hash_array(values.astype(str), categorize=True)
+    codes = (hashed % np.uint64(buckets)).astype(np.int64)
+    codes[missing] = -1
+    return pd.Series(codes.astype(_smallest_int(buckets)), index=s.index, name=s.name)
+
+
+def encode_features(
+    X: pd.DataFrame,
+    max_categories: Optional[int] = None,
+    hash_buckets: Optional[int] = None,
+) -> Tuple[pd.DataFrame, Dict[str, Dict[str, Any]]]:
+    """Return (numeric feature frame, per-column encoding report)."""
+    if max_categories is None:
+        max_categories = int(os.environ.get("AI_CORE_MAX_CATEGORIES", "32"))
+    if hash_buckets is None:
+        hash_buckets = int(os.environ.get("AI_CORE_HASH_BUCKETS", "1024"))
+
+    columns: Dict[Any, pd.Series] = {}
+    report: Dict[str, Dict[str, Any]] = {}
+    for col in X.columns:
+        s = X[col]
+        kind = s.dtype.kind
+        if kind in "biuf" and not isinstance(s.dtype, pd.CategoricalDtype):
+            columns[col] = s
+            continue
+        if kind == "M":
+            # as_unit: datetime64[ms]/[us] columns (e.g. from Arrow) are not nanoseconds
+            seconds = s.dt.as_unit("s").astype("int64")
+            columns[col] = seconds.where(s.notna(), -1)
+            report[str(col)] = {"encoding": "epoch_seconds"}
+            continue
+        if kind == "m":
+            seconds = s // pd.Timedelta("1s")
+            columns[col] = seconds.where(s.notna(), -1).astype(np.int64)
+            report[str(col)] = {"encoding": "seconds"}
+            continue
+        try:
+            n_distinct = s.nunique(dropna=True)
+        except TypeError:  # unhashable cells (lists, dicts): encode their string form
+            s = s.astype(str).where(s.notna())
+            n_distinct = s.nunique(dropna=True)
+        if n_distinct <= max_categories:
+            columns[col], n = _category_codes(s)
+            report[str(col)] = {"encoding": "category", "n_categories": int(n)}
+        else:
+            columns[col] = _hashed(s, hash_buckets)
+            report[str(col)] = {"encoding": "hashed", "n_distinct": int(n_distinct), "buckets": int(hash_buckets)}
+    return pd.DataFrame(columns, index=X.index, copy=False), report
@@ -0,0 +1,181 @@
+"""Vectorized column profiling.
+
+``profile_frame`` computes, for every column of a DataFrame, the statistics the
+rest of ai_core needs (missingness, distinct counts, moments, quantiles,
+robust (median/MAD) outlier ratios, histograms / category counts) without per-column
+``isna``/``nunique``/``astype`` passes:
+
+- numeric (and bool) columns are copied once into a float64 block and sorted
+  column-wise; counts, moments, distinct values, quantiles and histograms are
+  all read off that block;
+- non-numeric columns are reduced to 64-bit hashes (``pd.util.hash_array``) or
+  categorical codes and counted with ``np.unique``.
+
+The resulting ``DataProfile`` is consumed by data-quality checks, sensitive
+column detection, the stored analysis document and drift baselines.
+"""
+from __future__ import annotations
+
+import warnings
+from dataclasses import asdict, dataclass, field
+from typing import Any, Dict, Iterable, List, Optional
+
+import numpy as np
+import pandas as pd
+
+# Iglewicz & Hoaglin modified z-score, 0.6745 * (x - median) / MAD; values
+# above the cutoff are outliers. When MAD is 0 (over half the values equal),
+# 1.253314 * mean absolute deviation stands in for MAD / 0.6745.
+OUTLIER_MODIFIED_Z = 3.5
+HISTOGRAM_BINS = 20
+
+
+@dataclass
+class ColumnProfile:
+    name: str
+    kind: str  # "numeric" or "categorical"
+    n_rows: int
+    n_missing: int
+    n_distinct: int
+    mean: Optional[float] = None
+    std: Optional[float] = None
+    min: Optional[float] = None
+    max: Optional[float] = None
+    p50: Optional[float] = None
+    p95: Optional[float] = None
+    # fraction of non-missing values with modified |z| > OUTLIER_MODIFIED_Z; None when not computed
+    outlier_ratio: Optional[float] = None
+    histogram: Optional[List[int]] = None
+    bin_edges: Optional[List[float]] = None
+    categories: Optional[List[Any]] = None
+    counts: Optional[List[int]] = None
+
+    @property
+    def missing_ratio(self) -> float:
+        return float(self.n_missing) / float(self.n_rows) if self.n_rows else 0.0
+
+    def summary(self) -> Dict[str, Any]:
+        """Scalar statistics only (no histogram or category lists)."""
+        out = {k: v for k, v in asdict(self).items() if k not in ("histogram", "bin_edges", "categories", "counts")}
+        out["missing_ratio"] = self.missing_ratio
+        return out
+
+
+@dataclass
+class DataProfile:
+    n_rows: int
+    columns: Dict[str, ColumnProfile] = field(default_factory=dict)
+
+    def __getitem__(self, name: str) -> ColumnProfile:
+        return self.columns[name]
+
+    def __contains__(self, name: str) -> bool:
+        return name in self.columns
+
+    def summary(self) -> Dict[str, Any]:
+        return {"n_rows": self.n_rows, "columns": {k: c.summary() for k, c in self.columns.items()}}
+
+
+def _histogram_from_sorted(values: np.ndarray, bins: int):
+    """Equivalent of ``np.histogram(values, bins)`` for an already sorted array."""
+    lo, hi = float(values[0]), float(values[-1])
+    if lo == hi:
+        lo, hi = lo - 0.5, hi + 0.5
+    edges = np.linspace(lo, hi, bins + 1)
+    idx = np.searchsorted(values, edges, side="left")
+    idx[-1] = values.size  # last bin is closed on the right
+    return np.diff(idx), edges
+
+
+def _profile_numeric(df: pd.DataFrame, names: List[str], out: Dict[str, ColumnProfile], bins: int) -> None:
+    n = len(df)
+    block = df[names].to_numpy(dtype=np.float64, na_value=np.nan)
+    finite_mask = ~np.isnan(block)
+    count = finite_mask.sum(axis=0)
+    with np.errstate(invalid="ignore", divide="ignore"):
+        total = np.where(finite_mask, block, 0.0).sum(axis=0)
+        mean = total / count
+        centered = np.where(finite_mask, block - mean, 0.0)
+        std = np.sqrt((centered * centered).sum(axis=0) / count)
+
+    block.sort(axis=0)  # NaNs sort last, so rows [0, count) are the observed values
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        warnings.simplefilter("ignore", RuntimeWarning)  # all-NaN columns
+        deviation = np.abs(block - np.nanmedian(block, axis=0))
+        mad = np.nanmedian(deviation, axis=0)
+        scale = np.where(mad > 0, mad / 0.6745, 1.253314 * np.nanmean(deviation, axis=0))
+        outliers = (deviation > OUTLIER_MODIFIED_Z * scale).sum(axis=0)
+    if n > 1:
+        changes = (block[1:] != block[:-1]) & ~np.isnan(block[1:])
+        distinct = changes.sum(axis=0) + (count > 0)
+    else:
+        distinct = (count > 0).astype(int)
+
+    for j, name in enumerate(names):
+        c = int(count[j])
+        prof = ColumnProfile(name=name, kind="numeric", n_rows=n, n_missing=n - c, n_distinct=int(distinct[j]))
+        if c:
+            col = block[:c, j]
+            prof.mean = float(mean[j])
+            prof.std = float(std[j])
+            prof.min = float(col[0])
+            prof.max = float(col[-1])
+            prof.p50, prof.p95 = (float(v) for v in np.percentile(col, [50, 95]))
+            hist, edges = _histogram_from_sorted(col, bins)
+            prof.histogram = hist.tolist()
+            prof.bin_edges = edges.tolist()
+            if c > 3 and scale[j] > 0:
+                prof.outlier_ratio = float(outliers[j]) / float(c)
+        out[name] = prof
+
+
+def _profile_categorical(series: pd.Series, name: str) -> ColumnProfile:
+    n = len(series)
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        codes = series.cat.codes.to_numpy()
+        present = codes >= 0
+        uniq, counts = np.unique(codes[present], return_counts=True)
+        categories = series.cat.categories.take(uniq).tolist()
+    else:
+        values = series.to_numpy(dtype=object)
+        present = ~pd.isna(values)
+        kept = values[present]
+        hashed = pd.util.hash_array(kept, categorize=True)
+        _, first, counts = np.unique(hashed, return_index=True, return_counts=True)
+        categories = kept[first].tolist()
+        try:  # report categories in sorted order when they are comparable
+            order = sorted(range(len(categories)), key=categories.__getitem__)
+            categories = [categories[i] for i in order]
+            counts = counts[order]
+        except TypeError:
+            pass
+    return ColumnProfile(
+        name=name,
+        kind="categorical",
+        n_rows=n,
+        n_missing=int(n - present.sum()),
+        n_distinct=int(len(counts)),
+        categories=categories,
+        counts=counts.astype(int).tolist(),
+    )
+
+
+def profile_frame(df: pd.DataFrame, bins: int = HISTOGRAM_BINS, categorical: Iterable[str] = ()) -> DataProfile:
+    """Profile every column of ``df``; column order is preserved.
+
+    Columns named in ``categorical`` get category counts even when numeric
+    (e.g. protected attributes encoded as 0/1).
+    """
+    forced = set(categorical)
+    numeric: List[str] = []
+    other: List[str] = []
+    for name in df.columns:
+        kind = df[name].dtype.kind
+        (numeric if kind in "biuf" and name not in forced else other).append(name)
+
+    found: Dict[str, ColumnProfile] = {}
+    if numeric:
+        _profile_numeric(df, numeric, found, bins)
+    for name in other:
+        found[name] = _profile_categorical(df[name], name)
+    return DataProfile(n_rows=len(df), columns={name: found[name] for name in df.columns})
@@ -0,0 +1,76 @@
+"""Stratified row sampling and vectorized bootstrap helpers."""
+from __future__ import annotations
+
+from typing import Optional, Sequence, Tuple
+
+import numpy as np
+
+
+def strata_codes(columns: Sequence, n_rows: int) -> np.ndarray:
+    """Combine any number of label-like columns into one integer stratum code per row.
+
+    ``None`` entries are ignored; with no usable column every row is stratum 0.
+    """
+    codes = np.zeros(n_rows, dtype=np.int64)
+    for col in columns:
+        if col is None:
+            continue
+        _, inv = np.unique(np.asarray(col).astype(str), return_inverse=True)
+        codes = codes * (int(inv.max()) + 1 if inv.size else 1) + inv
+    _, codes = np.unique(codes, return_inverse=True)
+    return codes
+
+
+def stratified_sample_indices(strata: np.ndarray, n: int, seed: int = 0) -> np.ndarray:
+    """Pick ``n`` row indices with proportional allocation across strata.
+
+    Every non-empty stratum keeps at least one row so small groups (e.g. a
+    minority sensitive group) are always represented. Returns sorted indices.
+    """
+    strata = np.asarray(strata)
+    total = strata.size
+    if n >= total:
+        return np.arange(total)
+    rng = np.random.default_rng(seed)
+    labels, counts = np.unique(strata, return_counts=True)
+    alloc = np.maximum(1, np.floor(counts * (n / float(total))).astype(int))
+    alloc = np.minimum(alloc, counts)
+    # hand out rows lost to flooring to the largest strata first
+    short = n - int(alloc.sum())
+    for i in np.argsort(-counts):
+        if short <= 0:
+            break
+        extra = min(short, int(counts[i] - alloc[i]))
+        alloc[i] += extra
+        short -= extra
+    picks = [rng.choice(np.flatnonzero(strata == lab), size=int(k), replace=False) for lab, k in zip(labels, alloc)]
+    return np.sort(np.concatenate(picks))
+
+
+def bootstrap_mean_ci(
+    values: np.ndarray,
+    n_boot: int = 200,
+    alpha: float = 0.05,
+    seed: int = 0,
+    weights: Optional[np.ndarray] = None,
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Percentile bootstrap interval for column means of ``values`` (n x d).
+
+    Resampling is expressed as multinomial count weights, so all replicates
+    are computed with a single (n_boot x n) @ (n x d) product instead of
+    materialising resampled arrays.
+    """
+    values = np.asarray(values, dtype=float)
+    if values.ndim == 1:
+        values = values[:, None]
+    n = values.shape[0]
+    if n == 0:
+        nan = np.full(values.shape[1], np.nan)
+        return nan, nan
+    rng = np.random.default_rng(seed)
+    p = np.full(n, 1.0 / n) if weights is None else np.asarray(weights, dtype=float) / float(np.sum(weights))
+    counts = rng.multinomial(n, p, size=n_boot)
+    means = (counts @ values) / float(n)
+    lo = np.quantile(means, alpha / 2.0, axis=0)
+    hi = np.quantile(means, 1.0 - alpha / 2.0, axis=0)
+    return lo, hi
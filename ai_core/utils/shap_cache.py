@@ -0,0 +1,169 @@
+"""Two-tier SHAP summary cache.
+
+L1 is a process-local, size-bounded LRU with a TTL matching the Mongo TTL
+index created by ``persistence.ensure_shap_cache_index``. L2 is the Mongo
+``shap_cache`` collection, reached through the persistence module at call time
+so test fakes injected into ``sys.modules`` are honored.
+
+- Recent L2 misses are cached negatively for a short TTL so repeated cold
+  lookups don't round-trip to Mongo.
+- Writes land in L1 immediately and are written behind to L2 on a daemon
+  thread; ``flush()`` waits for pending writes (tests, shutdown).
+
+Configuration (environment):
+- AI_CORE_SHAP_L1_ENTRIES (default 1024)
+- AI_CORE_SHAP_L1_TTL_SECONDS (default 30 days, same as the L2 TTL index)
+- AI_CORE_SHAP_NEGATIVE_TTL_SECONDS (default 60, 0 disables negative caching)
+- AI_CORE_SHAP_WRITE_BEHIND (default 1; 0 writes L2 synchronously)
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import queue
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from .performance import LRUCache
+
+# Mirrors persistence.SHAP_CACHE_TTL_SECONDS (kept local so a faked
+# persistence module in tests doesn't need to define it).
+SHAP_CACHE_TTL_SECONDS = 30 * 24 * 3600
+
+logger = logging.getLogger("ai_core.shap_cache")
+
+_NEGATIVE = object()
+
+
+def _persistence():
+    try:
+        return importlib.import_module("ai_core.utils.persistence")
+    except Exception:
+        try:
+            return importlib.import_module("utils.persistence")
+        except Exception:
+            return None
+
+
+class TieredShapCache:
+    """L1 LRU in front of the persistence-backed L2 store."""
+
+    def __init__(
+        self,
+        max_entries: Optional[int] = None,
+        ttl_seconds: Optional[float] = None,
+        negative_ttl_seconds: Optional[float] = None,
+        write_behind: Optional[bool] = None,
+    ):
+        if max_entries is None:
+            max_entries = int(os.environ.get("AI_CORE_SHAP_L1_ENTRIES", "1024"))
+        if ttl_seconds is None:
+            ttl_seconds = float(os.environ.get("AI_CORE_SHAP_L1_TTL_SECONDS", SHAP_CACHE_TTL_SECONDS))
+        if negative_ttl_seconds is None:
+            negative_ttl_seconds = float(os.environ.get("AI_CORE_SHAP_NEGATIVE_TTL_SECONDS", "60"))
+        if write_behind is None:
+            write_behind = os.environ.get("AI_CORE_SHAP_WRITE_BEHIND", "1") != "0"
+        self.negative_ttl_seconds = negative_ttl_seconds
+        self.write_behind = write_behind
+        self._l1 = LRUCache(max_entries=max_entries, ttl_seconds=ttl_seconds)
+        self._queue: "queue.Queue[Tuple[str, str, Dict[str, Any]]]" = queue.Queue()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._worker_lock = threading.Lock()
+
+    def get(self, model_hash: str, baseline_hash: str) -> Tuple[Optional[Dict[str, Any]], str]:
+        """Return (summary, tier) where tier is "l1", "l2", "negative" or "miss"."""
+        key = (model_hash, baseline_hash)
+        hit = self._l1.get(key)
+        if hit is _NEGATIVE:
+            return None, "negative"
+        if hit is not None:
+            return hit, "l1"
+
+        doc = None
+        p = _persistence()
+        if p is not None and hasattr(p, "get_db") and hasattr(p, "get_shap_cache"):
+            try:
+                doc = p.get_shap_cache(p.get_db(), model_hash, baseline_hash)
+            except Exception:
+                doc = None
+        if doc and "shap_summary" in doc:
+            self._l1.set(key, doc["shap_summary"])
+            return doc["shap_summary"], "l2"
+        if self.negative_ttl_seconds > 0:
+            self._l1.set(key, _NEGATIVE, ttl_seconds=self.negative_ttl_seconds)
+        return None, "miss"
+
+    def set(self, model_hash: str, baseline_hash: str, summary: Dict[str, Any]) -> None:
+        """Store in L1 now and in L2 (written behind unless disabled)."""
+        self._l1.set((model_hash, baseline_hash), summary)
+        if self.write_behind:
+            self._ensure_worker()
+            self._queue.put((model_hash, baseline_hash, summary))
+        else:
+            self._write_l2(model_hash, baseline_hash, summary)
+
+    def flush(self, timeout: Optional[float] = 5.0) -> bool:
+        """Wait until pending L2 writes are done; returns False on timeout."""
+        if not self.write_behind:
+            return True
+        done = threading.Event()
+
+        def _wait():
+            self._queue.join()
+            done.set()
+
+        threading.Thread(target=_wait, daemon=True).start()
+        return done.wait(timeout)
+
+    def clear(self) -> None:
+        self._l1.clear()
+
+    def _write_l2(self, model_hash: str, baseline_hash: str, summary: Dict[str, Any]) -> None:
+        p = _persistence()
+        if p is None or not (hasattr(p, "set_shap_cache") and hasattr(p, "get_db")):
+            return
+        try:
+            # batched bulk upsert through the write-behind persister when active
+            if hasattr(p, "enqueue_shap_cache") and p.enqueue_shap_cache(model_hash, baseline_hash, summary):
+                return
+            p.set_shap_cache(p.get_db(), model_hash, baseline_hash, summary)
+        except Exception:
+            logger.exception("shap_cache L2 write failed")
+
+    def _ensure_worker(self) -> None:
+        # Restart the writer after fork: threads don't survive into children.
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._worker_lock:
+            if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+                return
+            if self._worker_pid != pid:
+                self._queue = queue.Queue()
+            self._worker = threading.Thread(target=self._run, name="shap-cache-writer", daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+
+    def _run(self) -> None:
+        q = self._queue
+        while True:
+            model_hash, baseline_hash, summary = q.get()
+            try:
+                self._write_l2(model_hash, baseline_hash, summary)
+            finally:
+                q.task_done()
+
+
+_CACHE: Optional[TieredShapCache] = None
+_CACHE_LOCK = threading.Lock()
+
+
+def get_tiered_shap_cache() -> TieredShapCache:
+    global _CACHE
+    if _CACHE is None:
+        with _CACHE_LOCK:
+            if _CACHE is None:
+                _CACHE = TieredShapCache()
+    return _CACHE
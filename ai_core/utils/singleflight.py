@@ -0,0 +1,117 @@
+"""In-flight request coalescing ("singleflight").
+
+Concurrent calls that share a key run the work once: the first caller (the
+leader) executes it and every caller that arrives while it is still running
+waits on the same ``concurrent.futures.Future`` and receives the same result
+or exception. Nothing is cached once the leader finishes; completed results
+are the business of the analysis cache.
+
+Futures are thread-safe, so sync callers (``do``) and asyncio callers
+(``ado``) can coalesce on the same key. A follower that is cancelled (its
+client went away) only stops waiting; it never cancels the shared call. A
+leader that is cancelled releases the key and its followers retry, one of
+them becoming the new leader, rather than failing with its cancellation.
+"""
+from __future__ import annotations
+
+import asyncio
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Tuple
+
+
+class _LeaderCancelled(Exception):
+    """Set on the shared future when the leader was cancelled; followers retry."""
+
+
+class SingleFlight:
+    """Deduplicate concurrent calls by key.
+
+    ``inflight`` (a Gauge-like object with ``inc``/``dec``) tracks keys being
+    computed; ``coalesced`` (Counter-like ``inc``) counts callers that joined
+    an existing call instead of doing the work.
+    """
+
+    def __init__(self, inflight: Any = None, coalesced: Any = None):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._inflight = inflight
+        self._coalesced = coalesced
+
+    def _join(self, key: str) -> Tuple[Future, bool]:
+        with self._lock:
+            fut = self._calls.get(key)
+            if fut is not None:
+                _metric(self._coalesced, "inc")
+                return fut, False
+            fut = Future()
+            # running futures cannot be cancelled by a waiter
+            fut.set_running_or_notify_cancel()
+            self._calls[key] = fut
+        _metric(self._inflight, "inc")
+        return fut, True
+
+    def _settle(self, key: str, fut: Future, result: Any = None, exc: BaseException = None) -> None:
+        with self._lock:
+            self._calls.pop(key, None)
+        _metric(self._inflight, "dec")
+        if exc is not None:
+            fut.set_exception(exc)
+        else:
+            fut.set_result(result)
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._calls)
+
+    def do(self, key: str, fn: Callable[..., Any], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """Run ``fn`` once per in-flight ``key``; returns (result, shared)."""
+        while True:
+            fut, leader = self._join(key)
+            if leader:
+                break
+            try:
+                return fut.result(), True
+            except _LeaderCancelled:
+                continue
+        try:
+            result = fn(*args, **kwargs)
+        except BaseException as exc:
+            self._settle(key, fut, exc=_shared_exception(exc))
+            raise
+        self._settle(key, fut, result=result)
+        return result, False
+
+    async def ado(self, key: str, fn: Callable[..., Awaitable[Any]], *args: Any, **kwargs: Any) -> Tuple[Any, bool]:
+        """Async ``do``: ``fn`` is a coroutine function awaited by the leader only."""
+        while True:
+            fut, leader = self._join(key)
+            if leader:
+                break
+            try:
+                # shield: cancelling this follower must not touch the shared future
+                return await asyncio.shield(asyncio.wrap_future(fut)), True
+            except _LeaderCancelled:
+                continue
+        try:
+            result = await fn(*args, **kwargs)
+        except BaseException as exc:
+            self._settle(key, fut, exc=_shared_exception(exc))
+            raise
+        self._settle(key, fut, result=result)
+        return result, False
+
+
+def _shared_exception(exc: BaseException) -> BaseException:
+    """What followers see: the leader's cancellation is its own, not theirs."""
+    if isinstance(exc, (asyncio.CancelledError, KeyboardInterrupt, SystemExit)):
+        return _LeaderCancelled()
+    return exc
+
+
+def _metric(metric: Any, method: str) -> None:
+    try:
+        if metric is not None:
+            getattr(metric, method)()
+    except Exception:
+        pass
@@ -0,0 +1,81 @@
+"""Per-request stage spans for the analyze pipeline.
+
+``trace()`` opens a request-scoped span list in a context variable; ``stage()``
+times a block, appends it to the active list (if any) and observes the
+``ethixai_aicore_analyze_stage_duration_seconds{stage}`` histogram. The list is
+shared by reference, so stages recorded inside ``run_in_threadpool`` (which
+copies the context) land in the request's trace. ``server_timing()`` renders
+the spans as a ``Server-Timing`` header value.
+"""
+from __future__ import annotations
+
+import contextvars
+import importlib
+import time
+from contextlib import contextmanager
+from typing import Dict, Iterator, List, Optional, Tuple
+
+_SPANS: contextvars.ContextVar[Optional[List[Tuple[str, float]]]] = contextvars.ContextVar("ai_core_spans", default=None)
+
+
+def _metrics():
+    try:
+        return importlib.import_module("ai_core.utils.metrics")
+    except Exception:
+        try:
+            return importlib.import_module("utils.metrics")
+        except Exception:
+            return None
+
+
+@contextmanager
+def trace() -> Iterator[List[Tuple[str, float]]]:
+    """Collect stage spans for the enclosed request; yields the span list."""
+    spans: List[Tuple[str, float]] = []
+    token = _SPANS.set(spans)
+    try:
+        yield spans
+    finally:
+        _SPANS.reset(token)
+
+
+def record_stage(name: str, seconds: float) -> None:
+    spans = _SPANS.get()
+    if spans is not None:
+        spans.append((name, seconds))
+    m = _metrics()
+    if m is not None and hasattr(m, "record_analyze_stage"):
+        try:
+            m.record_analyze_stage(name, seconds)
+        except Exception:
+            pass
+
+
+@contextmanager
+def stage(name: str) -> Iterator[None]:
+    """Time the enclosed block as stage ``name`` (recorded even if it raises)."""
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        record_stage(name, time.perf_counter() - start)
+
+
+def current_spans() -> List[Tuple[str, float]]:
+    return list(_SPANS.get() or [])
+
+
+def stage_totals(spans: List[Tuple[str, float]]) -> Dict[str, float]:
+    """Sum repeated stages, keeping first-seen order."""
+    totals: Dict[str, float] = {}
+    for name, seconds in spans:
+        totals[name] = totals.get(name, 0.0) + seconds
+    return totals
+
+
+def server_timing(spans: List[Tuple[str, float]], total: Optional[float] = None) -> str:
+    """Format spans as ``Server-Timing`` (durations in milliseconds)."""
+    parts = [f"{name};dur={seconds * 1000.0:.1f}" for name, seconds in stage_totals(spans).items()]
+    if total is not None:
+        parts.append(f"total;dur={total * 1000.0:.1f}")
+    return ", ".join(parts)
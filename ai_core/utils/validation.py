@@ -3,6 +3,19 @@ from typing import Dict, Any
 MAX_ROWS = 100000  # safety cap to avoid huge payload processing
 
 
+# 400 details shared by every analyze ingestion path (pydantic, fast JSON, binary)
+def invalid_payload_detail(msg: str) -> str:
+    return f"Invalid data payload: {msg}"
+
+
+def mismatched_lengths_detail(col_lengths: Dict[str, int]) -> str:
+    return f"Mismatched column lengths: {col_lengths}"
+
+
+def max_rows_detail(max_rows: int, n_rows: int) -> str:
+    return f"Dataset exceeds maximum rows ({max_rows}): {n_rows} rows provided"
+
+
 def validate_dataset_mapping(data: Dict[str, Any]):
     """Validate the incoming data mapping (column -> list-like).
 
@@ -37,44 +50,25 @@ def validate_dataset_mapping(data: Dict[str, Any]):
     return True, "ok"
 
 
-def evaluate_data_quality(df, *, max_missing_ratio=0.2, max_constant_ratio=0.5):
+def evaluate_data_quality(df, *, max_missing_ratio=0.2, max_constant_ratio=0.5, profile=None):
     """Run lightweight data quality checks on a pandas DataFrame.
 
-    Returns a dict with keys: missing, constant, outliers.
+    Returns a dict with keys: missing, constant, outliers. Pass a precomputed
+    ``profiling.DataProfile`` to avoid scanning the frame again.
     """
-    import numpy as np
+    if profile is None:
+        from .profiling import profile_frame
+
+        profile = profile_frame(df)
 
     issues = {"missing": {}, "constant": [], "outliers": {}}
-    n = len(df)
-    for col in df.columns:
-        series = df[col]
-        # missing
-        miss = int(series.isna().sum())
-        if n > 0 and (miss / n) > max_missing_ratio:
-            issues["missing"][col] = float(miss) / float(n)
-        # constant
-        try:
-            nunique = series.nunique(dropna=True)
-            if nunique == 1:
-                issues["constant"].append(col)
-            elif nunique / max(1, n) > max_constant_ratio:
-                # many unique values; not a constant
-                pass
-        except Exception:
-            pass
-        # simple outlier detection via z-score
-        try:
-            arr = series.dropna().astype(float).to_numpy()
-            if arr.size > 3:
-                m = arr.mean()
-                s = arr.std()
-                if s > 0:
-                    z = np.abs((arr - m) / s)
-                    outlier_ratio = float((z > 5).sum()) / float(max(1, arr.size))
-                    if outlier_ratio > 0.01:
-                        issues["outliers"][col] = outlier_ratio
-        except Exception:
-            # non-numeric columns skipped for z-score
-            pass
+    for col, prof in profile.columns.items():
+        if prof.n_rows > 0 and prof.missing_ratio > max_missing_ratio:
+            issues["missing"][col] = prof.missing_ratio
+        if prof.n_distinct == 1:
+            issues["constant"].append(col)
+        # robust outlier detection: modified z-score (median/MAD) > 3.5 on more than 1% of values
+        if prof.outlier_ratio is not None and prof.outlier_ratio > 0.01:
+            issues["outliers"][col] = prof.outlier_ratio
 
     return issues
@@ -0,0 +1,80 @@
+"""Startup warm-up: push a tiny synthetic analysis through the hot paths.
+
+The first real request otherwise pays for importing shap/sklearn, estimator
+initialisation, first-call allocations and the first Mongo round trip. The
+warm-up runs profiling, ``train_quick_model``, ``explain_model`` and the
+fairness metrics on a small ``generate_bias_demo`` frame with the model and
+SHAP caches bypassed, so the synthetic model never lands in the caches (or the
+Mongo write-behind) and the cache metrics only count real traffic. Nothing is
+stored in the analyses collection.
+
+Configuration (environment):
+- AI_CORE_WARMUP (default 1; 0 skips the warm-up)
+- AI_CORE_WARMUP_ROWS (default 200)
+"""
+from __future__ import annotations
+
+import importlib
+import logging
+import os
+import time
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger("ai_core.warmup")
+
+_STATE: Dict[str, Any] = {"status": "pending", "stages": {}, "error": None}
+
+
+def warmup_enabled() -> bool:
+    return os.environ.get("AI_CORE_WARMUP", "1").lower() not in ("0", "false", "no")
+
+
+def warmup_state() -> Dict[str, Any]:
+    """Status ("pending", "running", "done", "skipped", "failed"), stage timings, error."""
+    return {"status": _STATE["status"], "stages": dict(_STATE["stages"]), "error": _STATE["error"]}
+
+
+def _util(name: str):
+    try:
+        return importlib.import_module(f"ai_core.utils.{name}")
+    except Exception:
+        return importlib.import_module(f"utils.{name}")
+
+
+def run_warmup(n_rows: Optional[int] = None) -> Dict[str, Any]:
+    """Run the warm-up once; failures are logged and reported, never raised."""
+    if not warmup_enabled():
+        _STATE["status"] = "skipped"
+        return warmup_state()
+    n_rows = n_rows or int(os.environ.get("AI_CORE_WARMUP_ROWS", "200"))
+    _STATE.update(status="running", stages={}, error=None)
+    stages = _STATE["stages"]
+
+    def _stage(name, fn):
+        start = time.perf_counter()
+        out = fn()
+        stages[name] = round(time.perf_counter() - start, 4)
+        return out
+
+    try:
+        X, y = _stage("data", lambda: _util("dataset").generate_bias_demo(n_rows))
+        _stage("profile", lambda: _util("profiling").profile_frame(X))
+        mh = _util("model_helper")
+        with mh.caches_bypassed():
+            model = _stage("train", lambda: mh.train_quick_model(X, y))
+            _stage("explain", lambda: mh.explain_model(model, X))
+        y_pred = _stage("predict", lambda: model.predict(X))
+        fairness = _util("fairness")
+
+        def _fairness():
+            fairness.compute_metrics(y, y_pred, X["protected"])
+            fairness.evaluate_groups(y, y_pred, {"protected": X["protected"]})
+            fairness.metric_intervals(y, y_pred, X["protected"], n_boot=100)
+
+        _stage("fairness", _fairness)
+        _STATE["status"] = "done"
+        logger.info({"msg": "warmup_complete", "stages": stages})
+    except Exception as exc:
+        _STATE.update(status="failed", error=f"{type(exc).__name__}: {exc}")
+        logger.exception("warm-up failed (continuing)")
+    return warmup_state()
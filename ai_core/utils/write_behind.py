@@ -0,0 +1,381 @@
+"""Write-behind persistence with a local durable spool.
+
+Request threads hand documents to a ``WriteBehindPersister`` and return
+immediately; a background thread batches them into ``insert_many`` (new
+analyses) and ``bulk_write`` of ``ReplaceOne(upsert=True)`` (SHAP cache
+entries). When a batch cannot be written (Mongo unreachable, timeouts) or the
+in-memory queue is full, the operations are appended to a JSON-lines spool
+file and replayed once writes succeed again. Analysis ids are generated up
+front, so a replayed insert that already landed is recognised as a duplicate
+key and skipped rather than stored twice.
+
+Several processes (uvicorn workers) may share one spool: appends and the
+spool -> replay hand-over hold an ``fcntl`` lock on ``<spool>.lock``, and only
+one process replays at a time (``<spool>.replay.lock``). Operations Mongo
+rejects for reasons other than connectivity (e.g. a document over 16 MB) are
+isolated and moved to ``<spool>.dead`` instead of blocking everything spooled
+behind them.
+
+Exported metrics (when prometheus_client is installed):
+- ai_core_persist_flush_seconds: time per batch written to Mongo
+- ai_core_persist_queue_depth: operations waiting in memory
+- ai_core_persist_spool_bytes: size of the local spool file
+- ai_core_persist_spooled_total: operations diverted to the spool
+- ai_core_persist_dead_lettered_total: operations Mongo rejected, kept in the dead-letter file
+"""
+from __future__ import annotations
+
+import json
+import logging
+import os
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+from typing import Any, Callable, Deque, Dict, Iterable, Iterator, List, Optional
+
+try:
+    import fcntl  # type: ignore
+except Exception:  # pragma: no cover - not available on Windows
+    fcntl = None
+
+logger = logging.getLogger("ai_core.write_behind")
+
+try:
+    from prometheus_client import Counter, Gauge, Histogram  # type: ignore
+
+    PERSIST_FLUSH_SECONDS = Histogram("ai_core_persist_flush_seconds", "Write-behind batch flush duration seconds")
+    PERSIST_QUEUE_DEPTH = Gauge("ai_core_persist_queue_depth", "Persistence operations waiting in memory")
+    PERSIST_SPOOL_BYTES = Gauge("ai_core_persist_spool_bytes", "Size of the local persistence spool file in bytes")
+    PERSIST_SPOOLED = Counter("ai_core_persist_spooled_total", "Persistence operations written to the local spool")
+    PERSIST_DEAD_LETTERED = Counter("ai_core_persist_dead_lettered_total", "Persistence operations rejected by Mongo and dead-lettered")
+except Exception:  # pragma: no cover
+    PERSIST_FLUSH_SECONDS = PERSIST_QUEUE_DEPTH = PERSIST_SPOOL_BYTES = PERSIST_SPOOLED = PERSIST_DEAD_LETTERED = None
+
+DUPLICATE_KEY = 11000
+
+
+def new_object_id() -> Any:
+    """A fresh ObjectId (or a uuid hex string when bson is unavailable)."""
+    try:
+        from bson import ObjectId  # type: ignore
+
+        return ObjectId()
+    except Exception:
+        return uuid.uuid4().hex
+
+
+def _json_default(obj: Any) -> Any:
+    try:
+        from bson import json_util  # type: ignore
+
+        return json_util.default(obj)
+    except Exception:
+        pass
+    if hasattr(obj, "item"):  # numpy scalars
+        return obj.item()
+    if hasattr(obj, "tolist"):
+        return obj.tolist()
+    return str(obj)
+
+
+def _json_object_hook(obj: Dict[str, Any]) -> Any:
+    try:
+        from bson import json_util  # type: ignore
+
+        return json_util.object_hook(obj)
+    except Exception:
+        return obj
+
+
+def _is_connectivity_error(exc: BaseException) -> bool:
+    """True when ``exc`` means Mongo could not be reached (retry later) rather than rejected the write."""
+    if isinstance(exc, (ConnectionError, TimeoutError)):
+        return True
+    try:
+        from pymongo.errors import ConnectionFailure  # type: ignore
+
+        return isinstance(exc, ConnectionFailure)
+    except Exception:
+        return False
+
+
+@contextmanager
+def _file_lock(path: str, blocking: bool = True) -> Iterator[bool]:
+    """Exclusive inter-process lock on ``path``; yields False if not blocking and already held."""
+    if fcntl is None:
+        yield True
+        return
+    with open(path, "a") as fh:
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | (0 if blocking else fcntl.LOCK_NB))
+        except BlockingIOError:
+            yield False
+            return
+        try:
+            yield True
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
+
+
+def _observe(metric: Any, method: str, *args: Any) -> None:
+    try:
+        if metric is not None:
+            getattr(metric, method)(*args)
+    except Exception:
+        pass
+
+
+class WriteBehindPersister:
+    """Batch analysis inserts and SHAP cache upserts off the request path.
+
+    ``get_db`` is called on every flush so the pooled client (and its
+    reconnect behaviour) is reused.
+    """
+
+    def __init__(
+        self,
+        get_db: Callable[[], Any],
+        spool_path: str,
+        batch_size: int = 200,
+        flush_interval: float = 0.5,
+        max_queue: int = 10000,
+        replay_interval: float = 30.0,
+    ):
+        self._get_db = get_db
+        self.spool_path = spool_path
+        self.batch_size = max(1, int(batch_size))
+        self.flush_interval = float(flush_interval)
+        self.max_queue = max(1, int(max_queue))
+        self.replay_interval = float(replay_interval)
+        self._ops: Deque[Dict[str, Any]] = deque()
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._spool_lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._worker: Optional[threading.Thread] = None
+        self._worker_pid: Optional[int] = None
+        self._last_replay = 0.0
+
+    # -- request path -----------------------------------------------------
+
+    def submit_insert(self, collection: str, doc: Dict[str, Any]) -> Any:
+        """Queue an insert; assigns ``_id`` up front and returns it."""
+        doc = dict(doc)
+        doc.setdefault("_id", new_object_id())
+        self._submit({"op": "insert", "coll": collection, "doc": doc})
+        return doc["_id"]
+
+    def submit_upsert(self, collection: str, query: Dict[str, Any], doc: Dict[str, Any]) -> None:
+        """Queue a whole-document upsert (``replace_one(query, doc, upsert=True)``)."""
+        self._submit({"op": "upsert", "coll": collection, "filter": dict(query), "doc": dict(doc)})
+
+    def _submit(self, op: Dict[str, Any]) -> None:
+        self._ensure_worker()
+        with self._lock:
+            full = len(self._ops) >= self.max_queue
+            if not full:
+                self._ops.append(op)
+                depth = len(self._ops)
+        if full:
+            # Durable rather than blocking the request when the writer falls behind.
+            self._spool([op])
+            return
+        _observe(PERSIST_QUEUE_DEPTH, "set", depth)
+        if depth >= self.batch_size:
+            self._wake.set()
+
+    def pending(self) -> int:
+        with self._lock:
+            return len(self._ops)
+
+    # -- background writer ------------------------------------------------
+
+    def _ensure_worker(self) -> None:
+        # Threads don't survive fork; a child starts its own writer and queue.
+        pid = os.getpid()
+        if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+            return
+        with self._lock:
+            if self._worker is not None and self._worker_pid == pid and self._worker.is_alive():
+                return
+            if self._worker_pid is not None and self._worker_pid != pid:
+                self._ops = deque()
+            self._stop.clear()
+            self._worker = threading.Thread(target=self._run, name="persist-writer", daemon=True)
+            self._worker_pid = pid
+            self._worker.start()
+
+    def _run(self) -> None:
+        while not self._stop.is_set():
+            self._wake.wait(self.flush_interval)
+            self._wake.clear()
+            try:
+                self.flush(replay=time.monotonic() - self._last_replay >= self.replay_interval)
+            except Exception:
+                logger.exception("write-behind flush failed")
+
+    def flush(self, replay: bool = True) -> bool:
+        """Write everything queued now (and replay the spool); False if anything was spooled."""
+        with self._flush_lock:
+            ok = True
+            while True:
+                with self._lock:
+                    batch = [self._ops.popleft() for _ in range(min(self.batch_size, len(self._ops)))]
+                    depth = len(self._ops)
+                _observe(PERSIST_QUEUE_DEPTH, "set", depth)
+                if not batch:
+                    break
+                # after one failed batch, spool the rest instead of waiting out more timeouts
+                if not (ok and self._write(batch)):
+                    self._spool(batch)
+                    ok = False
+            if ok and replay:
+                ok = self._replay()
+            return ok
+
+    def close(self, timeout: float = 5.0) -> None:
+        """Stop the writer and flush; whatever cannot be written ends up in the spool."""
+        self._stop.set()
+        self._wake.set()
+        worker = self._worker
+        if worker is not None and worker.is_alive() and worker is not threading.current_thread():
+            worker.join(timeout)
+        self.flush(replay=False)
+
+    def _write(self, ops: List[Dict[str, Any]]) -> bool:
+        """Write ``ops``; False if Mongo is unreachable. Rejected operations are dead-lettered."""
+        db = self._get_db()
+        if db is None:
+            return False
+        start = time.perf_counter()
+        try:
+            self._write_ops(db, ops)
+        except Exception as exc:
+            if _is_connectivity_error(exc):
+                logger.warning({"msg": "persist_batch_failed", "ops": len(ops)}, exc_info=True)
+                return False
+            if len(ops) == 1:
+                self._dead_letter(ops, exc)
+                return True
+            # find the offending operations; re-sent inserts that landed are duplicates
+            return all(self._write([op]) for op in ops)
+        _observe(PERSIST_FLUSH_SECONDS, "observe", time.perf_counter() - start)
+        return True
+
+    def _write_ops(self, db: Any, ops: List[Dict[str, Any]]) -> None:
+        inserts: Dict[str, List[Dict[str, Any]]] = {}
+        upserts: Dict[str, List[Dict[str, Any]]] = {}
+        for op in ops:
+            (inserts if op["op"] == "insert" else upserts).setdefault(op["coll"], []).append(op)
+        for name, items in inserts.items():
+            self._insert_many(_collection(db, name), [o["doc"] for o in items])
+        for name, items in upserts.items():
+            from pymongo import ReplaceOne  # type: ignore
+
+            _collection(db, name).bulk_write(
+                [ReplaceOne(o["filter"], o["doc"], upsert=True) for o in items], ordered=False
+            )
+
+    @staticmethod
+    def _insert_many(coll: Any, docs: List[Dict[str, Any]]) -> None:
+        try:
+            coll.insert_many(docs, ordered=False)
+        except Exception as exc:
+            # Replays may re-insert documents that already landed: ids are
+            # pre-generated, so duplicate-key errors mean "already stored".
+            errors = (getattr(exc, "details", None) or {}).get("writeErrors") or []
+            if not errors or any(e.get("code") != DUPLICATE_KEY for e in errors):
+                raise
+
+    # -- spool --------------------------------------------------------------
+
+    @contextmanager
+    def _locked_spool(self) -> Iterator[None]:
+        """Hold the spool against other threads and other processes sharing the path."""
+        with self._spool_lock, _file_lock(self.spool_path + ".lock"):
+            yield
+
+    @staticmethod
+    def _append(path: str, ops: Iterable[Dict[str, Any]]) -> None:
+        with open(path, "a", encoding="utf-8") as fh:
+            for op in ops:
+                fh.write(json.dumps(op, default=_json_default) + "\n")
+            fh.flush()
+            os.fsync(fh.fileno())
+
+    def _spool(self, ops: Iterable[Dict[str, Any]]) -> None:
+        ops = list(ops)
+        with self._locked_spool():
+            self._append(self.spool_path, ops)
+        _observe(PERSIST_SPOOLED, "inc", len(ops))
+        self._report_spool_size()
+        logger.warning({"msg": "persist_spooled", "ops": len(ops), "spool": self.spool_path})
+
+    def _dead_letter(self, ops: List[Dict[str, Any]], exc: BaseException) -> None:
+        """Keep operations Mongo rejected (not retried) in ``<spool>.dead`` for inspection."""
+        error = f"{type(exc).__name__}: {exc}"[:500]
+        with self._locked_spool():
+            self._append(self.spool_path + ".dead", [dict(op, error=error) for op in ops])
+        _observe(PERSIST_DEAD_LETTERED, "inc", len(ops))
+        logger.error({"msg": "persist_dead_lettered", "ops": len(ops), "error": error})
+
+    def spool_size(self) -> int:
+        """Bytes waiting in the spool (including a replay in progress)."""
+        total = 0
+        for path in (self.spool_path, self.spool_path + ".replay"):
+            try:
+                total += os.path.getsize(path)
+            except OSError:
+                pass
+        return total
+
+    def _report_spool_size(self) -> None:
+        _observe(PERSIST_SPOOL_BYTES, "set", self.spool_size())
+
+    def _replay(self) -> bool:
+        """Write spooled operations back to Mongo; unwritten ones stay spooled."""
+        self._last_replay = time.monotonic()
+        with _file_lock(self.spool_path + ".replay.lock", blocking=False) as acquired:
+            if not acquired:  # another process is replaying this spool
+                return True
+            return self._replay_locked()
+
+    def _replay_locked(self) -> bool:
+        replay_path = self.spool_path + ".replay"
+        with self._locked_spool():
+            if not os.path.exists(replay_path):
+                if not os.path.exists(self.spool_path):
+                    return True
+                os.replace(self.spool_path, replay_path)
+        with open(replay_path, "r", encoding="utf-8") as fh:
+            ops = [json.loads(line, object_hook=_json_object_hook) for line in fh if line.strip()]
+        written = 0
+        for i in range(0, len(ops), self.batch_size):
+            if not self._write(ops[i:i + self.batch_size]):
+                break
+            written = i + self.batch_size
+        if written < len(ops):
+            if written:
+                # rewrite atomically: the replay file is the only copy of these ops
+                tmp_path = replay_path + ".tmp"
+                with open(tmp_path, "w", encoding="utf-8") as fh:
+                    for op in ops[written:]:
+                        fh.write(json.dumps(op, default=_json_default) + "\n")
+                    fh.flush()
+                    os.fsync(fh.fileno())
+                os.replace(tmp_path, replay_path)
+            self._report_spool_size()
+            return False
+        os.remove(replay_path)
+        self._report_spool_size()
+        logger.info({"msg": "persist_spool_replayed", "ops": len(ops)})
+        return True
+
+
+def _collection(db: Any, name: str) -> Any:
+    if hasattr(db, "get_collection"):
+        return db.get_collection(name)
+    return db[name]